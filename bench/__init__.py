@@ -0,0 +1,7 @@
+"""
+Benchmarks of the app:
+- `bench.seed` - fills local PostgreSQL with seeded datasets,
+- `bench.driver` - drives the app in-process through ASGI transport at fixed concurrency,
+- `bench.micro` - micro benchmarks of single components,
+- `bench.compare` - flags regressions between two results' JSON files.
+"""
@@ -0,0 +1,60 @@
+"""
+Compares two benchmark results' JSON files and flags regressions:
+scenario's latency percentile grown or throughput dropped by more than `--threshold` percents.
+Exits with code 1 if any regression was found.
+Usage: `python -m bench.compare bench/results/baseline.json bench/results/current.json`.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from bench.results import load_results
+
+
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def compare(baseline: dict, current: dict, threshold_percent: float) -> list[str]:
+    """Prints comparison table and returns regressions' descriptions."""
+    regressions = []
+    print(f"{'scenario':<16}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, current_result in current["scenarios"].items():
+        baseline_result = baseline["scenarios"].get(name)
+        if baseline_result is None:
+            print(f"{name:<16}{'(new)':<16}")
+            continue
+        for metric in (*LATENCY_METRICS, "throughput_rps"):
+            old_value, new_value = baseline_result[metric], current_result[metric]
+            change_percent = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            # Latencies regress by growing, throughput by dropping
+            is_regression = (
+                change_percent < -threshold_percent if metric == "throughput_rps"
+                else change_percent > threshold_percent
+            )
+            marker = "  <- REGRESSION" if is_regression else ""
+            print(f"{name:<16}{metric:<16}{old_value:>12.3f}{new_value:>12.3f}{change_percent:>+9.1f}%{marker}")
+            if is_regression:
+                regressions.append(f"{name} {metric}: {old_value} -> {new_value} ({change_percent:+.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change, percents.")
+    args = parser.parse_args()
+
+    baseline, current = load_results(args.baseline), load_results(args.current)
+    if baseline["parameters"] != current["parameters"]:
+        print(f"WARNING: parameters differ:\n  {baseline['parameters']}\n  {current['parameters']}")
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions between {baseline['commit']} and {current['commit']}")
+        sys.exit(1)
+    print(f"\nNo regressions between {baseline['commit']} and {current['commit']}")
+
+
+if __name__ == "__main__":
+    main()
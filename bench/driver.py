@@ -0,0 +1,192 @@
+"""
+Load driver, which runs the app in-process (with it's lifespan) behind httpx's ASGI transport
+and sends every scenario's requests at fixed concurrency:
+list, search, detail, create, edit, delete.
+Usage: `python -m bench.driver --entity products --concurrency 32 --requests 2000`.
+Settings are read from environment, override them for a run by `--set FAST_JSON_RESPONSES=true`.
+Query budgets are strict: a request exceeding it's route's budget fails the run.
+Framework's overhead without DB: `--set STORAGE_BACKEND=memory --memory-rows 10000`.
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import time
+import typing as tp
+from pathlib import Path
+from uuid import uuid4
+
+import httpx
+
+from bench.results import ScenarioResult, save_results
+
+
+SCENARIOS = ("list", "search", "detail", "create", "edit", "delete")
+READ_SCENARIOS = ("list", "search", "detail")
+# Sample of existing instances for detail requests
+DETAIL_IDS_SAMPLE_SIZE = 1000
+
+RequestFactory = tp.Callable[[httpx.AsyncClient, int], tp.Awaitable[httpx.Response]]
+
+
+async def run_scenario(
+        client: httpx.AsyncClient,
+        send_request: RequestFactory,
+        concurrency: int,
+        requests_number: int
+) -> ScenarioResult:
+    """Sends `requests_number` requests by `concurrency` concurrent workers, measures every request's latency."""
+    request_numbers = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while (request_number := next(request_numbers)) < requests_number:
+            started_at = time.perf_counter()
+            response = await send_request(client, request_number)
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code >= 400:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return ScenarioResult.from_latencies(latencies, errors, time.perf_counter() - started_at)
+
+
+def build_scenarios(
+        url: str,
+        page_size: int,
+        count_mode: str,
+        existing_ids: list[str],
+        created_ids: list[str]
+) -> dict[str, RequestFactory]:
+    """
+    Returns scenarios' request factories by request's number.
+    `create` fills `created_ids`, which are then edited and deleted by the next scenarios.
+    """
+    # Numbers matched by seeded names' zero padded suffixes, the same for every run
+    search_random = random.Random(0)
+    search_words = [f"{search_random.randrange(100_000):05d}" for _ in range(100)]
+    names_prefix = uuid4().hex[:8]
+
+    async def send_list(client: httpx.AsyncClient, number: int):
+        return await client.get(url, params={
+            "page_number": number % 100 + 1, "page_size": page_size, "count": count_mode
+        })
+
+    async def send_search(client: httpx.AsyncClient, number: int):
+        return await client.get(url, params={
+            "search": search_words[number % len(search_words)], "page_size": page_size, "count": count_mode
+        })
+
+    async def send_detail(client: httpx.AsyncClient, number: int):
+        return await client.get(f"{url}/{existing_ids[number % len(existing_ids)]}")
+
+    async def send_create(client: httpx.AsyncClient, number: int):
+        response = await client.post(url, json={"name": f"bench-{names_prefix}-{number}"})
+        if response.status_code < 400:
+            created_ids.append(response.json()["id"])
+        return response
+
+    async def send_edit(client: httpx.AsyncClient, number: int):
+        return await client.put(
+            f"{url}/{created_ids[number % len(created_ids)]}", json={"name": f"bench-{names_prefix}-{number}-e"}
+        )
+
+    async def send_delete(client: httpx.AsyncClient, number: int):
+        return await client.delete(f"{url}/{created_ids[number % len(created_ids)]}")
+
+    return {
+        "list": send_list,
+        "search": send_search,
+        "detail": send_detail,
+        "create": send_create,
+        "edit": send_edit,
+        "delete": send_delete,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, ScenarioResult]:
+    # App reads settings on import, so it's imported after overrides are applied
+    from bench.seed import seed_in_memory
+    from src.core.config import settings, StorageBackend
+    from src.main import app
+
+    if args.memory_rows:
+        if settings.STORAGE_BACKEND != StorageBackend.memory:
+            raise SystemExit("`--memory-rows` needs `--set STORAGE_BACKEND=memory`")
+        seed_in_memory(args.memory_rows)
+
+    url = f"/api/v1/{args.entity}"
+    transport = httpx.ASGITransport(app=app)
+    results: dict[str, ScenarioResult] = {}
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            sample = await client.get(url, params={"page_size": DETAIL_IDS_SAMPLE_SIZE, "count": "none"})
+            sample.raise_for_status()
+            existing_ids = [instance["id"] for instance in sample.json()["content"]]
+            if not existing_ids:
+                raise SystemExit(f"No {args.entity} to benchmark, seed them by `python -m bench.seed` first")
+            created_ids: list[str] = []
+            scenarios = build_scenarios(url, args.page_size, args.count, existing_ids, created_ids)
+            for name in args.scenarios:
+                if name in ("edit", "delete") and not created_ids:
+                    logging.warning(f"Skipping {name}: it needs `create` scenario's instances")
+                    continue
+                if name in READ_SCENARIOS:
+                    for number in range(args.warmup):
+                        await scenarios[name](client, number)
+                results[name] = await run_scenario(client, scenarios[name], args.concurrency, args.requests)
+                logging.info(f"{name}: {results[name]}")
+    return results
+
+
+def apply_settings_overrides(overrides: list[str]):
+    """Sets `KEY=VALUE` overrides as environment variables, which settings are read from."""
+    for override in overrides:
+        key, _, value = override.partition("=")
+        os.environ[key] = value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entity", choices=("products", "categories"), default="products")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario.")
+    parser.add_argument("--warmup", type=int, default=50, help="Not measured requests before read scenarios.")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--count", choices=("exact", "estimate", "none"), default="exact")
+    parser.add_argument(
+        "--memory-rows", type=int, default=0, help="Rows per in-memory storage to seed before the run."
+    )
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE")
+    parser.add_argument("--output", type=Path, help="Results' JSON path, `bench/results/` by default.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Rate limiter would measure rejections instead of the app,
+    # requests exceeding their route's `query_budget` fail the run (override by `--set QUERY_BUDGETS_STRICT=false`)
+    apply_settings_overrides([
+        f"API_REQUEST_LIMIT_PER_MINUTE={10 ** 9}", "QUERY_BUDGETS_STRICT=true", *args.overrides
+    ])
+    results = asyncio.run(run(args))
+    parameters = {
+        "entity": args.entity,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "page_size": args.page_size,
+        "count": args.count,
+        "memory_rows": args.memory_rows,
+        "overrides": args.overrides,
+    }
+    path = save_results("driver", results, parameters, args.output)
+    print(f"Results are saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
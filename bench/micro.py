@@ -0,0 +1,154 @@
+"""
+Micro benchmarks of single components, every one measures latencies of `--iterations` sequential calls:
+- `list-rows` / `list-orm` - repository's page of Core rows (export's read-only fast path)
+  vs ORM instances with their categories (list's path), needs seeded DB,
+- `rate-limit` - shared memory limiter's check, `--processes` run it concurrently on the same buckets,
+- `json-fast` / `json-default` - `SchemaJSONResponse` rendering vs emulated FastAPI's `response_model` path.
+Usage: `python -m bench.micro rate-limit --processes 4`.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import typing as tp
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+from bench.results import ScenarioResult, save_results
+
+
+def measure(call: tp.Callable[[], tp.Any], iterations: int) -> ScenarioResult:
+    latencies = []
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        call_started_at = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - call_started_at)
+    return ScenarioResult.from_latencies(latencies, 0, time.perf_counter() - started_at)
+
+
+async def measure_async(call: tp.Callable[[], tp.Awaitable[tp.Any]], iterations: int) -> ScenarioResult:
+    latencies = []
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        call_started_at = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - call_started_at)
+    return ScenarioResult.from_latencies(latencies, 0, time.perf_counter() - started_at)
+
+
+async def bench_list(args: argparse.Namespace) -> dict[str, ScenarioResult]:
+    """
+    Pages of `--page-size` products as Core rows and as ORM instances with their categories,
+    every page in a new session.
+    """
+    from src.db.postgres import async_session, engine
+    from src.db.postgres.repositories import ProductSQLAlchemyRepository
+    from src.model.schema.common import ListCountMode
+    from src.model.schema.products import ProductOrdering, ProductsPaginatedListQueryParams
+    from src.service.products import PRODUCTS_EXPORT_ESSENTIALS, PRODUCTS_LIST_ESSENTIALS
+
+    # Defaults are FastAPI's `Query` params, so every field is set
+    query_params = ProductsPaginatedListQueryParams(
+        ordering=ProductOrdering.name_asc, search=None, page_number=1, page_size=args.page_size,
+        count=ListCountMode.none, cursor=None, category_id=None, facets=False
+    )
+
+    def get_page(essentials):
+        async def call():
+            async with async_session() as session:
+                await ProductSQLAlchemyRepository(session).get_list(query_params, essentials)
+        return call
+
+    try:
+        return {
+            "list-rows": await measure_async(get_page(PRODUCTS_EXPORT_ESSENTIALS), args.iterations),
+            "list-orm": await measure_async(get_page(PRODUCTS_LIST_ESSENTIALS), args.iterations),
+        }
+    finally:
+        await engine.dispose()
+
+
+def check_rate_limit(path: str, iterations: int, keys_number: int) -> ScenarioResult:
+    from src.util.rate_limit import Limiter, RateLimit, SharedMemoryBuckets
+
+    limiter = Limiter(SharedMemoryBuckets(path, 65_536))
+    rate_limit = RateLimit.parse(f"{10 ** 9}/minute")
+    keys = [f"bench:{uuid4()}" for _ in range(keys_number)]
+    calls = iter(range(iterations))
+    return measure(lambda: limiter.check(keys[next(calls) % keys_number], rate_limit), iterations)
+
+
+def bench_rate_limit(args: argparse.Namespace) -> dict[str, ScenarioResult]:
+    """Limiter's checks of `--keys` keys in `--processes` processes sharing the same buckets' file."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "buckets")
+        with multiprocessing.get_context("fork").Pool(args.processes) as pool:
+            results = pool.starmap(check_rate_limit, [(path, args.iterations, args.keys)] * args.processes)
+    # Slowest process is reported, it shows locks' contention best
+    return {"rate-limit": max(results, key=lambda result: result.p99_ms)}
+
+
+def bench_json(args: argparse.Namespace) -> dict[str, ScenarioResult]:
+    """
+    Serialization of `--page-size` rows' page: `SchemaJSONResponse` vs FastAPI's `response_model` path
+    (content model dumped to dict, validated by response field, dumped to JSON-able python, `json.dumps`).
+    """
+    from pydantic import TypeAdapter
+
+    from src.model.schema.common import PaginatedList
+    from src.model.schema.products import ProductsPaginatedList
+    from src.util.responses import SchemaJSONResponse
+
+    rows = [SimpleNamespace(id=uuid4(), name=f"product-{number:09d}") for number in range(args.page_size)]
+    content = PaginatedList(content=rows, total_items=len(rows), total_pages=1)
+    response_field = TypeAdapter(ProductsPaginatedList)
+
+    def render_default():
+        value = response_field.validate_python(content.model_dump(), from_attributes=True)
+        json.dumps(response_field.dump_python(value, mode="json")).encode()
+
+    return {
+        "json-fast": measure(lambda: SchemaJSONResponse(content, ProductsPaginatedList), args.iterations),
+        "json-default": measure(render_default, args.iterations),
+    }
+
+
+BENCHMARKS = {
+    "list": lambda args: asyncio.run(bench_list(args)),
+    "rate-limit": bench_rate_limit,
+    "json": bench_json,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmark", choices=BENCHMARKS)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--keys", type=int, default=1000, help="Rate limiter's distinct keys.")
+    parser.add_argument("--output", type=Path, help="Results' JSON path, `bench/results/` by default.")
+    args = parser.parse_args()
+
+    results = BENCHMARKS[args.benchmark](args)
+    for name, result in results.items():
+        print(f"{name}: {result}")
+    parameters = {
+        "benchmark": args.benchmark,
+        "iterations": args.iterations,
+        "page_size": args.page_size,
+        "processes": args.processes,
+        "keys": args.keys,
+    }
+    path = save_results(f"micro-{args.benchmark}", results, parameters, args.output)
+    print(f"Results are saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
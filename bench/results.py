@@ -0,0 +1,86 @@
+"""Benchmark results: latency statistics and their JSON files."""
+
+import json
+import math
+import platform
+import subprocess
+import time
+import typing as tp
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Returns nearest-rank percentile of sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class ScenarioResult:
+    """Scenario's requests number, throughput and latencies in milliseconds."""
+    requests: int
+    errors: int
+    throughput_rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+    @classmethod
+    def from_latencies(cls, latencies: list[float], errors: int, elapsed_seconds: float) -> "ScenarioResult":
+        """Builds result from requests' latencies in seconds and scenario's wall time."""
+        latencies_ms = sorted(latency * 1000 for latency in latencies)
+        return cls(
+            requests=len(latencies_ms),
+            errors=errors,
+            throughput_rps=round(len(latencies_ms) / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+            mean_ms=round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else 0.0,
+            p50_ms=round(percentile(latencies_ms, 50), 3),
+            p95_ms=round(percentile(latencies_ms, 95), 3),
+            p99_ms=round(percentile(latencies_ms, 99), 3),
+            max_ms=round(latencies_ms[-1], 3) if latencies_ms else 0.0,
+        )
+
+
+def get_git_commit() -> tp.Optional[str]:
+    """Returns current commit's short hash, or None outside of git work tree."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(
+        benchmark: str,
+        scenarios: dict[str, ScenarioResult],
+        parameters: dict[str, tp.Any],
+        path: tp.Optional[Path] = None
+) -> Path:
+    """Saves results with run's metadata as JSON, by default into `bench/results/<benchmark>-<commit>-<time>.json`."""
+    commit = get_git_commit()
+    if path is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{benchmark}-{commit or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    document = {
+        "benchmark": benchmark,
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "parameters": parameters,
+        "scenarios": {name: asdict(result) for name, result in scenarios.items()},
+    }
+    path.write_text(json.dumps(document, indent=2))
+    return path
+
+
+def load_results(path: Path) -> dict[str, tp.Any]:
+    return json.loads(path.read_text())
@@ -0,0 +1,87 @@
+"""
+Seeds categories and products into the app's PostgreSQL DB by COPY.
+Existing rows are removed. Usage: `python -m bench.seed --size 1m`.
+In-memory storage is seeded by the load driver itself, see `bench.driver --memory-rows`.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import typing as tp
+from uuid import uuid4
+
+import asyncpg
+
+from src.core.config import settings
+
+
+DATASET_SIZES = {
+    "10k": 10_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+}
+COPY_CHUNK_ROWS = 100_000
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def generate_rows(prefix: str, start: int, stop: int) -> tp.Iterator[tuple]:
+    """Yields `(id, name)` rows with unique names: `<prefix>-<zero padded number>`."""
+    for number in range(start, stop):
+        yield uuid4(), f"{prefix}-{number:09d}"
+
+
+async def copy_rows(connection: asyncpg.Connection, table_name: str, prefix: str, rows_number: int):
+    """Copies `rows_number` generated rows into table by chunks, so memory doesn't depend on dataset size."""
+    for start in range(0, rows_number, COPY_CHUNK_ROWS):
+        stop = min(start + COPY_CHUNK_ROWS, rows_number)
+        await connection.copy_records_to_table(
+            table_name, records=generate_rows(prefix, start, stop), columns=["id", "name"]
+        )
+        logger.info(f"{table_name}: {stop}/{rows_number} rows copied")
+
+
+async def seed(rows_number: int):
+    """Replaces categories and products with `rows_number` seeded rows of each, then analyzes tables."""
+    dsn = settings.DATABASE_URL.unicode_string().replace("+asyncpg", "")
+    connection: asyncpg.Connection = await asyncpg.connect(dsn)
+    try:
+        started_at = time.perf_counter()
+        async with connection.transaction():
+            await connection.execute("TRUNCATE shop_product, shop_category, shop_tombstone")
+            await copy_rows(connection, "shop_category", "category", rows_number)
+            await copy_rows(connection, "shop_product", "product", rows_number)
+            # Cached lists and ETags of the previous data must become stale
+            await connection.execute(
+                "UPDATE shop_table_version SET version = version + 1, updated_at = now()"
+            )
+        await connection.execute("ANALYZE shop_category, shop_product")
+        logger.info(f"Seeded {rows_number} rows per table in {time.perf_counter() - started_at:.1f}s")
+    finally:
+        await connection.close()
+
+
+def seed_in_memory(rows_number: int):
+    """Replaces instances of in-memory storages (`STORAGE_BACKEND=memory`) of this process with seeded ones."""
+    from src.db.memory.repositories import CategoryInMemoryRepository, ProductInMemoryRepository
+
+    for repository, prefix in ((CategoryInMemoryRepository, "category"), (ProductInMemoryRepository, "product")):
+        repository.storage.clear()
+        # Names are generated in ascending order, so they're appended to the end of name index
+        seeding_repository = repository()
+        for instance_id, name in generate_rows(prefix, 0, rows_number):
+            repository.storage.add(seeding_repository._build_instance({"id": instance_id, "name": name}))
+        repository.storage.record_change()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=DATASET_SIZES, default="10k", help="Rows per table.")
+    args = parser.parse_args()
+    asyncio.run(seed(DATASET_SIZES[args.size]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 #!/bin/bash
 export PYTHONPATH=.
+# Workers' metrics are aggregated from files in this directory
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/simple-shop-api-metrics}
 
 # Let the DB start
 python backend_pre_start.py
@@ -11,4 +13,4 @@ alembic upgrade head &&
 #pytest . --asyncio-mode=auto &&
 
 # Run FastAPI application
-gunicorn src.main:app -w 4 -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
\ No newline at end of file
+gunicorn src.main:app -w 4 -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
@@ -0,0 +1,19 @@
+"""Gunicorn's settings hooks, picked up from the working directory."""
+
+import os
+import shutil
+
+
+def on_starting(server):
+    """Removes metrics' files left by the previous run of the master process."""
+    multiprocess_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiprocess_dir:
+        shutil.rmtree(multiprocess_dir, ignore_errors=True)
+        os.makedirs(multiprocess_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drops exited worker's live gauges from `/metrics` aggregation."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
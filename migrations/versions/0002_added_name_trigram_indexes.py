@@ -0,0 +1,38 @@
+"""Added name trigram indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Indexes are built concurrently (outside of transaction) to not lock big tables for writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shop_category_name_trgm', 'shop_category', [sa.text('lower(name) gin_trgm_ops')],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_shop_product_name_trgm', 'shop_product', [sa.text('lower(name) gin_trgm_ops')],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_shop_product_name_trgm', table_name='shop_product', postgresql_concurrently=True)
+        op.drop_index('ix_shop_category_name_trgm', table_name='shop_category', postgresql_concurrently=True)
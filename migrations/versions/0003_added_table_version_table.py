@@ -0,0 +1,38 @@
+"""Added table version table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 13:40:22.174905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table_version = op.create_table('shop_table_version',
+    sa.Column('table_name', sa.String(length=63), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('table_name', name=op.f('pk_shop_table_version'))
+    )
+    # Versions are only incremented by writes, so every versioned table needs its row
+    op.execute(
+        table_version.insert().values([
+            {'table_name': 'shop_category'},
+            {'table_name': 'shop_product'},
+        ])
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('shop_table_version')
@@ -0,0 +1,40 @@
+"""Added product category foreign key
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 16:05:37.402816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable column without default doesn't rewrite the table, and all existing rows satisfy the key
+    op.add_column('shop_product', sa.Column('category_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        op.f('fk_shop_product_category_id_shop_category'), 'shop_product', 'shop_category',
+        ['category_id'], ['id'], ondelete='RESTRICT'
+    )
+    # Indexes are built concurrently (outside of transaction) to not lock big tables for writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shop_product_category_id_name', 'shop_product', ['category_id', 'name'],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_shop_product_category_id_name', table_name='shop_product', postgresql_concurrently=True)
+    op.drop_constraint(op.f('fk_shop_product_category_id_shop_category'), 'shop_product', type_='foreignkey')
+    op.drop_column('shop_product', 'category_id')
@@ -0,0 +1,137 @@
+"""Added category product count
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 17:21:09.615240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The default `CHANGES_NOTIFY_CHANNEL` of settings, migrations don't depend on app's environment
+CHANGES_NOTIFY_CHANNEL = 'shop_changes'
+
+
+def upgrade() -> None:
+    op.add_column(
+        'shop_category', sa.Column('product_count', sa.Integer(), server_default='0', nullable=False)
+    )
+    # Applies products' counts deltas, then records categories' change like repositories do:
+    # increments their table's version and notifies about changed categories (whole table for > 100)
+    op.execute("""
+        CREATE FUNCTION shop_category_change_product_counts(added_ids uuid[], removed_ids uuid[], channel text)
+        RETURNS void LANGUAGE plpgsql AS $$
+        DECLARE
+            category_ids uuid[];
+            deltas integer[];
+            category_version bigint;
+            category_updated_at timestamptz;
+        BEGIN
+            SELECT array_agg(category_id ORDER BY category_id), array_agg(delta ORDER BY category_id)
+            INTO category_ids, deltas
+            FROM (
+                SELECT category_id, sum(delta) AS delta
+                FROM (
+                    SELECT unnest(added_ids) AS category_id, 1 AS delta
+                    UNION ALL
+                    SELECT unnest(removed_ids), -1
+                ) AS category_deltas
+                WHERE category_id IS NOT NULL
+                GROUP BY category_id
+                HAVING sum(delta) <> 0
+            ) AS count_deltas;
+            IF category_ids IS NULL THEN
+                RETURN;
+            END IF;
+
+            -- Categories are locked in the same order by all writers, so concurrent bulk writes don't deadlock
+            PERFORM 1 FROM shop_category WHERE id = ANY(category_ids) ORDER BY id FOR NO KEY UPDATE;
+            UPDATE shop_category SET product_count = product_count + count_delta.delta
+            FROM unnest(category_ids, deltas) AS count_delta(category_id, delta)
+            WHERE shop_category.id = count_delta.category_id;
+
+            UPDATE shop_table_version SET version = version + 1, updated_at = now()
+            WHERE table_name = 'shop_category'
+            RETURNING version, updated_at INTO category_version, category_updated_at;
+            PERFORM pg_notify(channel, json_build_object(
+                'table', 'shop_category',
+                'version', category_version,
+                'updated_at', extract(epoch FROM category_updated_at),
+                'ids', CASE WHEN cardinality(category_ids) <= 100 THEN to_json(category_ids) END
+            )::text);
+        END $$
+    """)
+    # Statement level triggers get all rows changed by the statement (bulk inserts and COPY's
+    # `INSERT ... SELECT` included) in transition tables, so categories are updated once per statement
+    op.execute("""
+        CREATE FUNCTION shop_product_count_inserted() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM shop_category_change_product_counts(
+                ARRAY(SELECT category_id FROM new_rows), '{}', TG_ARGV[0]
+            );
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE FUNCTION shop_product_count_updated() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM shop_category_change_product_counts(
+                ARRAY(SELECT category_id FROM new_rows), ARRAY(SELECT category_id FROM old_rows), TG_ARGV[0]
+            );
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE FUNCTION shop_product_count_deleted() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM shop_category_change_product_counts(
+                '{}', ARRAY(SELECT category_id FROM old_rows), TG_ARGV[0]
+            );
+            RETURN NULL;
+        END $$
+    """)
+    op.execute(f"""
+        CREATE TRIGGER shop_product_count_inserted AFTER INSERT ON shop_product
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION shop_product_count_inserted('{CHANGES_NOTIFY_CHANNEL}')
+    """)
+    op.execute(f"""
+        CREATE TRIGGER shop_product_count_updated AFTER UPDATE ON shop_product
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION shop_product_count_updated('{CHANGES_NOTIFY_CHANNEL}')
+    """)
+    op.execute(f"""
+        CREATE TRIGGER shop_product_count_deleted AFTER DELETE ON shop_product
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION shop_product_count_deleted('{CHANGES_NOTIFY_CHANNEL}')
+    """)
+    # Triggers' creation locks products for writes till commit, so counted products don't change meanwhile
+    op.execute("""
+        UPDATE shop_category SET product_count = category_products.product_count
+        FROM (
+            SELECT category_id, count(*) AS product_count FROM shop_product
+            WHERE category_id IS NOT NULL
+            GROUP BY category_id
+        ) AS category_products
+        WHERE shop_category.id = category_products.category_id
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER shop_product_count_deleted ON shop_product')
+    op.execute('DROP TRIGGER shop_product_count_updated ON shop_product')
+    op.execute('DROP TRIGGER shop_product_count_inserted ON shop_product')
+    op.execute('DROP FUNCTION shop_product_count_deleted()')
+    op.execute('DROP FUNCTION shop_product_count_updated()')
+    op.execute('DROP FUNCTION shop_product_count_inserted()')
+    op.execute('DROP FUNCTION shop_category_change_product_counts(uuid[], uuid[], text)')
+    op.drop_column('shop_category', 'product_count')
@@ -0,0 +1,95 @@
+"""Added change tracking
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 18:47:53.208164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACKED_TABLES = ('shop_category', 'shop_product')
+# The same as `CHANGES_LOCK_KEY` of repositories
+CHANGES_LOCK_KEY = 7_310_868_109_615_277_159
+
+
+def upgrade() -> None:
+    op.execute('CREATE SEQUENCE shop_change_seq START WITH 2')
+    op.create_table('shop_tombstone',
+    sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('shop_change_seq')"), nullable=False),
+    sa.Column('table_name', sa.String(length=63), nullable=False),
+    sa.Column('instance_id', sa.UUID(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('change_seq', name=op.f('pk_shop_tombstone'))
+    )
+    for table_name in TRACKED_TABLES:
+        # Non-volatile defaults don't rewrite tables: existing rows get time of migration and
+        # the same change sequence number 1 (so it isn't unique), then defaults are replaced for new rows
+        op.add_column(table_name, sa.Column(
+            'created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False
+        ))
+        op.add_column(table_name, sa.Column(
+            'updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False
+        ))
+        op.add_column(table_name, sa.Column('change_seq', sa.BigInteger(), server_default='1', nullable=False))
+        op.alter_column(table_name, 'change_seq', server_default=sa.text("nextval('shop_change_seq')"))
+
+    # Every writing transaction holds the lock from it's first write till commit, so change sequence numbers
+    # are allocated one transaction at a time, and a reader never sees a number before a smaller one
+    op.execute(f"""
+        CREATE FUNCTION shop_lock_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_advisory_xact_lock({CHANGES_LOCK_KEY});
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE FUNCTION shop_touch_change() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.updated_at := now();
+            NEW.change_seq := nextval('shop_change_seq');
+            RETURN NEW;
+        END $$
+    """)
+    for table_name in TRACKED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table_name}_lock_changes BEFORE INSERT OR UPDATE OR DELETE ON {table_name}
+            FOR EACH STATEMENT EXECUTE FUNCTION shop_lock_changes()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table_name}_touch_change BEFORE UPDATE ON {table_name}
+            FOR EACH ROW EXECUTE FUNCTION shop_touch_change()
+        """)
+
+    # Indexes are built concurrently (outside of transaction) to not lock big tables for writes
+    with op.get_context().autocommit_block():
+        for table_name in TRACKED_TABLES:
+            op.create_index(
+                f'ix_{table_name}_change_seq', table_name, ['change_seq'],
+                unique=False, postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table_name in TRACKED_TABLES:
+            op.drop_index(f'ix_{table_name}_change_seq', table_name=table_name, postgresql_concurrently=True)
+    for table_name in TRACKED_TABLES:
+        op.execute(f'DROP TRIGGER {table_name}_touch_change ON {table_name}')
+        op.execute(f'DROP TRIGGER {table_name}_lock_changes ON {table_name}')
+        op.drop_column(table_name, 'change_seq')
+        op.drop_column(table_name, 'updated_at')
+        op.drop_column(table_name, 'created_at')
+    op.execute('DROP FUNCTION shop_touch_change()')
+    op.execute('DROP FUNCTION shop_lock_changes()')
+    op.drop_table('shop_tombstone')
+    op.execute('DROP SEQUENCE shop_change_seq')
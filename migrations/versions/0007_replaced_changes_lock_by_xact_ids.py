@@ -0,0 +1,95 @@
+"""Replaced changes lock by transaction IDs
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 21:12:40.516307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACKED_TABLES = ('shop_category', 'shop_product')
+# Tables, which rows are changes
+CHANGES_TABLES = (*TRACKED_TABLES, 'shop_tombstone')
+# The same as `CHANGES_LOCK_KEY` of 0006 migration
+CHANGES_LOCK_KEY = 7_310_868_109_615_277_159
+
+
+def upgrade() -> None:
+    for table_name in TRACKED_TABLES:
+        op.execute(f'DROP TRIGGER {table_name}_lock_changes ON {table_name}')
+    op.execute('DROP FUNCTION shop_lock_changes()')
+
+    # Changes are ordered by their writing transaction's ID and read only below the oldest running one's ID
+    # (`pg_snapshot_xmin`), so writers aren't serialized to keep their changes in order.
+    # Existing rows get transaction ID 1 (older than any real one) without table's rewrite,
+    # then the default is replaced by writing transaction's ID for new rows
+    for table_name in CHANGES_TABLES:
+        op.add_column(table_name, sa.Column('change_xid', sa.BigInteger(), server_default='1', nullable=False))
+        op.alter_column(
+            table_name, 'change_xid', server_default=sa.text('CAST(CAST(pg_current_xact_id() AS text) AS bigint)')
+        )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION shop_touch_change() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.updated_at := now();
+            NEW.change_seq := nextval('shop_change_seq');
+            NEW.change_xid := CAST(CAST(pg_current_xact_id() AS text) AS bigint);
+            RETURN NEW;
+        END $$
+    """)
+
+    with op.get_context().autocommit_block():
+        for table_name in CHANGES_TABLES:
+            op.create_index(
+                f'ix_{table_name}_change_xid_change_seq', table_name, ['change_xid', 'change_seq'],
+                unique=False, postgresql_concurrently=True
+            )
+        for table_name in TRACKED_TABLES:
+            op.drop_index(f'ix_{table_name}_change_seq', table_name=table_name, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table_name in TRACKED_TABLES:
+            op.create_index(
+                f'ix_{table_name}_change_seq', table_name, ['change_seq'],
+                unique=False, postgresql_concurrently=True
+            )
+        for table_name in CHANGES_TABLES:
+            op.drop_index(
+                f'ix_{table_name}_change_xid_change_seq', table_name=table_name, postgresql_concurrently=True
+            )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION shop_touch_change() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.updated_at := now();
+            NEW.change_seq := nextval('shop_change_seq');
+            RETURN NEW;
+        END $$
+    """)
+    for table_name in CHANGES_TABLES:
+        op.drop_column(table_name, 'change_xid')
+
+    op.execute(f"""
+        CREATE FUNCTION shop_lock_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_advisory_xact_lock({CHANGES_LOCK_KEY});
+            RETURN NULL;
+        END $$
+    """)
+    for table_name in TRACKED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table_name}_lock_changes BEFORE INSERT OR UPDATE OR DELETE ON {table_name}
+            FOR EACH STATEMENT EXECUTE FUNCTION shop_lock_changes()
+        """)
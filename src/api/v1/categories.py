@@ -1,44 +1,128 @@
 """API's for managing categories and their related entities (CRUD, etc.)."""
 
 import http
+from typing import Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from src.core.config import settings
-from src.dep.services import get_category_service
+from src.dep.services import get_category_service, get_product_service
+from src.model.schema.common import BulkResult, BatchGet
 from src.model.schema.categories import CategoriesPaginatedList, CategoriesPaginatedListQueryParams, CategoryEdit, \
-    CategoryCreate, CategoryShowMinimal
+    CategoryCreate, CategoryShowMinimal, CategoriesBulkCreate, CategoriesExportQueryParams, CategoriesBatch
+from src.model.schema.products import ProductsPaginatedList, CategoryProductsPaginatedListQueryParams
 from src.service.categories import CategoryService
+from src.service.products import ProductService
+from src.util.deadlines import request_deadline
+from src.util.export import export_response
+from src.util.http_cache import conditional_get
 from src.util.rate_limit import limiter
+from src.util.request_stats import query_budget
+from src.util.responses import schema_response
 
 categories_router = APIRouter(prefix="/categories", tags=["Categories V1"])
 
 
-@categories_router.get("", response_model=CategoriesPaginatedList)
+@categories_router.get("", response_model=Union[CategoriesPaginatedList, CategoriesBatch])
+# Deadline, count, page and table's version, if notifications' listener is disconnected
+@query_budget(4)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_READ_SECONDS)
 async def get_categories_list(
     request: Request,
+    response: Response,
     query_params: CategoriesPaginatedListQueryParams=Depends(),
+    ids: Optional[list[UUID]]=Query(
+        None, max_length=settings.BATCH_GET_MAX_IDS,
+        description="Get categories by IDs instead of the list (other params are ignored)."
+    ),
     category_service: CategoryService=Depends(get_category_service)
 ):
-    """Get categories' list."""
-    return await category_service.get_list(query_params)
+    """
+    Get categories' list, or categories by `ids` in the same order with IDs of not found ones,
+    revalidated by `ETag` or `Last-Modified`.
+    """
+    headers = await conditional_get(request, response, category_service, settings.CACHE_CONTROL_LIST)
+    if ids:
+        return schema_response(await category_service.get_batch(ids), CategoriesBatch, headers)
+    return schema_response(await category_service.get_list(query_params), CategoriesPaginatedList, headers)
+
+
+@categories_router.post(":batchGet", response_model=CategoriesBatch)
+# Deadline and categories missing in detail cache
+@query_budget(2)
+@limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_READ_SECONDS)
+async def batch_get_categories(
+    request: Request,
+    body: BatchGet,
+    category_service: CategoryService=Depends(get_category_service)
+):
+    """Get categories by IDs in the same order with IDs of not found ones, for more IDs than fit in URL."""
+    return schema_response(await category_service.get_batch(body.ids), CategoriesBatch)
+
+
+@categories_router.get("/export", response_class=StreamingResponse)
+@limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+async def export_categories(
+    request: Request,
+    query_params: CategoriesExportQueryParams=Depends(),
+    category_service: CategoryService=Depends(get_category_service)
+):
+    """Export all categories as NDJSON or CSV stream, gzip-encoded if client accepts it."""
+    return export_response(
+        request, category_service.export(query_params), CategoryShowMinimal, query_params.format, "categories"
+    )
 
 
 @categories_router.get("/{id}", response_model=CategoryShowMinimal)
+# Deadline, instance and table's version, if notifications' listener is disconnected
+@query_budget(3)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_READ_SECONDS)
 async def get_category(
     request: Request,
+    response: Response,
     id: UUID,
     category_service: CategoryService=Depends(get_category_service)
 ):
-    """Get category's profile by their ID."""
-    return await category_service.get(id)
+    """Get category's profile by their ID, revalidated by `ETag` or `Last-Modified`."""
+    headers = await conditional_get(request, response, category_service, settings.CACHE_CONTROL_DETAIL)
+    return schema_response(await category_service.get(id), CategoryShowMinimal, headers)
+
+
+@categories_router.get("/{id}/products", response_model=ProductsPaginatedList)
+# Deadline, category, count, page, page's categories and tables' versions,
+# if notifications' listener is disconnected
+@query_budget(7)
+@limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_READ_SECONDS)
+async def get_category_products_list(
+    request: Request,
+    response: Response,
+    id: UUID,
+    query_params: CategoryProductsPaginatedListQueryParams=Depends(),
+    category_service: CategoryService=Depends(get_category_service),
+    product_service: ProductService=Depends(get_product_service)
+):
+    """
+    Get category's products' list, paginated by `cursor` seeking `(category_id, name)` index,
+    revalidated by `ETag` or `Last-Modified`.
+    """
+    headers = await conditional_get(request, response, product_service, settings.CACHE_CONTROL_LIST)
+    await category_service.get(id)
+    return schema_response(
+        await product_service.get_category_list(id, query_params), ProductsPaginatedList, headers
+    )
 
 
 @categories_router.post("", response_model=CategoryShowMinimal, status_code=http.HTTPStatus.CREATED)
+# Deadline, write and table version's increment
+@query_budget(3)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_WRITE_SECONDS)
 async def create_category(
     request: Request,
     params: CategoryCreate,
@@ -48,8 +132,24 @@ async def create_category(
     return await category_service.create(params)
 
 
+@categories_router.post(":bulk", response_model=BulkResult)
+@limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_WRITE_SECONDS)
+async def bulk_create_categories(
+    request: Request,
+    params: CategoriesBulkCreate,
+    upsert: bool = Query(False, description="Update existing categories with the same name instead of skipping them."),
+    category_service: CategoryService=Depends(get_category_service)
+):
+    """Create (or upsert) categories in bulk, in a single transaction."""
+    return await category_service.bulk_create(params, upsert)
+
+
 @categories_router.put("/{id}", response_model=CategoryShowMinimal)
+# Deadline, write and table version's increment
+@query_budget(3)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_WRITE_SECONDS)
 async def edit_category(
     request: Request,
     id: UUID, 
@@ -61,7 +161,10 @@ async def edit_category(
 
 
 @categories_router.delete("/{id}", status_code=http.HTTPStatus.NO_CONTENT)
+# Deadline, write and table version's increment
+@query_budget(3)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_WRITE_SECONDS)
 async def delete_category(
     request: Request,
     id: UUID, 
@@ -0,0 +1,58 @@
+"""API's for incremental sync of all tracked entities' changes."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+
+from src.core.config import settings
+from src.dep.services import get_change_service
+from src.model.schema.changes import Change, ChangesQueryParams, ChangesStreamQueryParams
+from src.model.schema.common import ExportFormat
+from src.service.changes import ChangeService
+from src.util.export import export_response
+from src.util.rate_limit import limiter
+from src.util.request_stats import query_budget
+
+changes_router = APIRouter(prefix="/changes", tags=["Changes V1"])
+
+
+@changes_router.get("", response_class=StreamingResponse)
+@limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+async def get_changes_list(
+    request: Request,
+    query_params: ChangesQueryParams=Depends(),
+    change_service: ChangeService=Depends(get_change_service)
+):
+    """
+    Get changes of categories and products after `since` as NDJSON stream ordered by `seq`,
+    gzip-encoded if client accepts it. The last received `seq` is the next request's `since`.
+    Changes of one transaction have the same `seq`, so after broken stream it's the last `seq` before it.
+    """
+    return export_response(
+        request, change_service.get_list(query_params), Change, ExportFormat.ndjson, "changes"
+    )
+
+
+@changes_router.get("/stream", response_class=StreamingResponse)
+# The last final change's number and missed changes, on resume only
+@query_budget(2)
+@limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+async def stream_changes(
+    request: Request,
+    query_params: ChangesStreamQueryParams=Depends(),
+    last_event_id: Optional[int]=Header(None, ge=0, alias="Last-Event-ID"),
+    change_service: ChangeService=Depends(get_change_service)
+):
+    """
+    Subscribe to changes of categories and products as Server-Sent Events: `change` events
+    with changed `entity` and changed instances' `ids` (null - any of them may be changed),
+    `reset` events - everything may be changed. Events' `id` is the `seq`, up to which all changes are sent,
+    the stream resumes after it by `Last-Event-ID` header or `last_event_id` query param.
+    """
+    events = await change_service.subscribe(
+        last_event_id if last_event_id is not None else query_params.last_event_id
+    )
+    return StreamingResponse(
+        events, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,44 +1,106 @@
 """API's for managing products and their related entities (CRUD, etc.)."""
 
 import http
+from typing import Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from src.core.config import settings
 from src.dep.services import get_product_service
+from src.model.schema.common import BulkResult, BatchGet
 from src.model.schema.products import ProductsPaginatedList, ProductsPaginatedListQueryParams, ProductEdit, \
-    ProductCreate, ProductShowMinimal
+    ProductCreate, ProductShowMinimal, ProductShow, ProductsBulkCreate, ProductsExportQueryParams, ProductsBatch
 from src.service.products import ProductService
+from src.util.deadlines import request_deadline
+from src.util.export import export_response
+from src.util.http_cache import conditional_get
 from src.util.rate_limit import limiter
+from src.util.request_stats import query_budget
+from src.util.responses import schema_response
 
 products_router = APIRouter(prefix="/products", tags=["Products V1"])
 
 
-@products_router.get("", response_model=ProductsPaginatedList)
+@products_router.get("", response_model=Union[ProductsPaginatedList, ProductsBatch])
+# Deadline, count, page, page's categories, facets' counts and categories,
+# and tables' versions, if notifications' listener is disconnected
+@query_budget(8)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_READ_SECONDS)
 async def get_products_list(
     request: Request,
+    response: Response,
     query_params: ProductsPaginatedListQueryParams=Depends(),
+    ids: Optional[list[UUID]]=Query(
+        None, max_length=settings.BATCH_GET_MAX_IDS,
+        description="Get products by IDs instead of the list (other params are ignored)."
+    ),
     product_service: ProductService=Depends(get_product_service)
 ):
-    """Get products' list."""
-    return await product_service.get_list(query_params)
+    """
+    Get products' list with their categories, filtered by `category_id` if it's set,
+    with categories' facets if `facets` is set, or products by `ids` in the same order
+    with IDs of not found ones, revalidated by `ETag` or `Last-Modified`.
+    """
+    headers = await conditional_get(request, response, product_service, settings.CACHE_CONTROL_LIST)
+    if ids:
+        return schema_response(await product_service.get_batch(ids), ProductsBatch, headers)
+    return schema_response(await product_service.get_list(query_params), ProductsPaginatedList, headers)
 
 
-@products_router.get("/{id}", response_model=ProductShowMinimal)
+@products_router.post(":batchGet", response_model=ProductsBatch)
+# Deadline, products and their categories missing in detail caches
+@query_budget(3)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_READ_SECONDS)
+async def batch_get_products(
+    request: Request,
+    body: BatchGet,
+    product_service: ProductService=Depends(get_product_service)
+):
+    """
+    Get products with their categories by IDs in the same order with IDs of not found ones,
+    for more IDs than fit in URL.
+    """
+    return schema_response(await product_service.get_batch(body.ids), ProductsBatch)
+
+
+@products_router.get("/export", response_class=StreamingResponse)
+@limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+async def export_products(
+    request: Request,
+    query_params: ProductsExportQueryParams=Depends(),
+    product_service: ProductService=Depends(get_product_service)
+):
+    """Export all products as NDJSON or CSV stream, gzip-encoded if client accepts it."""
+    return export_response(
+        request, product_service.export(query_params), ProductShowMinimal, query_params.format, "products"
+    )
+
+
+@products_router.get("/{id}", response_model=ProductShow)
+# Deadline, instance, it's category and tables' versions, if notifications' listener is disconnected
+@query_budget(5)
+@limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_READ_SECONDS)
 async def get_product(
     request: Request,
+    response: Response,
     id: UUID,
     product_service: ProductService=Depends(get_product_service)
 ):
-    """Get product's profile by their ID."""
-    return await product_service.get(id)
+    """Get product's profile with their category by their ID, revalidated by `ETag` or `Last-Modified`."""
+    headers = await conditional_get(request, response, product_service, settings.CACHE_CONTROL_DETAIL)
+    return schema_response(await product_service.get(id), ProductShow, headers)
 
 
 @products_router.post("", response_model=ProductShowMinimal, status_code=http.HTTPStatus.CREATED)
+# Deadline, write and table version's increment
+@query_budget(3)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_WRITE_SECONDS)
 async def create_product(
     request: Request,
     params: ProductCreate,
@@ -48,8 +110,24 @@ async def create_product(
     return await product_service.create(params)
 
 
+@products_router.post(":bulk", response_model=BulkResult)
+@limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_WRITE_SECONDS)
+async def bulk_create_products(
+    request: Request,
+    params: ProductsBulkCreate,
+    upsert: bool = Query(False, description="Update existing products with the same name instead of skipping them."),
+    product_service: ProductService=Depends(get_product_service)
+):
+    """Create (or upsert) products in bulk, in a single transaction."""
+    return await product_service.bulk_create(params, upsert)
+
+
 @products_router.put("/{id}", response_model=ProductShowMinimal)
+# Deadline, write and table version's increment
+@query_budget(3)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_WRITE_SECONDS)
 async def edit_product(
     request: Request,
     id: UUID, 
@@ -61,7 +139,10 @@ async def edit_product(
 
 
 @products_router.delete("/{id}", status_code=http.HTTPStatus.NO_CONTENT)
+# Deadline, write and table version's increment
+@query_budget(3)
 @limiter.limit(f"{settings.API_REQUEST_LIMIT_PER_MINUTE}/minute")
+@request_deadline(settings.REQUEST_TIMEOUT_WRITE_SECONDS)
 async def delete_product(
     request: Request,
     id: UUID, 
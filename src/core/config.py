@@ -16,6 +16,13 @@ class SystemLanguage(str, Enum):
     ru = 'ru'
 
 
+class StorageBackend(str, Enum):
+    """Possible storages of repositories."""
+    postgres = 'postgres'
+    # Per process, without persistence: for benchmarks and tests without DB
+    memory = 'memory'
+
+
 class Settings(BaseSettings):
     """
     Contains env variables and other app's settings. 
@@ -46,8 +53,88 @@ class Settings(BaseSettings):
     TEST_DATABASE_URL: PostgresDsn
 
     DEBUG: bool = False
+    STORAGE_BACKEND: StorageBackend = StorageBackend.postgres
+    # Serialize GET responses straight to JSON bytes by pydantic-core, skipping FastAPI's
+    # response_model double validation and jsonable_encoder
+    FAST_JSON_RESPONSES: bool = False
+
+    # Per request SQL statements' statistics: `Server-Timing` header and exceeded `query_budget`
+    # failing requests (for tests) instead of logging warnings
+    SERVER_TIMING_HEADER: bool = True
+    QUERY_BUDGETS_STRICT: bool = False
+
+    # Admission control (per worker): in-flight requests' limits of reads and writes adapt to DB latency
+    # between min and max, excess requests wait in queue up to it's timeout, or get 503
+    ADMISSION_CONTROL: bool = True
+    ADMISSION_READS_MAX_IN_FLIGHT: int = 32
+    ADMISSION_WRITES_MAX_IN_FLIGHT: int = 16
+    ADMISSION_MIN_IN_FLIGHT: int = 2
+    ADMISSION_QUEUE_SIZE: int = 64
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 0.5
+    ADMISSION_DB_LATENCY_TARGET_SECONDS: float = 0.05
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # Request deadlines: routes' default timeouts, client may set another one by header, up to max
+    REQUEST_TIMEOUT_HEADER: str = "X-Request-Timeout"
+    REQUEST_TIMEOUT_READ_SECONDS: float = 5.0
+    REQUEST_TIMEOUT_WRITE_SECONDS: float = 10.0
+    REQUEST_TIMEOUT_MAX_SECONDS: float = 30.0
+
+    # How often every worker measures it's event loop lag and updates DB pool metrics
+    METRICS_INTERVAL_SECONDS: float = 1.0
+
+    # DB connection pool (per worker)
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP_CONNECTIONS: int = 2
+    # asyncpg connections
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 - server's default
+    DB_APPLICATION_NAME: str = "simple-shop-api"
+    # Disables prepared statements' caches and startup server settings for PgBouncer in transaction mode
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = False
 
     API_REQUEST_LIMIT_PER_MINUTE: int
+    # Rate limit buckets' file shared by workers (default - in /dev/shm) and it's capacity
+    RATE_LIMIT_BUCKETS_PATH: tp.Optional[str] = None
+    RATE_LIMIT_SLOTS: int = 65_536
+
+    # Estimated counts below this number are recounted exactly,
+    # because planner's statistics are unreliable for small tables/results.
+    LIST_COUNT_ESTIMATE_MIN_ROWS: int = 10_000
+
+    # Per worker cache of instances got by ID, 0 max size disables it.
+    DETAIL_CACHE_MAX_SIZE: int = 10_000
+    DETAIL_CACHE_TTL_SECONDS: float = 60.0
+    # Max items per bulk create/upsert request and batch size since which COPY is used instead of INSERT
+    BULK_MAX_ITEMS: int = 10_000
+    BULK_COPY_MIN_ROWS: int = 1_000
+    # Max IDs per batch get request
+    BATCH_GET_MAX_IDS: int = 500
+
+    # Per worker cache of list results by query params and table's version, 0 disables it
+    LIST_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Max categories in products' list's facets
+    FACETS_MAX_CATEGORIES: int = 20
+    # Categories recounted per transaction by reconciliation of their products' counts
+    COUNTERS_RECONCILE_BATCH_SIZE: int = 1_000
+
+    # `Cache-Control` of GET responses, which are revalidated by `ETag`/`Last-Modified`
+    CACHE_CONTROL_LIST: str = "no-cache"
+    CACHE_CONTROL_DETAIL: str = "no-cache"
+
+    # PostgreSQL NOTIFY channel for changes made by repositories, products' counters triggers
+    # notify the default one (see 0005 migration)
+    CHANGES_NOTIFY_CHANNEL: str = "shop_changes"
+    # Server-Sent Events stream of changes: subscribers per worker, events queued per subscriber
+    # (slower subscribers are disconnected), heartbeat interval and max changes replayed on resume
+    CHANGES_STREAM_MAX_SUBSCRIBERS: int = 10_000
+    CHANGES_STREAM_QUEUE_SIZE: int = 256
+    CHANGES_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    CHANGES_STREAM_RESUME_MAX_CHANGES: int = 1_000
 
     @model_validator(mode='before')
     @classmethod
@@ -0,0 +1 @@
+"""In-memory storage: per process, without persistence. Meant for benchmarks and tests without DB."""
@@ -0,0 +1,628 @@
+import bisect
+import http
+import itertools
+import re
+import typing as tp
+from collections import Counter
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from datetime import datetime, timezone
+from enum import Enum
+from math import ceil
+from typing import Optional, Union
+from uuid import UUID
+
+from fastapi.exceptions import HTTPException
+from sqlalchemy.orm import DeclarativeBase, DeclarativeMeta, InstrumentedAttribute
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from src.db.abstract_repository import AbstractRepository
+from src.db.postgres.repositories import SQLAlchemyEssentialsToGetList
+from src.model.db_entity import Category, Product
+from src.model.schema.changes import ChangedEntity, ChangeOperation
+from src.model.schema.common import PaginatedListQueryParams, ListCountMode, BulkOutcome, ListExportQueryParams
+from src.util.change_feed import ChangeEvent, change_feed
+from src.util.cursor import decode_cursor, encode_cursor
+
+
+WORD_PATTERN = re.compile(r"\w+")
+MAX_UUID = UUID(int=(1 << 128) - 1)
+# Shared by all storages, like DB's sequence, which starts from 2, because existing rows got 1
+CHANGE_SEQUENCE = itertools.count(2)
+
+
+def get_trigrams(value: str) -> set[str]:
+    """Returns lowercased words' trigrams, padded the same way as pg_trgm does."""
+    trigrams = set()
+    for word in WORD_PATTERN.findall(value.lower()):
+        padded_word = f"  {word} "
+        trigrams.update(padded_word[i:i + 3] for i in range(len(padded_word) - 2))
+    return trigrams
+
+
+def word_similarity(search_str: str, value: str) -> float:
+    """
+    Approximates pg_trgm's `word_similarity`: share of `search_str` trigrams found in `value`.
+    pg_trgm takes them from the best matching extent of `value`, so it may be lower.
+    """
+    search_trigrams = get_trigrams(search_str)
+    if not search_trigrams:
+        return 0.0
+    return len(search_trigrams & get_trigrams(value)) / len(search_trigrams)
+
+
+@dataclass
+class InMemoryStorage:
+    """
+    Entity's instances by ID with unique sorted index on name, storage's change version
+    and tombstones of deleted instances. Changes are published to changes' stream subscribers.
+    Instances are replaced on update, not mutated, so instances already returned stay unchanged.
+    """
+    entity: Optional[ChangedEntity] = None
+    instances: dict[UUID, DeclarativeBase] = field(default_factory=dict)
+    ids_by_name: dict[str, UUID] = field(default_factory=dict)
+    # Sorted `(name, id)` pairs
+    name_index: list[tuple[str, UUID]] = field(default_factory=list)
+    version: int = 0
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    # `(change_seq, instance_id, deleted_at)` in order of deletion
+    tombstones: list[tuple[int, UUID, datetime]] = field(default_factory=list)
+    # The newest change sequence number of instances and tombstones
+    last_change_seq: int = 0
+
+    def add(self, instance: DeclarativeBase):
+        self.last_change_seq = max(self.last_change_seq, instance.change_seq)
+        self.instances[instance.id] = instance
+        self.ids_by_name[instance.name] = instance.id
+        bisect.insort(self.name_index, (instance.name, instance.id))
+
+    def remove(self, instance_id: UUID) -> DeclarativeBase:
+        instance = self.instances.pop(instance_id)
+        del self.ids_by_name[instance.name]
+        del self.name_index[bisect.bisect_left(self.name_index, (instance.name, instance.id))]
+        return instance
+
+    def record_change(self):
+        self.version += 1
+        self.updated_at = datetime.now(timezone.utc)
+        if self.entity is not None:
+            change_feed.publish(ChangeEvent(
+                "change", {"entity": self.entity.value, "version": self.version, "ids": None}, self.last_change_seq
+            ))
+
+    def add_tombstone(self, instance_id: UUID, change_seq: int):
+        self.tombstones.append((change_seq, instance_id, datetime.now(timezone.utc)))
+        self.last_change_seq = change_seq
+
+    def clear(self):
+        self.instances.clear()
+        self.ids_by_name.clear()
+        self.name_index.clear()
+        self.tombstones.clear()
+        self.record_change()
+
+
+class InMemoryRepository(AbstractRepository):
+    """
+    Interface for working with in-memory storage, with the same semantics as `SQLAlchemyRepository`,
+    except that changes are applied immediately (`save` does nothing) and aren't shared between processes.
+    Names are unique and sorted by code points (like PostgreSQL's "C" collation).
+    """
+
+    DBModel: DeclarativeMeta
+    storage: InMemoryStorage
+    name_taken_detail: str = "Name is already taken."
+    # Foreign keys by their column's key: `(referenced storage, detail of 400 response if it's missing)`
+    foreign_keys: dict[str, tuple[InMemoryStorage, str]] = {}
+    # Other storages' foreign keys, restricting deletion: `(storage, column's key, detail of 400 response)`
+    referencing_keys: list[tuple[InMemoryStorage, str, str]] = []
+    # Counters of other storages' instances referencing this storage's ones, which start from 0
+    counter_keys: tuple[str, ...] = ()
+    # Foreign keys, which referenced instances count: column's key -> referenced instance's counter key
+    counted_foreign_keys: dict[str, str] = {}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def _build_instance(self, attrs: dict[str, tp.Any]) -> DeclarativeBase:
+        """Builds transient instance with python-side column defaults (like `id`) for missing values."""
+        attrs = dict(attrs)
+        for column_attr in self.DBModel.__table__.columns:
+            default = column_attr.default
+            if column_attr.key in attrs or default is None or not (default.is_scalar or default.is_callable):
+                continue
+            attrs[column_attr.key] = default.arg(None) if default.is_callable else default.arg
+        for counter_key in self.counter_keys:
+            attrs.setdefault(counter_key, 0)
+        attrs.update(self._get_change_attrs())
+        attrs.setdefault("created_at", attrs["updated_at"])
+        return self.DBModel(**attrs)
+
+    @staticmethod
+    def _get_change_attrs() -> dict[str, tp.Any]:
+        """Returns change tracking columns' values of created or updated instance, like DB's defaults and triggers."""
+        return {"updated_at": datetime.now(timezone.utc), "change_seq": next(CHANGE_SEQUENCE)}
+
+    @staticmethod
+    def _copy_instance(instance: DeclarativeBase, **attrs) -> DeclarativeBase:
+        """Returns instance's copy with updated column attrs."""
+        columns_attrs = {
+            column_attr.key: getattr(instance, column_attr.key) for column_attr in instance.__table__.columns
+        }
+        columns_attrs.update(attrs)
+        return type(instance)(**columns_attrs)
+
+    def _count_references(self, old_instance: Optional[DeclarativeBase], new_instance: Optional[DeclarativeBase]):
+        """
+        Applies instance's foreign keys' change to referenced instances' counters,
+        like DB's triggers do, and records referenced storages' change.
+        """
+        for key, counter_key in self.counted_foreign_keys.items():
+            old_referenced_id = getattr(old_instance, key) if old_instance is not None else None
+            new_referenced_id = getattr(new_instance, key) if new_instance is not None else None
+            if old_referenced_id == new_referenced_id:
+                continue
+            referenced_storage, _ = self.foreign_keys[key]
+            for referenced_id, delta in ((old_referenced_id, -1), (new_referenced_id, 1)):
+                referenced_instance = referenced_storage.instances.get(referenced_id)
+                if referenced_instance is None:
+                    continue
+                referenced_storage.remove(referenced_id)
+                referenced_storage.add(self._copy_instance(
+                    referenced_instance,
+                    **{counter_key: getattr(referenced_instance, counter_key) + delta},
+                    **self._get_change_attrs()
+                ))
+            referenced_storage.record_change()
+
+    def _check_name_is_free(self, name: str, instance_id: Optional[UUID] = None):
+        owner_id = self.storage.ids_by_name.get(name)
+        if owner_id is not None and owner_id != instance_id:
+            raise HTTPException(http.HTTPStatus.BAD_REQUEST, self.name_taken_detail)
+
+    def _check_foreign_keys(self, *rows: dict[str, tp.Any]):
+        for key, (referenced_storage, detail) in self.foreign_keys.items():
+            for row in rows:
+                if row.get(key) is not None and row[key] not in referenced_storage.instances:
+                    raise HTTPException(http.HTTPStatus.BAD_REQUEST, detail)
+
+    def _check_is_not_referenced(self, instance_id: UUID):
+        for referencing_storage, key, detail in self.referencing_keys:
+            if any(getattr(instance, key) == instance_id for instance in referencing_storage.instances.values()):
+                raise HTTPException(http.HTTPStatus.BAD_REQUEST, detail)
+
+    def _load_relationships(
+            self,
+            instances: list[DeclarativeBase],
+            relationships: Optional[list[InstrumentedAttribute]]
+    ) -> list[DeclarativeBase]:
+        """Returns instances' copies with related instances set, like `selectinload` does."""
+        if not relationships:
+            return instances
+        loaded_instances = []
+        for instance in instances:
+            related_instances = {}
+            for relationship in relationships:
+                foreign_key_column, = relationship.property.local_columns
+                related_storage, _ = self.foreign_keys[foreign_key_column.key]
+                related_instances[relationship.key] = related_storage.instances.get(
+                    getattr(instance, foreign_key_column.key)
+                )
+            loaded_instances.append(self._copy_instance(instance, **related_instances))
+        return loaded_instances
+
+    async def create(self, **attrs):
+        instance = self._build_instance(attrs)
+        self._check_name_is_free(instance.name)
+        self._check_foreign_keys(attrs)
+        self.storage.add(instance)
+        self.storage.record_change()
+        self._count_references(None, instance)
+        return instance
+
+    async def update(self, instance_id: UUID, **attrs):
+        """Replaces instance by updated copy, returns it or None if it doesn't exist."""
+        instance = self.storage.instances.get(instance_id)
+        if instance is None:
+            return None
+        updated_attrs = {
+            column_attr.key: getattr(instance, column_attr.key) for column_attr in self.DBModel.__table__.columns
+        }
+        updated_attrs.update(attrs)
+        updated_attrs.update(self._get_change_attrs())
+        self._check_name_is_free(updated_attrs["name"], instance_id)
+        self._check_foreign_keys(updated_attrs)
+        updated_instance = self.DBModel(**updated_attrs)
+        self.storage.remove(instance_id)
+        self.storage.add(updated_instance)
+        self.storage.record_change()
+        self._count_references(instance, updated_instance)
+        return updated_instance
+
+    async def delete(self, instance_id: UUID) -> Optional[UUID]:
+        """Deletes instance, returns it's ID or None if it didn't exist."""
+        if instance_id not in self.storage.instances:
+            return None
+        self._check_is_not_referenced(instance_id)
+        deleted_instance = self.storage.remove(instance_id)
+        self.storage.add_tombstone(instance_id, next(CHANGE_SEQUENCE))
+        self.storage.record_change()
+        self._count_references(deleted_instance, None)
+        return instance_id
+
+    async def bulk_create(
+            self,
+            rows: list[dict[str, tp.Any]],
+            conflict_attr: str = "name"
+    ) -> list[tuple[Optional[UUID], BulkOutcome]]:
+        """
+        Inserts rows, skipping ones which `conflict_attr` value is already taken.
+        Returns `(id, outcome)` for every row in the same order.
+        """
+        return await self._bulk_insert(rows, conflict_attr, upsert=False)
+
+    async def bulk_upsert(
+            self,
+            rows: list[dict[str, tp.Any]],
+            conflict_attr: str = "name"
+    ) -> list[tuple[Optional[UUID], BulkOutcome]]:
+        """
+        Inserts rows, updating existing ones with the same `conflict_attr` value.
+        Returns `(id, outcome)` for every row in the same order.
+        """
+        return await self._bulk_insert(rows, conflict_attr, upsert=True)
+
+    async def _bulk_insert(
+            self,
+            rows: list[dict[str, tp.Any]],
+            conflict_attr: str,
+            upsert: bool
+    ) -> list[tuple[Optional[UUID], BulkOutcome]]:
+        """Rows repeating `conflict_attr` value of previous rows are skipped as duplicates, like in DB."""
+        if conflict_attr != "name":
+            raise ValueError("In-memory storage has unique index on name only.")
+        # Whole bulk fails, like DB's transaction
+        self._check_foreign_keys(*rows)
+        outcomes: list[tuple[Optional[UUID], BulkOutcome]] = []
+        seen_names: set[str] = set()
+        for row in rows:
+            name = row[conflict_attr]
+            if name in seen_names:
+                outcomes.append((None, BulkOutcome.duplicate))
+                continue
+            seen_names.add(name)
+            existing_id = self.storage.ids_by_name.get(name)
+            if existing_id is None:
+                instance = self._build_instance(row)
+                self.storage.add(instance)
+                self._count_references(None, instance)
+                outcomes.append((instance.id, BulkOutcome.created))
+            elif upsert:
+                # Replaced in place, like created ones, so the whole bulk is recorded as one change
+                instance = self.storage.instances[existing_id]
+                updated_instance = self._copy_instance(
+                    instance, **{key: value for key, value in row.items() if key != "id"}, **self._get_change_attrs()
+                )
+                self.storage.remove(existing_id)
+                self.storage.add(updated_instance)
+                self._count_references(instance, updated_instance)
+                outcomes.append((existing_id, BulkOutcome.updated))
+            else:
+                outcomes.append((None, BulkOutcome.conflict))
+        if any(outcome in (BulkOutcome.created, BulkOutcome.updated) for _, outcome in outcomes):
+            self.storage.record_change()
+        return outcomes
+
+    async def get(
+            self,
+            instance_id: Optional[UUID] = None,
+            relationships_to_load: tp.Sequence[tp.Any] = None,
+            **attrs
+    ):
+        if instance_id is not None:
+            instance = self.storage.instances.get(instance_id)
+            if instance is None or any(getattr(instance, key) != value for key, value in attrs.items()):
+                return None
+            return instance
+        if set(attrs) == {"name"}:
+            return self.storage.instances.get(self.storage.ids_by_name.get(attrs["name"]))
+        for instance in self.storage.instances.values():
+            if all(getattr(instance, key) == value for key, value in attrs.items()):
+                return instance
+        return None
+
+    async def get_row(self, instance_id: UUID, use_cache: bool = True):
+        """Returns instance or None, instances are immutable, so they serve as rows."""
+        return self.storage.instances.get(instance_id)
+
+    async def get_rows(self, instance_ids: tp.Sequence[UUID], use_cache: bool = True) -> list[DeclarativeBase]:
+        """Returns existing instances, repeated IDs once."""
+        return [
+            self.storage.instances[instance_id] for instance_id in dict.fromkeys(instance_ids)
+            if instance_id in self.storage.instances
+        ]
+
+    async def get_version(self) -> tuple[int, datetime]:
+        """Returns storage's change version and time of it's last change."""
+        return self.storage.version, self.storage.updated_at
+
+    def _get_order_keys(
+            self,
+            ordering: Enum,
+            order_expressions: dict[Enum, list[UnaryExpression]]
+    ) -> list[tuple[str, bool]]:
+        """
+        Returns ordering's `(attribute's key, is descending)` pairs with `id` tiebreaker
+        (in direction of the last one), like `SQLAlchemyRepository._get_order_expressions`.
+        """
+        order_keys = [
+            (expression.element.key, expression.modifier is operators.desc_op)
+            for expression in order_expressions[ordering]
+        ]
+        if not any(key == "id" for key, _ in order_keys):
+            order_keys.append(("id", order_keys[-1][1] if order_keys else False))
+        return order_keys
+
+    def _iterate_ordered(
+            self,
+            order_keys: list[tuple[str, bool]],
+            after_values: Optional[list[tp.Any]] = None
+    ) -> tp.Iterator[DeclarativeBase]:
+        """
+        Iterates instances in order of `order_keys`, placed after `after_values` if they're set.
+        Ordering by name is served by name index, others are sorted.
+        """
+        if order_keys[0][0] == "name":
+            is_desc = order_keys[0][1]
+            name_index = self.storage.name_index
+            if after_values is None:
+                positions = range(len(name_index) - 1, -1, -1) if is_desc else range(len(name_index))
+            elif is_desc:
+                positions = range(bisect.bisect_left(name_index, (after_values[0],)) - 1, -1, -1)
+            else:
+                positions = range(bisect.bisect_right(name_index, (after_values[0], MAX_UUID)), len(name_index))
+            # Index may change between awaits of the consumer, so it's copied for iteration
+            ids = [name_index[position][1] for position in positions]
+            return (self.storage.instances[instance_id] for instance_id in ids)
+
+        instances = list(self.storage.instances.values())
+        for key, is_desc in reversed(order_keys):
+            instances.sort(key=lambda instance: getattr(instance, key), reverse=is_desc)
+        if after_values is not None:
+            instances = [
+                instance for instance in instances if self._is_after(instance, order_keys, after_values)
+            ]
+        return iter(instances)
+
+    @staticmethod
+    def _is_after(instance: DeclarativeBase, order_keys: list[tuple[str, bool]], values: list[tp.Any]) -> bool:
+        for (key, is_desc), value in zip(order_keys, values):
+            instance_value = getattr(instance, key)
+            if instance_value != value:
+                return instance_value < value if is_desc else instance_value > value
+        return False
+
+    @staticmethod
+    def _matches_search(instance: DeclarativeBase, search_words: list[str], search_attrs: list[str]) -> bool:
+        return any(
+            word in str(getattr(instance, attr)).lower() for word in search_words for attr in search_attrs
+        )
+
+    @staticmethod
+    def _matches_filters(instance: DeclarativeBase, filters: dict[str, list[tp.Any]]) -> bool:
+        return all(getattr(instance, attr) in values for attr, values in filters.items())
+
+    def _decode_cursor(
+            self,
+            cursor: str,
+            ordering: Enum,
+            order_keys: list[tuple[str, bool]]
+    ) -> list[tp.Any]:
+        try:
+            keyset_values = decode_cursor(cursor, ordering)
+            if len(keyset_values) != len(order_keys):
+                raise ValueError("Cursor doesn't match list's ordering.")
+            return [
+                self.DBModel.__table__.columns[key].type.python_type(value) if value is not None else None
+                for (key, _), value in zip(order_keys, keyset_values)
+            ]
+        except (ValueError, TypeError) as e:
+            raise HTTPException(http.HTTPStatus.BAD_REQUEST, f"Invalid cursor: {e}")
+
+    @staticmethod
+    def _is_ranked(
+            query_params: Union[PaginatedListQueryParams, ListExportQueryParams],
+            essentials: SQLAlchemyEssentialsToGetList
+    ) -> bool:
+        """Checks whether list is ordered by search relevance."""
+        return bool(
+            query_params.search and essentials.search_attrs and essentials.relevance_ordering is not None
+            and query_params.ordering == essentials.relevance_ordering
+        )
+
+    def _build_list(
+            self,
+            query_params: Union[PaginatedListQueryParams, ListExportQueryParams],
+            essentials: SQLAlchemyEssentialsToGetList,
+            after_values: Optional[list[tp.Any]] = None
+    ) -> tp.Tuple[tp.Iterator[DeclarativeBase], bool]:
+        """
+        Returns iterator over ordered, searched and filtered list, and whether it's ordered by relevance.
+        Relevance ordered list is sorted by relevance first, then by ordering's keys.
+        """
+        order_keys = self._get_order_keys(query_params.ordering, essentials.order_expressions)
+        instances = self._iterate_ordered(order_keys, after_values)
+        is_ranked = self._is_ranked(query_params, essentials)
+        if query_params.search and essentials.search_attrs:
+            search_attrs = [attr.key for attr in essentials.search_attrs]
+            search_words = query_params.search.lower().split()
+            instances = (
+                instance for instance in instances if self._matches_search(instance, search_words, search_attrs)
+            )
+            if is_ranked:
+                search_str = " ".join(search_words)
+                instances = iter(sorted(instances, key=lambda instance: -max(
+                    word_similarity(search_str, str(getattr(instance, attr))) for attr in search_attrs
+                )))
+        if essentials.column_filter_attrs:
+            query_params_data = query_params.model_dump()
+            filters = {
+                filter_attr.key: query_params_data[filter]
+                for filter, filter_attr in essentials.column_filter_attrs.items()
+                if query_params_data.get(filter) is not None
+            }
+            if filters:
+                instances = (instance for instance in instances if self._matches_filters(instance, filters))
+        return instances, is_ranked
+
+    async def get_list(
+            self,
+            query_params: PaginatedListQueryParams,
+            essentials: SQLAlchemyEssentialsToGetList
+    ) -> tp.Tuple[list, Optional[int], Optional[int], Optional[str]]:
+        """Returns tuple: `(list_content, total_pages, total_items, next_cursor)`, like `SQLAlchemyRepository`."""
+        order_keys = self._get_order_keys(query_params.ordering, essentials.order_expressions)
+        if query_params.cursor and self._is_ranked(query_params, essentials):
+            raise HTTPException(http.HTTPStatus.BAD_REQUEST, "Cursor pagination isn't supported for relevance ordering.")
+        after_values = None
+        if query_params.cursor:
+            after_values = self._decode_cursor(query_params.cursor, query_params.ordering, order_keys)
+
+        total_items: Optional[int] = None
+        total_pages: Optional[int] = None
+        if query_params.get_count_mode() != ListCountMode.none:
+            # Counted list doesn't depend on cursor
+            counted_instances, _ = self._build_list(query_params, essentials)
+            total_items = sum(1 for _ in counted_instances)
+            total_pages = ceil(total_items / query_params.page_size)
+
+        instances, is_ranked = self._build_list(query_params, essentials, after_values)
+        offset = 0 if query_params.cursor else (query_params.page_number - 1) * query_params.page_size
+        # One extra instance shows whether there is the next page
+        list_content = list(itertools.islice(instances, offset, offset + query_params.page_size + 1))
+        next_cursor: Optional[str] = None
+        if len(list_content) > query_params.page_size:
+            list_content = list_content[:query_params.page_size]
+            if not is_ranked:
+                next_cursor = encode_cursor(
+                    query_params.ordering, [getattr(list_content[-1], key) for key, _ in order_keys]
+                )
+        list_content = self._load_relationships(list_content, essentials.relationships_to_load)
+        return list_content, total_pages, total_items, next_cursor
+
+    async def count_list_by(
+            self,
+            query_params: PaginatedListQueryParams,
+            essentials: SQLAlchemyEssentialsToGetList,
+            group_attr: InstrumentedAttribute,
+            limit: int
+    ) -> list[tuple[tp.Any, int]]:
+        """Returns `limit` most numerous `(value, count)` pairs of list's instances' `group_attr` values."""
+        instances, _ = self._build_list(query_params, essentials)
+        counts = Counter(
+            getattr(instance, group_attr.key) for instance in instances
+            if getattr(instance, group_attr.key) is not None
+        )
+        return sorted(counts.items(), key=lambda value_count: (-value_count[1], value_count[0]))[:limit]
+
+    async def stream_list(
+            self,
+            query_params: ListExportQueryParams,
+            essentials: SQLAlchemyEssentialsToGetList,
+            batch_size: int = 1000
+    ) -> tp.AsyncIterator:
+        """Yields all instances of ordered, searched and filtered list."""
+        instances, _ = self._build_list(query_params, essentials)
+        for instance in instances:
+            yield instance
+
+    async def save(self, *args, **kwargs):
+        """Changes are already applied."""
+
+
+
+class CategoryInMemoryRepository(InMemoryRepository):
+    DBModel = Category
+    storage = InMemoryStorage(entity=ChangedEntity.category)
+    counter_keys = ("product_count",)
+
+
+class ProductInMemoryRepository(InMemoryRepository):
+    DBModel = Product
+    storage = InMemoryStorage(entity=ChangedEntity.product)
+    foreign_keys = {"category_id": (CategoryInMemoryRepository.storage, "Category was not found.")}
+    counted_foreign_keys = {"category_id": "product_count"}
+
+
+CategoryInMemoryRepository.referencing_keys = [
+    (ProductInMemoryRepository.storage, "category_id", "Category has products.")
+]
+
+
+class InMemoryChangesRepository:
+    """
+    Interface for reading changes of all in-memory storages, like `ChangesSQLAlchemyRepository`.
+    Every write is applied at once, so all changes are final and their `seq` is change sequence number.
+    """
+
+    tracked_repositories: tuple[type[InMemoryRepository], ...] = (
+        CategoryInMemoryRepository, ProductInMemoryRepository
+    )
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def stream_changes(self, since: int, batch_size: int = 1000) -> tp.AsyncIterator[dict[str, tp.Any]]:
+        """Yields changes after `since` change sequence number in their order."""
+        changes = []
+        for repository in self.tracked_repositories:
+            entity = repository.storage.entity
+            columns = [column_attr.key for column_attr in repository.DBModel.__table__.columns]
+            for instance in list(repository.storage.instances.values()):
+                if instance.change_seq <= since:
+                    continue
+                changes.append({
+                    "seq": instance.change_seq,
+                    "entity": entity,
+                    "operation": ChangeOperation.upsert,
+                    "id": instance.id,
+                    "changed_at": instance.updated_at,
+                    "data": {
+                        key: getattr(instance, key) for key in columns if key not in ("change_seq", "change_xid")
+                    },
+                })
+            changes.extend(
+                {
+                    "seq": change_seq,
+                    "entity": entity,
+                    "operation": ChangeOperation.delete,
+                    "id": instance_id,
+                    "changed_at": deleted_at,
+                    "data": None,
+                }
+                for change_seq, instance_id, deleted_at in repository.storage.tombstones
+                if change_seq > since
+            )
+        changes.sort(key=lambda change: change["seq"])
+        for change in changes:
+            yield change
+
+    async def get_changed_ids(self, since: int, limit: int) -> list[tp.Any]:
+        """Returns `(seq, entity, id)` of the first `limit` changes after `since` change sequence number."""
+        changed_ids = []
+        async for change in self.stream_changes(since):
+            if len(changed_ids) == limit:
+                break
+            changed_ids.append(SimpleNamespace(seq=change["seq"], entity=change["entity"].value, id=change["id"]))
+        return changed_ids
+
+    async def get_last_seq(self) -> int:
+        """Returns the newest change sequence number."""
+        return max(repository.storage.last_change_seq for repository in self.tracked_repositories)
+
+
+def clear_storages():
+    """Removes all instances from all in-memory storages."""
+    for repository in (CategoryInMemoryRepository, ProductInMemoryRepository):
+        repository.storage.clear()
@@ -5,9 +5,14 @@ from sqlalchemy.orm import declarative_base, DeclarativeBase
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from src.core.config import settings
+from src.db.postgres.deadlines import register_deadline_hooks
+from src.db.postgres.instrumentation import instrument_engine
+from src.db.postgres.pool import get_engine_options
 
 
-engine = create_async_engine(settings.DATABASE_URL.unicode_string())
+engine = create_async_engine(settings.DATABASE_URL.unicode_string(), **get_engine_options(settings))
+instrument_engine(engine)
+register_deadline_hooks()
 async_session = async_sessionmaker(
   engine, autocommit=False, autoflush=False, class_=AsyncSession, expire_on_commit=False
 )
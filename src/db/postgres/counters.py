@@ -0,0 +1,56 @@
+"""
+Reconciliation of counters maintained by triggers with actual rows, repairs drift after
+manual changes (e.g. `TRUNCATE`, which doesn't fire row changes' triggers) or restored backups.
+Usage (e.g. by cron): `python -m src.db.postgres.counters`.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from src.core.config import settings
+from src.db.postgres import async_session, engine
+from src.db.postgres.repositories import CategorySQLAlchemyRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_product_counts(batch_size: int) -> int:
+    """
+    Recounts products of all categories by batches, every batch in it's own short transaction,
+    so writes are blocked only for categories being recounted. Returns number of repaired categories.
+    """
+    repaired_number = 0
+    after_id = None
+    while True:
+        async with async_session() as session:
+            repository = CategorySQLAlchemyRepository(session)
+            after_id, batch_repaired_number = await repository.reconcile_product_counts(after_id, batch_size)
+            await repository.save()
+        repaired_number += batch_repaired_number
+        if after_id is None:
+            return repaired_number
+
+
+async def run(batch_size: int):
+    try:
+        repaired_number = await reconcile_product_counts(batch_size)
+        logger.info(f"Categories' product counts reconciled, {repaired_number} repaired")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.COUNTERS_RECONCILE_BATCH_SIZE,
+        help="Categories recounted per transaction."
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Propagation of request's deadline to PostgreSQL as transaction's `statement_timeout`."""
+
+import math
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.util.deadlines import get_remaining_seconds
+
+
+def _set_statement_timeout(session, transaction, connection):
+    remaining_seconds = get_remaining_seconds()
+    if remaining_seconds is None:
+        return
+    # 0 disables the timeout, so expired deadline is at least 1 ms and the first statement fails
+    timeout_ms = max(1, math.ceil(remaining_seconds * 1000))
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
+def register_deadline_hooks():
+    """
+    Limits every session's transaction begun under request's deadline by the time left to it.
+    Statements exceeding it are cancelled by PostgreSQL with `QueryCanceledError`.
+    """
+    if not event.contains(Session, "after_begin", _set_statement_timeout):
+        event.listen(Session, "after_begin", _set_statement_timeout)
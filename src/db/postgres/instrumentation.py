@@ -0,0 +1,43 @@
+"""Engine's event hooks, which add SQL statements' count and execution time to current request's statistics."""
+
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.util.request_stats import current_request_stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.request_stats_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request_stats.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    started_at = getattr(context, "request_stats_started_at", None)
+    if started_at is not None:
+        stats.db_seconds += time.perf_counter() - started_at
+
+
+def _handle_error(exception_context):
+    # Failed statements have no `after_cursor_execute`, but still count
+    stats = current_request_stats.get()
+    if stats is None or exception_context.execution_context is None:
+        return
+    stats.statements += 1
+    started_at = getattr(exception_context.execution_context, "request_stats_started_at", None)
+    if started_at is not None:
+        stats.db_seconds += time.perf_counter() - started_at
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Registers statistics' hooks on engine. Async engine's events are listened on it's sync engine."""
+    sync_engine: Engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
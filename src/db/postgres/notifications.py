@@ -0,0 +1,110 @@
+"""
+PostgreSQL LISTEN/NOTIFY listener.
+Every worker keeps one dedicated connection, which listens to all subscribed channels
+and dispatches notifications to subscribers' callbacks.
+"""
+
+import asyncio
+import logging
+import typing as tp
+from collections import defaultdict
+
+import asyncpg
+
+from src.core.config import settings
+
+
+NotificationCallback = tp.Callable[[str], tp.Any]
+ReconnectCallback = tp.Callable[[], tp.Any]
+
+
+class NotificationListener:
+    """
+    Listens to PostgreSQL notifications on a dedicated connection and reconnects on it's loss.
+    Notifications sent while listener is disconnected are lost, so `on_reconnect`
+    callbacks are called after every (re)connection to resynchronize subscribers' state.
+    """
+
+    def __init__(self, dsn: str, reconnect_delay_seconds: float = 1.0):
+        self.dsn = dsn
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self._callbacks: dict[str, list[NotificationCallback]] = defaultdict(list)
+        self._reconnect_callbacks: list[ReconnectCallback] = []
+        self._connection: tp.Optional[asyncpg.Connection] = None
+        self._connection_lost = asyncio.Event()
+        self._task: tp.Optional[asyncio.Task] = None
+
+    @property
+    def is_listening(self) -> bool:
+        """Whether notifications are being received right now."""
+        return self._connection is not None and not self._connection.is_closed()
+
+    def subscribe(
+            self,
+            channel: str,
+            callback: NotificationCallback,
+            on_reconnect: tp.Optional[ReconnectCallback] = None
+    ):
+        """
+        Subscribes `callback(payload)` to `channel`'s notifications.
+        Must be called before `start`.
+        """
+        self._callbacks[channel].append(callback)
+        if on_reconnect is not None:
+            self._reconnect_callbacks.append(on_reconnect)
+
+    async def start(self):
+        """Starts listening in background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self):
+        """Stops listening and closes connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_connection()
+
+    async def _listen_forever(self):
+        while True:
+            try:
+                await self._connect()
+                await self._connection_lost.wait()
+                logging.warning("Notifications listener lost connection, reconnecting...")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logging.error(f"ERROR connecting notifications listener: {e}")
+            await self._close_connection()
+            await asyncio.sleep(self.reconnect_delay_seconds)
+
+    async def _connect(self):
+        self._connection_lost.clear()
+        self._connection = await asyncpg.connect(self.dsn)
+        self._connection.add_termination_listener(lambda connection: self._connection_lost.set())
+        for channel in self._callbacks:
+            await self._connection.add_listener(channel, self._dispatch)
+        for callback in self._reconnect_callbacks:
+            callback()
+
+    async def _close_connection(self):
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            try:
+                await connection.close(timeout=self.reconnect_delay_seconds)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                connection.terminate()
+
+    def _dispatch(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str):
+        for callback in self._callbacks[channel]:
+            try:
+                callback(payload)
+            except Exception as e:
+                logging.exception(f"ERROR handling notification on {channel}: {e}")
+
+
+notification_listener = NotificationListener(
+    settings.DATABASE_URL.unicode_string().replace("postgresql+asyncpg://", "postgresql://", 1)
+)
@@ -0,0 +1,116 @@
+"""Connection pool of PostgreSQL engine: it's settings, warm-up and statistics."""
+
+import asyncio
+import logging
+import time
+import typing as tp
+from contextlib import AsyncExitStack
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.core.config import Settings
+from src.util.request_stats import current_request_stats
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool, which measures how long connections' checkouts wait for a free connection
+    (including connecting of new ones) and counts checkout timeouts.
+    Wait time is also added to current request's statistics.
+    """
+
+    checkouts: int = 0
+    checkout_timeouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            wait_seconds = time.perf_counter() - started_at
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            request_stats = current_request_stats.get()
+            if request_stats is not None:
+                request_stats.pool_wait_seconds += wait_seconds
+
+
+def _pgbouncer_prepared_statement_name() -> str:
+    # Unique names, because prepared statements can't be shared between PgBouncer's server connections
+    return f"__asyncpg_{uuid4()}__"
+
+
+def get_engine_options(settings: Settings) -> dict[str, tp.Any]:
+    """
+    Returns `create_async_engine` keyword arguments for pool and asyncpg connections by settings.
+    PgBouncer transaction mode profile disables prepared statements' caches
+    and startup server settings, which are not supported there.
+    """
+    connect_args: dict[str, tp.Any] = {}
+    if settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = _pgbouncer_prepared_statement_name
+    else:
+        connect_args["prepared_statement_cache_size"] = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+        server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        connect_args["server_settings"] = server_settings
+
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+async def warm_up_pool(engine: AsyncEngine, connections_number: int):
+    """
+    Opens `connections_number` pool's connections concurrently and returns them to the pool,
+    so the first requests don't pay connecting cost. Failures are only logged.
+    """
+    if connections_number <= 0:
+        return
+    try:
+        async with AsyncExitStack() as stack:
+            connections = await asyncio.gather(
+                *(stack.enter_async_context(engine.connect()) for _ in range(connections_number))
+            )
+            await asyncio.gather(*(connection.execute(text("SELECT 1")) for connection in connections))
+        logging.info(f"Warmed up {connections_number} DB pool connections")
+    except Exception as e:
+        logging.warning(f"Failed to warm up DB pool: {e}")
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict[str, tp.Union[int, float]]:
+    """Returns pool's utilisation and checkouts' wait time statistics."""
+    pool = engine.sync_engine.pool
+    stats: dict[str, tp.Union[int, float]] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, InstrumentedAsyncAdaptedQueuePool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "checkout_timeouts": pool.checkout_timeouts,
+            "total_wait_seconds": pool.total_wait_seconds,
+            "max_wait_seconds": pool.max_wait_seconds,
+        })
+    return stats
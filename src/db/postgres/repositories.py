@@ -1,31 +1,93 @@
 import http
+import json
 import logging
 import typing as tp
 from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from enum import Enum
 from math import ceil
 from typing import Optional, Union
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import asyncpg
 from fastapi.exceptions import HTTPException
-from sqlalchemy import select, update, delete, Select, func, or_
+from sqlalchemy import (
+    select, update, delete, insert, Select, func, or_, and_, text, tuple_, literal, literal_column, table, column,
+    union_all, case, cast, null, type_coerce, CompoundSelect, any_, bindparam, BigInteger, Text
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, insert as pg_insert
+from sqlalchemy.engine import Row
 from sqlalchemy.engine.result import ChunkedIteratorResult
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import InterfaceError
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import (
     DeclarativeMeta, DeclarativeBase, InstrumentedAttribute,
     selectinload, Relationship
 )
-from sqlalchemy.sql.elements import UnaryExpression
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import ColumnElement, UnaryExpression
 
+from src.core.config import settings
 from src.db.abstract_repository import AbstractRepository
-from src.model.schema.common import PaginatedListQueryParams
+from src.db.postgres.constructs import Explain
+from src.db.postgres.notifications import notification_listener
+from src.model.schema.changes import ChangedEntity, ChangeOperation
+from src.model.schema.common import PaginatedListQueryParams, ListCountMode, BulkOutcome, ListExportQueryParams
+from src.util.cache import LRUTTLCache, MISSING, SizedLRUCache
+from src.util.change_feed import ChangeEvent, change_feed
+from src.util.cursor import decode_cursor, encode_cursor
+from src.util.metrics import DB_ERRORS_TOTAL
+
+from src.model.db_entity import Category, Product, TableVersion, Tombstone
+
+
+DB_ERRORS = (ConnectionError, DBAPIError, asyncpg.PostgresError)
+
+# PostgreSQL limit of bind params per statement
+MAX_BIND_PARAMS = 32_767
+MAX_INSERT_BATCH_ROWS = 1_000
+
+# NOTIFY payload is limited by 8000 bytes, bigger changes are notified as the whole table's change
+MAX_NOTIFIED_IDS = 100
+
+# The oldest running transaction's ID in statement's snapshot: all transactions below it are finished,
+# so their changes, which are ordered by their transaction's ID (see `CHANGE_XID_DEFAULT`), are final
+SNAPSHOT_XMIN = cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
 
-from src.model.db_entity import Category, Product
 
+# `seq` is the newest change's `seq`, up to which all changes are finished (see `SNAPSHOT_XMIN`),
+# and so already notified: it doesn't include this transaction's ones, which are resumed after it
+RECORD_CHANGES_STMT = text("""
+    UPDATE shop_table_version SET version = version + 1, updated_at = now()
+    WHERE table_name = :table_name
+    RETURNING version, updated_at, pg_notify(
+        :channel,
+        json_build_object(
+            'table', table_name,
+            'version', version,
+            'updated_at', extract(epoch FROM updated_at),
+            'ids', CAST(:ids AS json),
+            'seq', CAST(CAST(pg_snapshot_xmin(pg_current_snapshot()) AS text) AS bigint) - 1
+        )::text
+    )
+""")
 
-@dataclass
+# Tables' change versions and times of last change, known from `CHANGES_NOTIFY_CHANNEL` notifications
+# and from this worker's committed writes
+table_versions: dict[str, tuple[int, datetime]] = {}
+# Key of session's `info` with versions of tables changed by it's transaction (None - unknown ones),
+# which become known on commit
+CHANGED_VERSIONS_KEY = "changed_table_versions"
+
+
+def update_table_version(table_name: str, version: int, updated_at: datetime):
+    """Saves table's version, if it's newer than the known one."""
+    known_version = table_versions.get(table_name)
+    if known_version is None or version > known_version[0]:
+        table_versions[table_name] = (version, updated_at)
+
+
+@dataclass(frozen=True)
 class SQLAlchemyEssentialsToGetList:
     """
     Essential params for getting list of db query, `order_expressions` is obligatory:
@@ -37,15 +99,60 @@ class SQLAlchemyEssentialsToGetList:
           {OrderingEnum.name_asc: [InstanceModel.name.asc()],
            OrderingEnum.number_desc: [InstanceModel.number.desc()]};
     - `search_attrs` - list of InstanceModel's attributes for searching in list query;
+    - `column_filter_attrs` - dict of query params' names and InstanceModel's attributes
+      to filter list by;
+    - `relevance_ordering` - ordering Enum code, which orders searched list by relevance
+      first. It's `order_expressions` are used as secondary ordering
+      and as the only one, when there is no search;
+    - `select_columns` - read-only fast path: InstanceModel's attributes to select as Core rows
+      (without ORM hydration) in read-only transaction, instead of ORM instances.
+      Must include all columns of ordering expressions;
+    - `relationships_to_load` - InstanceModel's relationships to load into listed ORM instances
+      by batched `selectinload` (one `IN` query per relationship for the whole page),
+      not used with `select_columns`.
+
+    `id` is always added to ordering as a tiebreaker, so it's expressions' columns
+    (which must be NOT NULL) are also used as keys for cursor pagination.
     """
     order_expressions: dict[Enum, list[UnaryExpression]]
     search_attrs: Optional[list[InstrumentedAttribute]] = None
     column_filter_attrs: Optional[dict[str, InstrumentedAttribute]] = None
+    relevance_ordering: Optional[Enum] = None
+    select_columns: Optional[list[InstrumentedAttribute]] = None
+    relationships_to_load: Optional[list[InstrumentedAttribute]] = None
+
+
+def build_detail_cache() -> Optional[LRUTTLCache]:
+    """Returns cache for instances got by ID, or None if it's disabled in settings."""
+    if settings.DETAIL_CACHE_MAX_SIZE <= 0:
+        return None
+    return LRUTTLCache(settings.DETAIL_CACHE_MAX_SIZE, settings.DETAIL_CACHE_TTL_SECONDS)
+
+
+def build_list_cache() -> Optional[SizedLRUCache]:
+    """
+    Returns cache for lists' results, or None if it's disabled in settings.
+    It doesn't need invalidation, when it's keyed by table's version.
+    """
+    if settings.LIST_CACHE_MAX_BYTES <= 0:
+        return None
+    return SizedLRUCache(settings.LIST_CACHE_MAX_BYTES)
+
 
 class SQLAlchemyRepository(AbstractRepository):
-    """Interface for working with PostgreSQL DB via SQLAlchemy."""
+    """
+    Interface for working with PostgreSQL DB via SQLAlchemy.
+    Write methods increment table's version and notify `CHANGES_NOTIFY_CHANNEL`
+    about changed instances' IDs, notifications are delivered to all workers on transaction's commit.
+    """
 
     DBModel: DeclarativeMeta
+    # Details of 400 responses for violations of unique and foreign key constraints by their names
+    constraint_violation_details: dict[str, str] = {}
+    # Per worker cache of instances' rows got by ID, shared by all repository's instances
+    detail_cache: Optional[LRUTTLCache] = None
+    # Tables, which versions are incremented by triggers on writes to this table
+    triggered_tables: tuple[str, ...] = ()
 
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -55,27 +162,190 @@ class SQLAlchemyRepository(AbstractRepository):
             instance: DeclarativeBase = self.DBModel(**attrs)
             self.session.add(instance)
             await self.session.flush()
+            await self._record_changes([instance.id])
             return instance
-        except (ConnectionError, InterfaceError, asyncpg.PostgresError) as e:
+        except DB_ERRORS as e:
             await self._handle_error(e)
 
     async def update(self, instance_id: UUID, **attrs):
+        """Updates instance by single `UPDATE ... RETURNING`, returns it or None if it doesn't exist."""
         try:
-            await self.session.execute(
+            update_query: ChunkedIteratorResult = await self.session.execute(
                 update(self.DBModel)
                 .filter_by(id=instance_id)
                 .values(**attrs)
+                .returning(self.DBModel)
             )
-            await self.session.flush()
-        except (ConnectionError, InterfaceError, asyncpg.PostgresError) as e:
+            instance = update_query.scalars().first()
+            if instance is not None:
+                await self._record_changes([instance_id])
+            return instance
+        except DB_ERRORS as e:
+            await self._handle_error(e)
+
+    async def delete(self, instance_id: UUID) -> Optional[UUID]:
+        """
+        Deletes instance and records it's tombstone for changes' sync by single
+        `WITH ... DELETE ... RETURNING` and `INSERT ... SELECT` statement,
+        returns it's ID or None if it didn't exist.
+        """
+        try:
+            deleted_ids = delete(self.DBModel).filter_by(id=instance_id).returning(self.DBModel.id).cte("deleted_ids")
+            tombstone_table = Tombstone.__table__
+            delete_query: ChunkedIteratorResult = await self.session.execute(
+                insert(tombstone_table)
+                .from_select(
+                    ["table_name", "instance_id"],
+                    select(literal(self.DBModel.__tablename__), deleted_ids.c.id)
+                )
+                .returning(tombstone_table.c.instance_id)
+            )
+            deleted_id = delete_query.scalar_one_or_none()
+            if deleted_id is not None:
+                await self._record_changes([deleted_id])
+            return deleted_id
+        except DB_ERRORS as e:
             await self._handle_error(e)
 
-    async def delete(self, instance_id: UUID):
+    async def bulk_create(
+            self,
+            rows: list[dict[str, tp.Any]],
+            conflict_attr: str = "name"
+    ) -> list[tuple[Optional[UUID], BulkOutcome]]:
+        """
+        Inserts rows, skipping ones which `conflict_attr` value is already taken.
+        Returns `(id, outcome)` for every row in the same order.
+        """
+        try:
+            return await self._bulk_insert(rows, conflict_attr, upsert=False)
+        except DB_ERRORS as e:
+            await self._handle_error(e)
+
+    async def bulk_upsert(
+            self,
+            rows: list[dict[str, tp.Any]],
+            conflict_attr: str = "name"
+    ) -> list[tuple[Optional[UUID], BulkOutcome]]:
+        """
+        Inserts rows, updating existing ones with the same `conflict_attr` value.
+        Returns `(id, outcome)` for every row in the same order.
+        """
         try:
-            await self.session.execute(delete(self.DBModel).filter_by(id=instance_id))
-        except (ConnectionError, InterfaceError, asyncpg.PostgresError) as e:
+            return await self._bulk_insert(rows, conflict_attr, upsert=True)
+        except DB_ERRORS as e:
             await self._handle_error(e)
 
+    def _fill_column_defaults(self, row: dict[str, tp.Any]) -> dict[str, tp.Any]:
+        """Returns row with python-side column defaults (like `id`) for missing values."""
+        row = dict(row)
+        for column_attr in self.DBModel.__table__.columns:
+            default = column_attr.default
+            if column_attr.key in row or default is None or not (default.is_scalar or default.is_callable):
+                continue
+            row[column_attr.key] = default.arg(None) if default.is_callable else default.arg
+        return row
+
+    async def _bulk_insert(
+            self,
+            rows: list[dict[str, tp.Any]],
+            conflict_attr: str,
+            upsert: bool
+    ) -> list[tuple[Optional[UUID], BulkOutcome]]:
+        """
+        Inserts rows by multi-row `INSERT ... ON CONFLICT (conflict_attr)` batches,
+        or by COPY into staging table for `BULK_COPY_MIN_ROWS` rows and more.
+        Rows repeating `conflict_attr` value of previous rows are skipped as duplicates,
+        because one statement can't affect the same row twice.
+        """
+        outcomes: list[tuple[Optional[UUID], BulkOutcome]] = [(None, BulkOutcome.duplicate)] * len(rows)
+        unique_rows: dict[tp.Any, tuple[int, dict[str, tp.Any]]] = {}
+        for index, row in enumerate(rows):
+            if row[conflict_attr] not in unique_rows:
+                unique_rows[row[conflict_attr]] = (index, self._fill_column_defaults(row))
+        if not unique_rows:
+            return outcomes
+
+        columns = list(next(iter(unique_rows.values()))[1].keys())
+        insert_rows = [row for _, row in unique_rows.values()]
+        if len(insert_rows) >= settings.BULK_COPY_MIN_ROWS:
+            saved_rows = await self._copy_insert(insert_rows, columns, conflict_attr, upsert)
+        else:
+            saved_rows = []
+            batch_size = max(1, min(MAX_INSERT_BATCH_ROWS, MAX_BIND_PARAMS // len(columns)))
+            for batch_start in range(0, len(insert_rows), batch_size):
+                insert_stmt = pg_insert(self.DBModel.__table__).values(
+                    insert_rows[batch_start:batch_start + batch_size]
+                )
+                saved_rows.extend(
+                    await self._execute_bulk_insert(insert_stmt, columns, conflict_attr, upsert)
+                )
+
+        for index, _ in unique_rows.values():
+            outcomes[index] = (None, BulkOutcome.conflict)
+        for saved_row in saved_rows:
+            index, _ = unique_rows[saved_row[1]]
+            outcomes[index] = (saved_row[0], BulkOutcome.created if saved_row[2] else BulkOutcome.updated)
+        if saved_rows:
+            await self._record_changes([saved_row[0] for saved_row in saved_rows])
+        return outcomes
+
+    async def _execute_bulk_insert(
+            self,
+            insert_stmt,
+            columns: list[str],
+            conflict_attr: str,
+            upsert: bool
+    ) -> list[tuple[UUID, tp.Any, bool]]:
+        """
+        Executes `INSERT` with `ON CONFLICT` clause.
+        Returns saved rows' `(id, conflict_attr value, is_inserted)`, conflicting rows
+        are returned only if `upsert`.
+        """
+        db_table = self.DBModel.__table__
+        if upsert:
+            update_columns = [name for name in columns if name not in ("id", conflict_attr)] or [conflict_attr]
+            insert_stmt = insert_stmt.on_conflict_do_update(
+                index_elements=[conflict_attr],
+                set_={name: insert_stmt.excluded[name] for name in update_columns}
+            )
+        else:
+            insert_stmt = insert_stmt.on_conflict_do_nothing(index_elements=[conflict_attr])
+        insert_stmt = insert_stmt.returning(
+            db_table.c.id,
+            db_table.c[conflict_attr],
+            # xmax is 0 for just inserted row versions, and isn't for updated ones
+            literal_column("xmax = 0").label("is_inserted")
+        )
+        insert_query = await self.session.execute(insert_stmt)
+        return [tuple(saved_row) for saved_row in insert_query.all()]
+
+    async def _copy_insert(
+            self,
+            rows: list[dict[str, tp.Any]],
+            columns: list[str],
+            conflict_attr: str,
+            upsert: bool
+    ) -> list[tuple[UUID, tp.Any, bool]]:
+        """
+        Copies rows by asyncpg's `copy_records_to_table` into temporary staging table
+        (dropped on commit) and moves them into model's table by single `INSERT ... SELECT`.
+        """
+        table_name = self.DBModel.__tablename__
+        staging_table_name = f"tmp_{table_name}_{uuid4().hex[:8]}"
+        await self.session.execute(text(
+            f'CREATE TEMP TABLE "{staging_table_name}" (LIKE "{table_name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+        ))
+        sqlalchemy_connection = await self.session.connection()
+        raw_connection = await sqlalchemy_connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            staging_table_name,
+            records=[tuple(row[name] for name in columns) for row in rows],
+            columns=columns
+        )
+        staging_table = table(staging_table_name, *[column(name) for name in columns])
+        insert_stmt = pg_insert(self.DBModel.__table__).from_select(columns, select(staging_table))
+        return await self._execute_bulk_insert(insert_stmt, columns, conflict_attr, upsert)
+
     async def get(
             self,
             instance_id: Optional[UUID] = None,
@@ -89,8 +359,140 @@ class SQLAlchemyRepository(AbstractRepository):
                 instance_query_stmt = instance_query_stmt.options(selectinload(*relationships_to_load))
             instance_query: ChunkedIteratorResult = await self.session.execute(instance_query_stmt)
             return instance_query.scalars().first()
-        except (ConnectionError, InterfaceError, asyncpg.PostgresError) as e:
+        except DB_ERRORS as e:
+            await self._handle_error(e)
+
+    async def get_row(self, instance_id: UUID, use_cache: bool = True) -> Optional[Row]:
+        """
+        Read-only fast path: returns instance's columns as Core row (without ORM hydration),
+        selected in read-only transaction, or None if it doesn't exist.
+        `use_cache` - look up row in `detail_cache` first (read-through).
+        """
+        try:
+            use_cache = use_cache and self.detail_cache is not None
+            if use_cache:
+                cached_row = self.detail_cache.get(instance_id)
+                if cached_row is not MISSING:
+                    return cached_row
+                cache_generation = self.detail_cache.generation
+            await self._begin_read_only()
+            row_query = await self.session.execute(
+                select(*self.DBModel.__table__.columns).filter_by(id=instance_id)
+            )
+            row = row_query.first()
+            if use_cache and row is not None:
+                self.detail_cache.set(instance_id, row, cache_generation)
+            return row
+        except DB_ERRORS as e:
+            await self._handle_error(e)
+
+    async def get_rows(self, instance_ids: tp.Sequence[UUID], use_cache: bool = True) -> list[Row]:
+        """
+        Read-only fast path: returns existing instances' columns as Core rows, in no particular order,
+        selected by single `id = ANY($1)` query with one array param, whatever the number of IDs is.
+        `use_cache` - look up rows in `detail_cache` first, only missing ones are selected (read-through).
+        """
+        try:
+            rows = []
+            instance_ids = list(dict.fromkeys(instance_ids))
+            use_cache = use_cache and self.detail_cache is not None
+            if use_cache:
+                cache_generation = self.detail_cache.generation
+                missing_ids = []
+                for instance_id in instance_ids:
+                    cached_row = self.detail_cache.get(instance_id)
+                    if cached_row is MISSING:
+                        missing_ids.append(instance_id)
+                    else:
+                        rows.append(cached_row)
+                instance_ids = missing_ids
+            if not instance_ids:
+                return rows
+            await self._begin_read_only()
+            rows_query = await self.session.execute(
+                select(*self.DBModel.__table__.columns).filter(self.DBModel.id == any_(
+                    bindparam("instance_ids", instance_ids, type_=ARRAY(self.DBModel.id.type))
+                ))
+            )
+            selected_rows = rows_query.all()
+            if use_cache:
+                for row in selected_rows:
+                    self.detail_cache.set(row.id, row, cache_generation)
+            return rows + selected_rows
+        except DB_ERRORS as e:
+            await self._handle_error(e)
+
+    async def _begin_read_only(self):
+        """
+        Begins session's transaction as `READ ONLY` (in the same `BEGIN` statement),
+        if the transaction isn't begun yet.
+        """
+        if not self.session.in_transaction():
+            await self.session.connection(execution_options={"postgresql_readonly": True})
+
+    async def _record_changes(self, instance_ids: Optional[tp.Sequence[UUID]] = None):
+        """
+        Records table's change by single statement:
+        - increments table's version in `shop_table_version` (visible to others on commit),
+        - notifies other workers about it on commit, with changed instances' IDs,
+        invalidates changed instances in this worker's detail cache and keeps the new version
+        till commit (see `save`), so this worker doesn't wait for it's own notification to read it's write.
+        `instance_ids` - changed instances' IDs, None means the whole table was changed.
+        """
+        if instance_ids is not None and len(instance_ids) > MAX_NOTIFIED_IDS:
+            instance_ids = None
+        invalidate_detail_cache(self.detail_cache, instance_ids)
+        record_query = await self.session.execute(RECORD_CHANGES_STMT, {
+            "table_name": self.DBModel.__tablename__,
+            "channel": settings.CHANGES_NOTIFY_CHANNEL,
+            "ids": json.dumps(
+                [str(instance_id) for instance_id in instance_ids] if instance_ids is not None else None
+            )
+        })
+        version, updated_at, _ = record_query.one()
+        changed_versions = self.session.info.setdefault(CHANGED_VERSIONS_KEY, {})
+        changed_versions[self.DBModel.__tablename__] = (version, updated_at)
+        for table_name in self.triggered_tables:
+            changed_versions[table_name] = None
+
+    async def get_version(self) -> tuple[int, datetime]:
+        """
+        Returns table's change version, which is incremented by every write, and time of table's last change.
+        They're kept in memory from workers' notifications and this worker's commits
+        while notifications' listener is connected,
+        otherwise they're read from DB.
+        """
+        table_name = self.DBModel.__tablename__
+        if notification_listener.is_listening and table_name in table_versions:
+            return table_versions[table_name]
+        try:
+            await self._begin_read_only()
+            version_query = await self.session.execute(
+                select(TableVersion.version, TableVersion.updated_at).filter_by(table_name=table_name)
+            )
+            version, updated_at = version_query.one()
+        except DB_ERRORS as e:
             await self._handle_error(e)
+        if notification_listener.is_listening:
+            update_table_version(table_name, version, updated_at)
+        return version, updated_at
+
+    def _get_order_expressions(
+            self,
+            ordering: Enum,
+            order_expressions: dict[Enum, list[UnaryExpression]]
+    ) -> list[UnaryExpression]:
+        """
+        Returns ordering's expressions with `id` tiebreaker (in direction of the last expression),
+        so every instance has unique position in the list.
+        """
+        expressions = list(order_expressions[ordering])
+        if not any(expression.element.key == "id" for expression in expressions):
+            if expressions and expressions[-1].modifier is operators.desc_op:
+                expressions.append(self.DBModel.id.desc())
+            else:
+                expressions.append(self.DBModel.id.asc())
+        return expressions
 
     def _order_list(
             self,
@@ -99,10 +501,69 @@ class SQLAlchemyRepository(AbstractRepository):
             order_expressions: dict[Enum, list[UnaryExpression]]
     ) -> Select:
         """Orders storage instances' list."""
-        for order_expression in order_expressions[ordering]:
+        for order_expression in self._get_order_expressions(ordering, order_expressions):
             list_query_stmt = list_query_stmt.order_by(order_expression)
         return list_query_stmt
 
+    @staticmethod
+    def _decode_keyset_value(column: ColumnElement, value: tp.Any) -> tp.Any:
+        """Converts cursor's JSON value back to python type of the `column`."""
+        if value is None:
+            return None
+        python_type = column.type.python_type
+        if python_type in (datetime, date):
+            return python_type.fromisoformat(value)
+        return python_type(value)
+
+    def _seek_list(
+            self,
+            list_query_stmt: Select,
+            cursor: str,
+            ordering: Enum,
+            order_expressions: dict[Enum, list[UnaryExpression]]
+    ) -> Select:
+        """
+        Filters list to instances placed after cursor's position (keyset pagination).
+        Uses row comparison `(a, b) > (:a, :b)` when all expressions have the same direction,
+        so the list's index is used for a single seek.
+        """
+        expressions = self._get_order_expressions(ordering, order_expressions)
+        try:
+            keyset_values = decode_cursor(cursor, ordering)
+            if len(keyset_values) != len(expressions):
+                raise ValueError("Cursor doesn't match list's ordering.")
+            keyset_values = [
+                self._decode_keyset_value(expression.element, value)
+                for expression, value in zip(expressions, keyset_values)
+            ]
+        except (ValueError, TypeError) as e:
+            raise HTTPException(http.HTTPStatus.BAD_REQUEST, f"Invalid cursor: {e}")
+
+        columns = [expression.element for expression in expressions]
+        is_desc = [expression.modifier is operators.desc_op for expression in expressions]
+        if all(is_desc):
+            return list_query_stmt.filter(tuple_(*columns) < tuple_(*keyset_values))
+        if not any(is_desc):
+            return list_query_stmt.filter(tuple_(*columns) > tuple_(*keyset_values))
+
+        seek_conditions = []
+        for i, (column, value) in enumerate(zip(columns, keyset_values)):
+            previous_equal = [columns[j] == keyset_values[j] for j in range(i)]
+            seek_conditions.append(and_(*previous_equal, column < value if is_desc[i] else column > value))
+        return list_query_stmt.filter(or_(*seek_conditions))
+
+    def _get_next_cursor(
+            self,
+            last_instance: tp.Any,
+            ordering: Enum,
+            order_expressions: dict[Enum, list[UnaryExpression]]
+    ) -> str:
+        """Returns cursor pointing to the position right after `last_instance`."""
+        return encode_cursor(ordering, [
+            getattr(last_instance, expression.element.key)
+            for expression in self._get_order_expressions(ordering, order_expressions)
+        ])
+
     def _filter_by_column(
             self,
             list_query_stmt: Select,
@@ -119,69 +580,294 @@ class SQLAlchemyRepository(AbstractRepository):
                 list_query_stmt = list_query_stmt.filter(filter_attrs[filter].in_(data_with_filters[filter]))
         return list_query_stmt
 
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        """Escapes LIKE pattern's special chars in `value`."""
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
     def _search(self,
                 list_query_stmt: Select,
                 search_str: str,
                 search_attrs: list[InstrumentedAttribute]
                 ) -> Select:
-        """Search filtration by matching `search_str` to instance's `search_attrs`."""
+        """
+        Search filtration by matching `search_str` words to instance's `search_attrs`.
+        Emits `lower(attr) LIKE '%word%'` with pattern bound as a whole,
+        so it's served by `lower(attr) gin_trgm_ops` GIN indexes.
+        """
         tmp_subquery = []
         for word in search_str.split():
+            pattern = f"%{self._escape_like(word.lower())}%"
             for attr in search_attrs:
-                tmp_subquery.append(func.lower(attr).contains(f"{word.lower()}"))
+                tmp_subquery.append(func.lower(attr).like(pattern, escape="\\"))
         return list_query_stmt.filter(or_(*tmp_subquery))
 
-    async def _paginate_list(self, list_query_stmt: Select, page_number: int, page_size: int):
-        """Paginates list and returns tuple: `(list_content, total_pages, total_items)`."""
-        total_list_query: ChunkedIteratorResult = await self.session.execute(list_query_stmt)
+    def _order_by_relevance(
+            self,
+            list_query_stmt: Select,
+            search_str: str,
+            search_attrs: list[InstrumentedAttribute]
+    ) -> Select:
+        """Orders list by trigram word similarity of `search_str` to the best matching of `search_attrs`."""
+        search_str = " ".join(search_str.lower().split())
+        similarities = [func.word_similarity(search_str, func.lower(attr)) for attr in search_attrs]
+        relevance = similarities[0] if len(similarities) == 1 else func.greatest(*similarities)
+        return list_query_stmt.order_by(relevance.desc())
+
+    async def _count_list(
+            self,
+            list_query_stmt: Select,
+            count_mode: ListCountMode,
+            is_filtered: bool
+    ) -> Optional[int]:
+        """
+        Counts list's total items according to `count_mode`:
+        - `exact` - `SELECT count(*)` over the filtered list subquery,
+        - `estimate` - planner's statistics: `pg_class.reltuples` for unfiltered list,
+          `EXPLAIN` rows estimate for filtered one. Estimates less than
+          `LIST_COUNT_ESTIMATE_MIN_ROWS` are recounted exactly,
+        - `none` - list is not counted, returns None.
+        """
+        if count_mode == ListCountMode.none:
+            return None
+        if count_mode == ListCountMode.estimate:
+            if is_filtered:
+                estimated_items = await self._estimate_filtered_count(list_query_stmt)
+            else:
+                estimated_items = await self._estimate_table_count()
+            if estimated_items >= settings.LIST_COUNT_ESTIMATE_MIN_ROWS:
+                return estimated_items
+        count_query_stmt = select(func.count()).select_from(list_query_stmt.order_by(None).subquery())
+        return (await self.session.execute(count_query_stmt)).scalar_one()
+
+    async def _estimate_table_count(self) -> int:
+        """Returns estimated rows number of the whole table from `pg_class.reltuples`."""
+        estimated_items = (await self.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table_name AS regclass)"),
+            {"table_name": self.DBModel.__tablename__}
+        )).scalar_one_or_none()
+        # reltuples is -1 for never vacuumed/analyzed tables
+        return max(estimated_items or 0, 0)
+
+    async def _estimate_filtered_count(self, list_query_stmt: Select) -> int:
+        """Returns estimated rows number of the list query from it's `EXPLAIN` plan."""
+        query_plan = (await self.session.execute(Explain(list_query_stmt.order_by(None)))).scalar_one()
+        if isinstance(query_plan, str):
+            query_plan = json.loads(query_plan)
+        return int(query_plan[0]["Plan"]["Plan Rows"])
 
-        total_items: int = len(total_list_query.scalars().all())
-        total_pages: int = ceil(total_items / page_size)
-        list_query_stmt = list_query_stmt.offset((page_number - 1) * page_size).limit(page_size)
+    async def _paginate_list(
+            self,
+            list_query_stmt: Select,
+            query_params: PaginatedListQueryParams,
+            order_expressions: dict[Enum, list[UnaryExpression]],
+            is_filtered: bool = False,
+            is_ranked: bool = False,
+            is_rows: bool = False
+    ):
+        """
+        Paginates list and returns tuple: `(list_content, total_pages, total_items, next_cursor)`.
+        - `list_content` consists of Core rows if `is_rows`, otherwise of ORM instances,
+        - `total_pages` and `total_items` are None, if count mode is `none` (default for pages by cursor),
+        - page is taken after `query_params.cursor` if it's set, otherwise by page number (OFFSET),
+        - `next_cursor` is None on the last page and for lists ordered by relevance (`is_ranked`),
+          because relevance isn't a column to seek by.
+        """
+        if query_params.cursor and is_ranked:
+            raise HTTPException(http.HTTPStatus.BAD_REQUEST, "Cursor pagination isn't supported for relevance ordering.")
+        total_items: Optional[int] = await self._count_list(
+            list_query_stmt, query_params.get_count_mode(), is_filtered
+        )
+        total_pages: Optional[int] = None
+        if total_items is not None:
+            total_pages = ceil(total_items / query_params.page_size)
+
+        if query_params.cursor:
+            list_query_stmt = self._seek_list(
+                list_query_stmt, query_params.cursor, query_params.ordering, order_expressions
+            )
+        else:
+            list_query_stmt = list_query_stmt.offset((query_params.page_number - 1) * query_params.page_size)
+        # One extra instance shows whether there is the next page
+        list_query_stmt = list_query_stmt.limit(query_params.page_size + 1)
 
         list_query: ChunkedIteratorResult = await self.session.execute(list_query_stmt)
-        list_content = list_query.scalars().all()
-        return list_content, total_pages, total_items
+        list_content = list_query.all() if is_rows else list_query.scalars().all()
+        next_cursor: Optional[str] = None
+        if len(list_content) > query_params.page_size:
+            list_content = list_content[:query_params.page_size]
+            if not is_ranked:
+                next_cursor = self._get_next_cursor(
+                    list_content[-1], query_params.ordering, order_expressions
+                )
+        return list_content, total_pages, total_items, next_cursor
+
+    def _build_list_query(
+            self,
+            query_params: Union[PaginatedListQueryParams, ListExportQueryParams],
+            essentials: SQLAlchemyEssentialsToGetList
+    ) -> tp.Tuple[Select, bool, bool]:
+        """
+        Builds ordered, searched and filtered list query.
+        Returns tuple: `(list_query_stmt, is_filtered, is_ranked)`.
+        """
+        is_filtered = is_ranked = False
+        if essentials.select_columns:
+            list_query_stmt: Select = select(*essentials.select_columns)
+        else:
+            list_query_stmt: Select = select(self.DBModel)
+            if essentials.relationships_to_load:
+                list_query_stmt = list_query_stmt.options(
+                    *[selectinload(relationship) for relationship in essentials.relationships_to_load]
+                )
+        if query_params.search and essentials.search_attrs:
+            if essentials.relevance_ordering is not None and query_params.ordering == essentials.relevance_ordering:
+                list_query_stmt = self._order_by_relevance(
+                    list_query_stmt, query_params.search, essentials.search_attrs
+                )
+                is_ranked = True
+            list_query_stmt = self._search(list_query_stmt, query_params.search, essentials.search_attrs)
+            is_filtered = True
+        list_query_stmt = self._order_list(list_query_stmt, query_params.ordering, essentials.order_expressions)
+        if essentials.column_filter_attrs:
+            query_params_data = query_params.model_dump()
+            list_query_stmt = self._filter_by_column(
+                list_query_stmt,
+                essentials.column_filter_attrs,
+                query_params_data
+            )
+            is_filtered = is_filtered or any(
+                query_params_data.get(filter) is not None for filter in essentials.column_filter_attrs
+            )
+        return list_query_stmt, is_filtered, is_ranked
 
     async def get_list(
             self,
             query_params: PaginatedListQueryParams,
             essentials: SQLAlchemyEssentialsToGetList
-    ) -> tp.Tuple[list, int, int]:
+    ) -> tp.Tuple[list, Optional[int], Optional[int], Optional[str]]:
         try:
-            list_query_stmt: Select = select(self.DBModel)
-            list_query_stmt = self._order_list(list_query_stmt, query_params.ordering, essentials.order_expressions)
-            if query_params.search and essentials.search_attrs:
-                list_query_stmt = self._search(list_query_stmt, query_params.search, essentials.search_attrs)
-            if essentials.column_filter_attrs:
-                list_query_stmt = self._filter_by_column(
-                    list_query_stmt,
-                    essentials.column_filter_attrs,
-                    query_params.model_dump()
-                )
-            return await self._paginate_list(list_query_stmt, query_params.page_number, query_params.page_size)
-        except (ConnectionError, InterfaceError, asyncpg.PostgresError) as e:
+            list_query_stmt, is_filtered, is_ranked = self._build_list_query(query_params, essentials)
+            await self._begin_read_only()
+            return await self._paginate_list(
+                list_query_stmt,
+                query_params,
+                essentials.order_expressions,
+                is_filtered,
+                is_ranked,
+                is_rows=bool(essentials.select_columns)
+            )
+        except DB_ERRORS as e:
+            await self._handle_error(e)
+
+    async def count_list_by(
+            self,
+            query_params: PaginatedListQueryParams,
+            essentials: SQLAlchemyEssentialsToGetList,
+            group_attr: InstrumentedAttribute,
+            limit: int
+    ) -> list[tuple[tp.Any, int]]:
+        """
+        Counts instances of searched and filtered list by their `group_attr` values (NULL isn't counted).
+        Returns `limit` most numerous `(value, count)` pairs.
+        """
+        try:
+            list_query_stmt, _, _ = self._build_list_query(query_params, essentials)
+            list_subquery = list_query_stmt.order_by(None).subquery()
+            group_column = list_subquery.c[group_attr.key]
+            items_count = func.count().label("items_count")
+            await self._begin_read_only()
+            count_query = await self.session.execute(
+                select(group_column, items_count)
+                .filter(group_column.is_not(None))
+                .group_by(group_column)
+                .order_by(items_count.desc(), group_column)
+                .limit(limit)
+            )
+            return [tuple(row) for row in count_query.all()]
+        except DB_ERRORS as e:
             await self._handle_error(e)
 
+    async def stream_list(
+            self,
+            query_params: ListExportQueryParams,
+            essentials: SQLAlchemyEssentialsToGetList,
+            batch_size: int = 1000
+    ) -> tp.AsyncIterator:
+        """
+        Yields all instances (or Core rows, see `select_columns`) of ordered, searched and filtered list,
+        fetched by server-side cursor
+        in `batch_size` batches, so memory usage doesn't depend on list size.
+        Uses it's own session, because the request's one is closed before response is streamed.
+        """
+        list_query_stmt, _, _ = self._build_list_query(query_params, essentials)
+        list_query_stmt = list_query_stmt.execution_options(yield_per=batch_size)
+        async with AsyncSession(self.session.bind, expire_on_commit=False) as stream_session:
+            try:
+                if essentials.select_columns:
+                    await stream_session.connection(execution_options={"postgresql_readonly": True})
+                    list_stream = await stream_session.stream(list_query_stmt)
+                else:
+                    list_stream = await stream_session.stream_scalars(list_query_stmt)
+                async for instance in list_stream:
+                    yield instance
+            except DB_ERRORS as e:
+                # Response is already started, so the only thing left is to break the stream
+                logging.error(f"ERROR streaming list from database: {e}")
+                raise
+
+    @staticmethod
+    def _get_asyncpg_error(error: Exception) -> tp.Optional[Exception]:
+        """Returns asyncpg's error, which is `error` itself or wrapped by SQLAlchemy's DBAPI error."""
+        if isinstance(error, DBAPIError):
+            return error.orig.__cause__ if error.orig is not None else None
+        return error
+
+    def _get_violated_constraint_name(self, error: IntegrityError) -> Optional[str]:
+        """Returns name of the constraint violated by `error`, if asyncpg reported it."""
+        return getattr(self._get_asyncpg_error(error), "constraint_name", None)
+
     async def _handle_error(
             self,
-            error: Union[ConnectionError, asyncpg.PostgresError, InterfaceError]
+            error: Union[ConnectionError, asyncpg.PostgresError, DBAPIError]
     ):
         """
         Handles errors:
         - rollbacks session,
         - logs the error,
-        - raises HTTPException.
+        - raises HTTPException: 400 for integrity errors (with `constraint_violation_details`
+          for known constraints), 504 for statements cancelled by timeout (request's deadline),
+          500 for other DB errors, 503 for connection errors.
         """
 
         log_msg = f"ERROR connecting to database: {error}"
         status_code = http.HTTPStatus.SERVICE_UNAVAILABLE
         response_detail = "Databse is unavailable, try to do it later."
-        if isinstance(error, asyncpg.PostgresError):
+        asyncpg_error = self._get_asyncpg_error(error)
+        if isinstance(error, IntegrityError):
+            log_msg = f"Integrity error: {error.orig}"
+            status_code = http.HTTPStatus.BAD_REQUEST
+            response_detail = self.constraint_violation_details.get(
+                self._get_violated_constraint_name(error),
+                "Data conflicts with existing records."
+            )
+        elif isinstance(asyncpg_error, asyncpg.QueryCanceledError):
+            log_msg = f"Database statement timed out: {asyncpg_error}"
+            status_code = http.HTTPStatus.GATEWAY_TIMEOUT
+            response_detail = "Request deadline exceeded."
+        elif isinstance(asyncpg_error, asyncpg.PostgresError):
             log_msg = f"ERROR handling database: {error}"
             status_code = http.HTTPStatus.INTERNAL_SERVER_ERROR
             response_detail = "ERROR handling database."
+        DB_ERRORS_TOTAL.labels(type(asyncpg_error or error).__name__).inc()
         await self.session.rollback()
+        self.session.info.pop(CHANGED_VERSIONS_KEY, None)
+        if isinstance(error, IntegrityError):
+            logging.info(log_msg)
+            raise HTTPException(status_code, response_detail)
+        if status_code == http.HTTPStatus.GATEWAY_TIMEOUT:
+            logging.warning(log_msg)
+            raise HTTPException(status_code, response_detail)
         logging.error(log_msg)
         raise HTTPException(status_code, response_detail)
 
@@ -200,15 +886,263 @@ class SQLAlchemyRepository(AbstractRepository):
                 await self.session.flush()
                 return
             await self.session.commit()
+            self._apply_changed_versions()
             if instance_to_refresh:
                 await self.session.refresh(instance_to_refresh)
-        except (ConnectionError, InterfaceError, asyncpg.PostgresError) as e:
+        except DB_ERRORS as e:
             await self._handle_error(e)
 
+    def _apply_changed_versions(self):
+        """
+        Saves versions of tables changed by committed transaction, so this worker's next requests
+        read it's writes, not cached lists or 304 by old versions. Unknown ones are forgotten to be read from DB,
+        with their detail caches, because their changed instances are unknown too.
+        """
+        for table_name, version in self.session.info.pop(CHANGED_VERSIONS_KEY, {}).items():
+            if version is None:
+                table_versions.pop(table_name, None)
+                invalidate_detail_cache(REPOSITORIES_BY_TABLE[table_name].detail_cache, None)
+            else:
+                update_table_version(table_name, *version)
+
 
 class CategorySQLAlchemyRepository(SQLAlchemyRepository):
     DBModel = Category
+    constraint_violation_details = {
+        "uq_shop_category_name": "Name is already taken.",
+        "fk_shop_product_category_id_shop_category": "Category has products.",
+    }
+    detail_cache = build_detail_cache()
+
+    async def reconcile_product_counts(
+            self,
+            after_id: Optional[UUID],
+            batch_size: int
+    ) -> tuple[Optional[UUID], int]:
+        """
+        Recounts products of `batch_size` categories following `after_id` and repairs drifted `product_count`.
+        Categories are locked by the first statement, so the second one's snapshot has all products,
+        which deltas were applied before, and products' triggers wait for the rest.
+        Returns the last recounted category's ID (None if there are no more) and number of repaired ones.
+        """
+        try:
+            # `FOR NO KEY UPDATE`, like products' triggers take, so products' foreign keys' checks aren't blocked
+            lock_query_stmt = (
+                select(Category.id).order_by(Category.id).limit(batch_size).with_for_update(key_share=True)
+            )
+            if after_id is not None:
+                lock_query_stmt = lock_query_stmt.filter(Category.id > after_id)
+            category_ids = (await self.session.execute(lock_query_stmt)).scalars().all()
+            if not category_ids:
+                return None, 0
+            # Served by `(category_id, name)` index of products
+            product_count = select(func.count()).filter(Product.category_id == Category.id).scalar_subquery()
+            repair_query = await self.session.execute(
+                update(Category)
+                .filter(Category.id.in_(category_ids), Category.product_count != product_count)
+                .values(product_count=product_count)
+                .returning(Category.id)
+                .execution_options(synchronize_session=False)
+            )
+            repaired_ids = repair_query.scalars().all()
+            if repaired_ids:
+                await self._record_changes(repaired_ids)
+            return category_ids[-1], len(repaired_ids)
+        except DB_ERRORS as e:
+            await self._handle_error(e)
 
 
 class ProductSQLAlchemyRepository(SQLAlchemyRepository):
     DBModel = Product
+    constraint_violation_details = {
+        "uq_shop_product_name": "Name is already taken.",
+        "fk_shop_product_category_id_shop_category": "Category was not found.",
+    }
+    detail_cache = build_detail_cache()
+    # Categories' products' counters (see 0005 migration)
+    triggered_tables = ("shop_category",)
+
+
+REPOSITORIES_BY_TABLE: dict[str, type[SQLAlchemyRepository]] = {
+    repository.DBModel.__tablename__: repository
+    for repository in (CategorySQLAlchemyRepository, ProductSQLAlchemyRepository)
+}
+
+
+class ChangesSQLAlchemyRepository:
+    """
+    Interface for reading changes of all tracked tables from PostgreSQL DB via SQLAlchemy.
+    Changes' `seq` is their writing transaction's ID, they are ordered by it and by change sequence number
+    within transaction. Transactions commit in any order, so only changes below snapshot's oldest running
+    transaction's ID (see `SNAPSHOT_XMIN`) are final, newer ones may be preceded by not committed yet ones.
+    """
+
+    tracked_entities: dict[type[DeclarativeBase], ChangedEntity] = {
+        Category: ChangedEntity.category,
+        Product: ChangedEntity.product,
+    }
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _begin_read_only(self):
+        """Begins session's transaction as `READ ONLY`, if the transaction isn't begun yet."""
+        if not self.session.in_transaction():
+            await self.session.connection(execution_options={"postgresql_readonly": True})
+
+    def _build_changes_query(self, since: int, with_data: bool = True, final_only: bool = True) -> CompoundSelect:
+        """
+        Builds query of instances changed after `since` (with their columns as JSON)
+        and tombstones of ones deleted after it. Every part is served by it's `(change_xid, change_seq)` index.
+        `with_data` - if False - selects only `seq`, `entity` and `id`.
+        `final_only` - if False - selects also changes, which may be preceded by not committed yet ones.
+        """
+        def filter_changes(change_xid: InstrumentedAttribute) -> ColumnElement:
+            if final_only:
+                return and_(change_xid > since, change_xid < SNAPSHOT_XMIN)
+            return change_xid > since
+
+        changes_parts = []
+        for model, entity in self.tracked_entities.items():
+            columns = [
+                model.change_xid.label("seq"),
+                model.change_seq.label("change_seq"),
+                literal(entity.value).label("entity"),
+                model.id.label("id")
+            ]
+            if with_data:
+                columns += [
+                    literal(ChangeOperation.upsert.value).label("operation"),
+                    model.updated_at.label("changed_at"),
+                    type_coerce(
+                        func.to_jsonb(literal_column(model.__tablename__))
+                        .op("-")(literal_column("'change_seq'"))
+                        .op("-")(literal_column("'change_xid'")),
+                        JSONB
+                    ).label("data")
+                ]
+            changes_parts.append(select(*columns).filter(filter_changes(model.change_xid)))
+        tombstone_columns = [
+            Tombstone.change_xid.label("seq"),
+            Tombstone.change_seq.label("change_seq"),
+            case(
+                {model.__tablename__: entity.value for model, entity in self.tracked_entities.items()},
+                value=Tombstone.table_name
+            ).label("entity"),
+            Tombstone.instance_id.label("id")
+        ]
+        if with_data:
+            tombstone_columns += [
+                literal(ChangeOperation.delete.value).label("operation"),
+                Tombstone.deleted_at.label("changed_at"),
+                cast(null(), JSONB).label("data")
+            ]
+        changes_parts.append(select(*tombstone_columns).filter(filter_changes(Tombstone.change_xid)))
+        changes_query = union_all(*changes_parts)
+        return changes_query.order_by(changes_query.selected_columns.seq, changes_query.selected_columns.change_seq)
+
+    async def get_changed_ids(self, since: int, limit: int) -> list[Row]:
+        """
+        Returns `(seq, entity, id)` rows of the first `limit` committed changes after `since`,
+        including not final ones, which are committed already, but may be preceded by other ones later.
+        """
+        try:
+            await self._begin_read_only()
+            changes_query = await self.session.execute(
+                self._build_changes_query(since, with_data=False, final_only=False).limit(limit)
+            )
+            return changes_query.all()
+        except DB_ERRORS as e:
+            await self._handle_error(e)
+
+    async def get_last_seq(self) -> int:
+        """Returns the newest `seq`, up to which all changes are final (see `SNAPSHOT_XMIN`)."""
+        try:
+            await self._begin_read_only()
+            last_seq_query = await self.session.execute(select(SNAPSHOT_XMIN - 1))
+            return last_seq_query.scalar_one()
+        except DB_ERRORS as e:
+            await self._handle_error(e)
+
+    async def _handle_error(self, error: Exception):
+        """Rollbacks session, logs the error and raises HTTPException 503."""
+        DB_ERRORS_TOTAL.labels(type(SQLAlchemyRepository._get_asyncpg_error(error) or error).__name__).inc()
+        await self.session.rollback()
+        logging.error(f"ERROR reading changes from database: {error}")
+        raise HTTPException(http.HTTPStatus.SERVICE_UNAVAILABLE, "Databse is unavailable, try to do it later.")
+
+    async def stream_changes(self, since: int, batch_size: int = 1000) -> tp.AsyncIterator[Row]:
+        """
+        Yields final changes after `since` as Core rows, fetched by server-side cursor
+        in `batch_size` batches by single statement, so they're consistent.
+        Uses it's own session, because the request's one is closed before response is streamed.
+        """
+        changes_query = self._build_changes_query(since).execution_options(yield_per=batch_size)
+        async with AsyncSession(self.session.bind, expire_on_commit=False) as stream_session:
+            try:
+                await stream_session.connection(execution_options={"postgresql_readonly": True})
+                async for change in await stream_session.stream(changes_query):
+                    yield change
+            except DB_ERRORS as e:
+                # Response is already started, so the only thing left is to break the stream
+                logging.error(f"ERROR streaming changes from database: {e}")
+                raise
+
+
+def invalidate_detail_cache(
+        detail_cache: Optional[LRUTTLCache],
+        instance_ids: Optional[tp.Sequence[tp.Union[UUID, str]]]
+):
+    """Removes `instance_ids` from `detail_cache`, or clears it, if `instance_ids` is None."""
+    if detail_cache is None:
+        return
+    if instance_ids is None:
+        detail_cache.clear()
+        return
+    for instance_id in instance_ids:
+        detail_cache.invalidate(instance_id if isinstance(instance_id, UUID) else UUID(instance_id))
+
+
+ENTITIES_BY_TABLE: dict[str, ChangedEntity] = {
+    model.__tablename__: entity for model, entity in ChangesSQLAlchemyRepository.tracked_entities.items()
+}
+
+
+def handle_changes_notification(payload: str):
+    """
+    Updates table's version, invalidates cached instances changed by any worker
+    and publishes the change to changes' stream subscribers, by `CHANGES_NOTIFY_CHANNEL` payload.
+    """
+    changes = json.loads(payload)
+    update_table_version(
+        changes["table"], changes["version"], datetime.fromtimestamp(changes["updated_at"], timezone.utc)
+    )
+    repository = REPOSITORIES_BY_TABLE.get(changes["table"])
+    if repository is not None:
+        invalidate_detail_cache(repository.detail_cache, changes["ids"])
+    entity = ENTITIES_BY_TABLE.get(changes["table"])
+    if entity is not None:
+        # Counters' triggers don't send `seq`, their changes are covered by the following event's one
+        change_feed.publish(ChangeEvent(
+            "change", {"entity": entity.value, "version": changes["version"], "ids": changes["ids"]}, changes.get("seq")
+        ))
+
+
+def reset_changes_tracking():
+    """
+    Forgets tables' versions, clears all repositories' detail caches and tells changes' stream
+    subscribers to drop everything they cached, e.g. after missed notifications.
+    """
+    table_versions.clear()
+    for repository in REPOSITORIES_BY_TABLE.values():
+        invalidate_detail_cache(repository.detail_cache, None)
+    change_feed.publish(ChangeEvent("reset", {}))
+
+
+def get_detail_caches_stats() -> dict[str, dict[str, int]]:
+    """Returns hit/miss/eviction stats of repositories' detail caches by table name."""
+    return {
+        table_name: repository.detail_cache.stats().as_dict()
+        for table_name, repository in REPOSITORIES_BY_TABLE.items()
+        if repository.detail_cache is not None
+    }
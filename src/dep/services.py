@@ -1,25 +1,48 @@
-"""Dependency injections to get business logic services."""
-
-from functools import lru_cache
+"""
+Dependency injections to get business logic services.
+Services and repositories are cheap request-scoped objects: they are built for every request
+and must not be cached, because they hold the request's DB session.
+Repositories' storage is chosen by `STORAGE_BACKEND` setting.
+"""
 
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import settings, StorageBackend
+from src.db.memory.repositories import (
+    CategoryInMemoryRepository, ProductInMemoryRepository, InMemoryChangesRepository
+)
 from src.db.postgres.repositories import (
-    CategorySQLAlchemyRepository, ProductSQLAlchemyRepository
+    CategorySQLAlchemyRepository, ProductSQLAlchemyRepository, ChangesSQLAlchemyRepository
 )
 from src.dep.db import get_db
 from src.service.categories import CategoryService
+from src.service.changes import ChangeService
 from src.service.products import ProductService
 
 
-@lru_cache
-def get_category_service(db: AsyncSession=Depends(get_db)) -> CategoryService:
-    """Returns category service."""
-    return CategoryService(CategorySQLAlchemyRepository(db))
+if settings.STORAGE_BACKEND == StorageBackend.memory:
+    # No DB session is opened for requests
+    def get_category_service() -> CategoryService:
+        """Returns category service."""
+        return CategoryService(CategoryInMemoryRepository())
+
+    def get_product_service() -> ProductService:
+        """Returns product service."""
+        return ProductService(ProductInMemoryRepository(), CategoryInMemoryRepository())
+
+    def get_change_service() -> ChangeService:
+        """Returns change service."""
+        return ChangeService(InMemoryChangesRepository())
+else:
+    def get_category_service(db: AsyncSession=Depends(get_db)) -> CategoryService:
+        """Returns category service."""
+        return CategoryService(CategorySQLAlchemyRepository(db))
 
+    def get_product_service(db: AsyncSession=Depends(get_db)) -> ProductService:
+        """Returns product service."""
+        return ProductService(ProductSQLAlchemyRepository(db), CategorySQLAlchemyRepository(db))
 
-@lru_cache
-def get_product_service(db: AsyncSession=Depends(get_db)) -> ProductService:
-    """Returns product service."""
-    return ProductService(ProductSQLAlchemyRepository(db))
\ No newline at end of file
+    def get_change_service(db: AsyncSession=Depends(get_db)) -> ChangeService:
+        """Returns change service."""
+        return ChangeService(ChangesSQLAlchemyRepository(db))
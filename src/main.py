@@ -1,13 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
 from src.api import api_router
-from src.core.config import settings
+from src.core.config import settings, StorageBackend
+from src.db.postgres import engine
+from src.db.postgres.notifications import notification_listener
+from src.db.postgres.pool import warm_up_pool
+from src.db.postgres.repositories import handle_changes_notification, reset_changes_tracking
 from src.model.api_responses import common_responses
-from src.util.rate_limit import limiter
+from src.util.admission import AdmissionControlMiddleware, build_admission_limits
+from src.util.metrics import MetricsMiddleware, collect_worker_metrics, metrics_response
+from src.util.request_stats import RequestStatsMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warms up DB pool, starts and stops worker's background listeners and metrics' collection.
+    DB isn't touched with in-memory storage.
+    """
+    uses_db = settings.STORAGE_BACKEND == StorageBackend.postgres
+    if uses_db:
+        await warm_up_pool(engine, settings.DB_POOL_WARMUP_CONNECTIONS)
+        notification_listener.subscribe(
+            settings.CHANGES_NOTIFY_CHANNEL, handle_changes_notification, on_reconnect=reset_changes_tracking
+        )
+        await notification_listener.start()
+    metrics_task = asyncio.create_task(collect_worker_metrics(engine, settings.METRICS_INTERVAL_SECONDS))
+    yield
+    metrics_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await metrics_task
+    if uses_db:
+        await notification_listener.stop()
+        await engine.dispose()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Online Shop service",
     description="Provides shop managing REST API.",
     debug=settings.DEBUG,
@@ -16,6 +48,27 @@ app = FastAPI(
     version="0.1.0"
 )
 app.include_router(api_router)
+app.add_api_route("/metrics", metrics_response, include_in_schema=False)
 app.add_middleware(SessionMiddleware, secret_key=settings.SESSION_SECRET_KEY)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
\ No newline at end of file
+if settings.ADMISSION_CONTROL:
+    # Inside of `RequestStatsMiddleware`, which collects DB latency for it
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limits=build_admission_limits(),
+        retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        # Streamed responses would hold read slots and feed their duration into reads' latency (shrinking the limit),
+        # event streams are limited by `CHANGES_STREAM_MAX_SUBSCRIBERS`, exports and sync by rate limiter
+        exempt_paths=(
+            "/metrics",
+            "/api/v1/changes",
+            "/api/v1/changes/stream",
+            "/api/v1/categories/export",
+            "/api/v1/products/export",
+        )
+    )
+app.add_middleware(
+    RequestStatsMiddleware,
+    server_timing=settings.SERVER_TIMING_HEADER,
+    strict_budgets=settings.QUERY_BUDGETS_STRICT
+)
+app.add_middleware(MetricsMiddleware)
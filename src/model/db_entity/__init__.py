@@ -1,4 +1,6 @@
 """Database entities' model."""
 
+from src.model.db_entity.changes import *
 from src.model.db_entity.categories import *
-from src.model.db_entity.products import *
\ No newline at end of file
+from src.model.db_entity.products import *
+from src.model.db_entity.table_versions import *
\ No newline at end of file
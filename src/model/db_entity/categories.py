@@ -1,9 +1,10 @@
 import uuid
 
-from sqlalchemy import Column, String
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from src.db.postgres import Base
+from src.model.db_entity.changes import CHANGE_XID_DEFAULT, change_seq_sequence
 
 
 class Category(Base):
@@ -25,7 +26,52 @@ class Category(Base):
         unique=True,
         doc="Category's name."
     )
+    # Maintained by `shop_product` triggers, has no python-side default, so bulk upserts don't reset it
+    product_count = Column(
+        Integer,
+        nullable=False,
+        server_default="0",
+        doc="Number of category's products."
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        doc="Time of category's creation."
+    )
+    # Set by trigger on every update, like `change_seq` and `change_xid`
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        doc="Time of category's last change."
+    )
+    change_seq = Column(
+        BigInteger,
+        nullable=False,
+        server_default=change_seq_sequence.next_value(),
+        doc="Category's last change sequence number."
+    )
+    change_xid = Column(
+        BigInteger,
+        nullable=False,
+        server_default=CHANGE_XID_DEFAULT,
+        doc="ID of category's last change transaction."
+    )
 
+    __table_args__ = (
+        # Serves changes' reading in their order
+        Index("ix_shop_category_change_xid_change_seq", change_xid, change_seq),
+        # Serves case-insensitive substring search: `lower(name) LIKE '%word%'`
+        Index(
+            "ix_shop_category_name_trgm",
+            func.lower(name).label("name_lower"),
+            postgresql_using="gin",
+            postgresql_ops={"name_lower": "gin_trgm_ops"}
+        ),
+    )
+    # Server-side defaults are returned by `INSERT ... RETURNING`, not loaded lazily
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self) -> str:
         return f'<Category {self.name}>'
\ No newline at end of file
@@ -0,0 +1,54 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Sequence, String, func, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from src.db.postgres import Base
+
+
+# Shared by all tables' changes, orders changes of the same transaction
+change_seq_sequence = Sequence("shop_change_seq", start=2, metadata=Base.metadata)
+# Writing transaction's ID (`xid8` is 64-bit and never wraps around), changes are ordered by it first,
+# because transactions commit in any order, but all ones below the oldest running one are finished
+CHANGE_XID_DEFAULT = text("CAST(CAST(pg_current_xact_id() AS text) AS bigint)")
+
+
+class Tombstone(Base):
+    """Deleted instance's record for changes' sync"""
+
+    __tablename__ = "shop_tombstone"
+
+    change_seq = Column(
+        BigInteger,
+        primary_key=True,
+        server_default=change_seq_sequence.next_value(),
+        doc="Deletion's change sequence number."
+    )
+    change_xid = Column(
+        BigInteger,
+        nullable=False,
+        server_default=CHANGE_XID_DEFAULT,
+        doc="ID of deletion's transaction."
+    )
+    table_name = Column(
+        String(63),
+        nullable=False,
+        doc="Deleted instance's table name."
+    )
+    instance_id = Column(
+        UUID(as_uuid=True),
+        nullable=False,
+        doc="Deleted instance's ID."
+    )
+    deleted_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        doc="Time of deletion."
+    )
+
+    __table_args__ = (
+        # Serves changes' reading in their order
+        Index("ix_shop_tombstone_change_xid_change_seq", change_xid, change_seq),
+    )
+
+    def __repr__(self) -> str:
+        return f'<Tombstone {self.table_name} {self.instance_id}>'
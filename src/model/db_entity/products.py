@@ -1,9 +1,11 @@
 import uuid
 
-from sqlalchemy import Column, String
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 
 from src.db.postgres import Base
+from src.model.db_entity.changes import CHANGE_XID_DEFAULT, change_seq_sequence
 
 
 class Product(Base):
@@ -25,6 +27,56 @@ class Product(Base):
         unique=True,
         doc="Product's name."
     )
+    category_id = Column(
+        UUID(as_uuid=True),
+        # Deleting category would change it's products without incrementing their table's version
+        ForeignKey("shop_category.id", ondelete="RESTRICT"),
+        nullable=True,
+        doc="Product's category ID."
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        doc="Time of product's creation."
+    )
+    # Set by trigger on every update, like `change_seq` and `change_xid`
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        doc="Time of product's last change."
+    )
+    change_seq = Column(
+        BigInteger,
+        nullable=False,
+        server_default=change_seq_sequence.next_value(),
+        doc="Product's last change sequence number."
+    )
+    change_xid = Column(
+        BigInteger,
+        nullable=False,
+        server_default=CHANGE_XID_DEFAULT,
+        doc="ID of product's last change transaction."
+    )
+    # Loaded only explicitly, by batched `selectinload`, never lazily per instance
+    category = relationship("Category", lazy="raise")
+
+    __table_args__ = (
+        # Serves changes' reading in their order
+        Index("ix_shop_product_change_xid_change_seq", change_xid, change_seq),
+        # Serves category's products list ordered by name, and category's deletion check
+        Index("ix_shop_product_category_id_name", category_id, name),
+        # Serves case-insensitive substring search: `lower(name) LIKE '%word%'`
+        Index(
+            "ix_shop_product_name_trgm",
+            func.lower(name).label("name_lower"),
+            postgresql_using="gin",
+            postgresql_ops={"name_lower": "gin_trgm_ops"}
+        ),
+    )
+    # Server-side defaults are returned by `INSERT ... RETURNING`, not loaded lazily
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self) -> str:
         return f'<Product {self.name}>'
\ No newline at end of file
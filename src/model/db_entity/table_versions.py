@@ -0,0 +1,32 @@
+from sqlalchemy import BigInteger, Column, DateTime, String, func
+
+from src.db.postgres import Base
+
+
+class TableVersion(Base):
+    """Table's change version, incremented by every write to the table"""
+
+    __tablename__ = "shop_table_version"
+
+    table_name = Column(
+        String(63),
+        primary_key=True,
+        doc="Versioned table's name."
+    )
+    version = Column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        server_default="0",
+        doc="Table's change version."
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        doc="Time of table's last change."
+    )
+
+
+    def __repr__(self) -> str:
+        return f'<TableVersion {self.table_name}={self.version}>'
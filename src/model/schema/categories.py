@@ -7,13 +7,17 @@ from uuid import UUID
 from fastapi import Query
 from pydantic import Field, model_validator
 
-from src.model.schema.common import CustomBaseModel, PaginatedListQueryParams, PaginatedList
+from src.core.config import settings
+from src.model.schema.common import CustomBaseModel, PaginatedListQueryParams, PaginatedList, \
+    ListExportQueryParams, BatchList
 
 
 class CategoryOrdering(str, Enum):
     """Possible orderings for categories' list."""
     name_asc = 'name'
     name_desc = '-name'
+    product_count_desc = '-product_count'
+    relevance = 'relevance'
 
 
 class CategoryCreate(CustomBaseModel):
@@ -31,10 +35,16 @@ class CategoryEdit(CategoryCreate):
     """Body params for editing category."""
 
 
+class CategoriesBulkCreate(CustomBaseModel):
+    """Body params for creating/upserting categories in bulk."""
+    items: list[CategoryCreate] = Field(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
 class CategoryShowMinimal(CustomBaseModel):
     """Category's minimal info to show."""
     id: UUID
     name: str
+    product_count: int
 
 
 class CategoriesPaginatedListQueryParams(PaginatedListQueryParams):
@@ -43,6 +53,17 @@ class CategoriesPaginatedListQueryParams(PaginatedListQueryParams):
     search: Optional[str] = Field(Query(None, description="Search by category's name."))
 
 
+class CategoriesExportQueryParams(ListExportQueryParams):
+    """Query params to export Categories' list."""
+    ordering: CategoryOrdering = Field(Query(CategoryOrdering.name_asc))
+    search: Optional[str] = Field(Query(None, description="Search by category's name."))
+
+
 class CategoriesPaginatedList(PaginatedList):
     """Categories' paginated list."""
     content: list[CategoryShowMinimal]
+
+
+class CategoriesBatch(BatchList):
+    """Categories got by IDs."""
+    content: list[CategoryShowMinimal]
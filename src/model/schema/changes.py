@@ -0,0 +1,53 @@
+"""Schemas for changes of tracked entities, used for incremental sync."""
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Query
+from pydantic import BaseModel, Field
+
+from src.model.schema.common import CustomBaseModel
+
+
+class ChangedEntity(str, Enum):
+    """Entities, which changes are tracked."""
+    category = 'category'
+    product = 'product'
+
+
+class ChangeOperation(str, Enum):
+    """Possible operations of the change."""
+    upsert = 'upsert'
+    delete = 'delete'
+
+
+class ChangesQueryParams(BaseModel):
+    """Query params to get changes for incremental sync."""
+    since: int = Field(Query(
+        0, ge=0,
+        description="`seq` of the last applied change, `0` to get all instances for the initial sync."
+    ))
+
+
+class ChangesStreamQueryParams(BaseModel):
+    """Query params to subscribe to changes' event stream."""
+    last_event_id: Optional[int] = Field(Query(
+        None, ge=0,
+        description="`id` of the last received event to resume from it, "
+                    "`Last-Event-ID` header (sent by `EventSource` on reconnection) takes precedence."
+    ))
+
+
+class Change(CustomBaseModel):
+    """
+    Schema for the change: the current state of created or updated instance,
+    or the tombstone of deleted one (without `data`).
+    """
+    seq: int
+    entity: ChangedEntity
+    operation: ChangeOperation
+    id: UUID
+    changed_at: datetime
+    data: Optional[dict] = None
@@ -2,10 +2,13 @@
 
 from enum import Enum
 from typing import Optional
+from uuid import UUID
 
 from fastapi import Query
 from pydantic import BaseModel, Field, ConfigDict
 
+from src.core.config import settings
+
 
 class CustomBaseModel(BaseModel):
     '''Redefined pydantic's ``BaseModel`` with custom methods and settings.'''
@@ -26,6 +29,13 @@ class CustomBaseModel(BaseModel):
         return param
 
 
+class ListCountMode(str, Enum):
+    """Possible ways to count total items of the list."""
+    exact = 'exact'
+    estimate = 'estimate'
+    none = 'none'
+
+
 class PaginatedListQueryParams(BaseModel):
     """
     Common query params to get db instances paginated list.
@@ -36,10 +46,130 @@ class PaginatedListQueryParams(BaseModel):
     search: Optional[str] = Field(Query(None))
     page_number: int = Field(Query(1, ge=1, description="Page number."))
     page_size: int = Field(Query(50, ge=1, description="Records per page."))
+    count: Optional[ListCountMode] = Field(Query(
+        None,
+        description="How to count total items: `exact` - precise count, "
+                    "`estimate` - fast approximate count from DB statistics, "
+                    "`none` - skip counting. By default pages by `page_number` are counted exactly, "
+                    "pages by `cursor` aren't counted, so every next page costs one index seek."
+    ))
+    cursor: Optional[str] = Field(Query(
+        None,
+        description="`next_cursor` of the previous page to get the next one "
+                    "by keyset pagination, `page_number` is ignored then."
+    ))
+
+    def get_count_mode(self) -> ListCountMode:
+        """Returns `count`, or the default one: `none` for pages by cursor, `exact` for others."""
+        if self.count is not None:
+            return self.count
+        return ListCountMode.none if self.cursor else ListCountMode.exact
+
+    def cache_key(self) -> tuple:
+        """
+        Returns hashable key of params, normalized the same way list query is built:
+        search words are case-insensitive and whitespace is collapsed,
+        `page_number` is dropped if `cursor` is set, default `count` is resolved,
+        list params (filters by any of values) are sorted tuples of unique values.
+        """
+        params = self.model_dump()
+        params["count"] = self.get_count_mode()
+        if self.search is not None:
+            params["search"] = " ".join(self.search.lower().split())
+        if self.cursor:
+            params["page_number"] = None
+        for name, value in params.items():
+            if isinstance(value, list):
+                params[name] = tuple(sorted(set(value)))
+        return tuple(sorted(params.items()))
+
+
+class ExportFormat(str, Enum):
+    """Possible formats of exported list."""
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
+class ListExportQueryParams(BaseModel):
+    """
+    Common query params to export db instances list.
+    Redefine ``ordering`` in child Schema with specific ordering enum
+    annotation and default value.
+    """
+    ordering: Enum = Field(Query(...))
+    search: Optional[str] = Field(Query(None))
+    format: ExportFormat = Field(Query(ExportFormat.ndjson, description="Export format."))
 
 
 class PaginatedList(CustomBaseModel):
     """Common schema for paginated entities list."""
     content: list
-    total_items: int
-    total_pages: int
\ No newline at end of file
+    total_items: Optional[int] = None
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class BatchGet(CustomBaseModel):
+    """Body params for getting instances by IDs."""
+    ids: list[UUID] = Field(min_length=1, max_length=settings.BATCH_GET_MAX_IDS)
+
+
+class BatchList(CustomBaseModel):
+    """
+    Common schema for instances got by IDs: found ones in requested order (repeated IDs once)
+    and IDs of not found ones.
+    """
+    content: list
+    missing_ids: list[UUID]
+
+    @classmethod
+    def from_rows(cls, instance_ids: list[UUID], rows: list) -> "BatchList":
+        """Builds result from repository's rows in any order."""
+        rows_by_id = {row.id: row for row in rows}
+        instance_ids = list(dict.fromkeys(instance_ids))
+        return cls.model_validate(
+            {
+                "content": [rows_by_id[instance_id] for instance_id in instance_ids if instance_id in rows_by_id],
+                "missing_ids": [instance_id for instance_id in instance_ids if instance_id not in rows_by_id],
+            },
+            from_attributes=True
+        )
+
+
+class BulkOutcome(str, Enum):
+    """Possible outcomes of bulk create/upsert for every item."""
+    created = 'created'
+    updated = 'updated'
+    conflict = 'conflict'
+    duplicate = 'duplicate'
+
+
+class BulkItemResult(CustomBaseModel):
+    """
+    Outcome of bulk create/upsert for item by it's index in request:
+    - `created`/`updated` - item was saved with `id`,
+    - `conflict` - item's name is already taken, nothing was changed,
+    - `duplicate` - item's name was repeated earlier in the same request, item was skipped.
+    """
+    index: int
+    id: Optional[UUID] = None
+    outcome: BulkOutcome
+
+
+class BulkResult(CustomBaseModel):
+    """Common schema for bulk create/upsert result."""
+    items: list[BulkItemResult]
+    created: int
+    updated: int
+    skipped: int
+
+    @classmethod
+    def from_outcomes(cls, outcomes: list[tuple[Optional[UUID], BulkOutcome]]) -> "BulkResult":
+        """Builds result from repository's `(id, outcome)` tuples in request's items order."""
+        items = [
+            BulkItemResult(index=index, id=instance_id, outcome=outcome)
+            for index, (instance_id, outcome) in enumerate(outcomes)
+        ]
+        created = sum(item.outcome == BulkOutcome.created for item in items)
+        updated = sum(item.outcome == BulkOutcome.updated for item in items)
+        return cls(items=items, created=created, updated=updated, skipped=len(items) - created - updated)
\ No newline at end of file
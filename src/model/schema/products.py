@@ -7,18 +7,23 @@ from uuid import UUID
 from fastapi import Query
 from pydantic import Field, model_validator
 
-from src.model.schema.common import CustomBaseModel, PaginatedListQueryParams, PaginatedList
+from src.core.config import settings
+from src.model.schema.categories import CategoryShowMinimal
+from src.model.schema.common import CustomBaseModel, PaginatedListQueryParams, PaginatedList, \
+    ListExportQueryParams, BatchList
 
 
 class ProductOrdering(str, Enum):
     """Possible orderings for categories' list."""
     name_asc = 'name'
     name_desc = '-name'
+    relevance = 'relevance'
 
 
 class ProductCreate(CustomBaseModel):
     """Body params for creating new product."""
     name: str = Field(min_length=1, max_length=32)
+    category_id: Optional[UUID] = None
 
     @model_validator(mode='before')
     @classmethod
@@ -31,18 +36,52 @@ class ProductEdit(ProductCreate):
     """Body params for editing product."""
 
 
+class ProductsBulkCreate(CustomBaseModel):
+    """Body params for creating/upserting products in bulk."""
+    items: list[ProductCreate] = Field(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
 class ProductShowMinimal(CustomBaseModel):
     """Product's minimal info to show."""
     id: UUID
     name: str
+    category_id: Optional[UUID] = None
+
+
+class ProductShow(ProductShowMinimal):
+    """Product's info to show with their category's minimal info."""
+    category: Optional[CategoryShowMinimal] = None
+
+
+class CategoryProductsPaginatedListQueryParams(PaginatedListQueryParams):
+    """Query params to get paginated list of Category's Products."""
+    ordering: ProductOrdering = Field(Query(ProductOrdering.name_asc))
+    search: Optional[str] = Field(Query(None, description="Search by product's name."))
 
 
-class ProductsPaginatedListQueryParams(PaginatedListQueryParams):
+class ProductsPaginatedListQueryParams(CategoryProductsPaginatedListQueryParams):
     """Query params to get paginated Products' list."""
+    category_id: Optional[list[UUID]] = Field(Query(None, description="Filter by product's category ID."))
+    facets: bool = Field(Query(False, description="Count listed products by categories (`category_facets`)."))
+
+
+class ProductsExportQueryParams(ListExportQueryParams):
+    """Query params to export Products' list."""
     ordering: ProductOrdering = Field(Query(ProductOrdering.name_asc))
     search: Optional[str] = Field(Query(None, description="Search by product's name."))
+    category_id: Optional[list[UUID]] = Field(Query(None, description="Filter by product's category ID."))
 
 
 class ProductsPaginatedList(PaginatedList):
-    """Products' paginated list."""
-    content: list[ProductShowMinimal]
+    """
+    Products' paginated list.
+    `category_facets` - categories of the list's products (the most numerous first)
+    with `product_count` of their products in the list, if they were requested.
+    """
+    content: list[ProductShow]
+    category_facets: Optional[list[CategoryShowMinimal]] = None
+
+
+class ProductsBatch(BatchList):
+    """Products got by IDs with their categories."""
+    content: list[ProductShow]
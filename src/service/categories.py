@@ -1,16 +1,34 @@
 import http
 import typing as tp
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
 from fastapi.exceptions import HTTPException
 
 from src.db.abstract_repository import AbstractRepository
-from src.db.postgres.repositories import SQLAlchemyEssentialsToGetList
+from src.db.postgres.repositories import SQLAlchemyEssentialsToGetList, build_list_cache
 from src.model.db_entity import Category
-from src.model.schema.common import PaginatedList
+from src.model.schema.common import PaginatedList, BulkResult
 from src.model.schema.categories import CategoryCreate, CategoriesPaginatedListQueryParams, CategoryOrdering, \
-    CategoryEdit
+    CategoryEdit, CategoriesBulkCreate, CategoriesExportQueryParams, CategoriesBatch
+
+
+# Immutable, so it's built once and shared by all requests
+CATEGORIES_LIST_ESSENTIALS = SQLAlchemyEssentialsToGetList(
+    order_expressions={
+        CategoryOrdering.name_asc: [Category.name.asc()],
+        CategoryOrdering.name_desc: [Category.name.desc()],
+        CategoryOrdering.product_count_desc: [Category.product_count.desc()],
+        CategoryOrdering.relevance: [Category.name.asc()]
+    },
+    search_attrs=[Category.name],
+    relevance_ordering=CategoryOrdering.relevance,
+    select_columns=[Category.id, Category.name, Category.product_count]
+)
+
+# Shared by all requests of the worker, keyed by categories' version, so writes make old entries unreachable
+CATEGORIES_LIST_CACHE = build_list_cache()
 
 
 class CategoryService:
@@ -27,29 +45,62 @@ class CategoryService:
         Handles getting category's profile API:
         `GET: /api/v1/categories/{id}`
         """
-        return await self.get_or_404(category_id)
+        category = await self.repo.get_row(category_id)
+        if category is None:
+            raise HTTPException(http.HTTPStatus.NOT_FOUND, "Category was not found")
+        return category
+
+    async def get_batch(self, category_ids: list[UUID]) -> CategoriesBatch:
+        """
+        Handles getting categories by IDs API:
+        `GET: /api/v1/categories?ids=...`, `POST: /api/v1/categories:batchGet`
+        Categories are read through detail cache, missing ones by single query.
+        """
+        return CategoriesBatch.from_rows(category_ids, await self.repo.get_rows(category_ids))
 
     async def get_list(self, query_params: CategoriesPaginatedListQueryParams):
         """
         Handles getting categories' paginated list API:
         `GET: /api/v1/categories`
+        Results are cached by normalized query params and categories' version,
+        identical concurrent requests of missing result make a single query.
         """
-        list_content, total_pages, total_items = await self.repo.get_list(
+        if CATEGORIES_LIST_CACHE is None:
+            return await self._get_list(query_params)
+        version, _ = await self.repo.get_version()
+        return await CATEGORIES_LIST_CACHE.get_or_load(
+            (version, query_params.cache_key()),
+            lambda: self._get_list(query_params)
+        )
+
+    async def _get_list(self, query_params: CategoriesPaginatedListQueryParams) -> PaginatedList:
+        """Gets categories' paginated list from storage."""
+        list_content, total_pages, total_items, next_cursor = await self.repo.get_list(
             query_params=query_params,
-            essentials=SQLAlchemyEssentialsToGetList(
-                order_expressions={
-                    CategoryOrdering.name_asc: [Category.name.asc()],
-                    CategoryOrdering.name_desc: [Category.name.desc()]
-                },
-                search_attrs=[Category.name]
-            )
+            essentials=CATEGORIES_LIST_ESSENTIALS
         )
         return PaginatedList(
             content=list_content,
             total_pages=total_pages,
-            total_items=total_items
+            total_items=total_items,
+            next_cursor=next_cursor
         )
 
+    def export(self, query_params: CategoriesExportQueryParams) -> tp.AsyncIterator[tp.Any]:
+        """
+        Handles exporting all categories API:
+        `GET: /api/v1/categories/export`
+        Returns async iterator over all searched categories' rows, streamed from DB.
+        """
+        return self.repo.stream_list(query_params, CATEGORIES_LIST_ESSENTIALS)
+
+    async def get_version(self) -> tuple[int, datetime]:
+        """
+        Returns categories' change version and time of their last change,
+        used for conditional GET of categories' list and profiles.
+        """
+        return await self.repo.get_version()
+
     async def get_or_404(
             self,
             category_id: Optional[UUID] = None,
@@ -69,24 +120,35 @@ class CategoryService:
         """
         Handles create new category API:
         `POST: /api/v1/categories`
+        Taken name is detected by DB's unique constraint.
         """
-        existing_name = await self.repo.get(name=params.name)
-        if existing_name:
-            raise HTTPException(http.HTTPStatus.BAD_REQUEST, "Name is already taken.")
         new_category: Category = await self.repo.create(**params.model_dump())
         await self.repo.save()
         return new_category
 
+    async def bulk_create(self, params: CategoriesBulkCreate, upsert: bool = False) -> BulkResult:
+        """
+        Handles create (or upsert) categories in bulk API:
+        `POST: /api/v1/categories:bulk`
+        All items are saved in a single transaction.
+        """
+        rows = [item.model_dump() for item in params.items]
+        if upsert:
+            outcomes = await self.repo.bulk_upsert(rows)
+        else:
+            outcomes = await self.repo.bulk_create(rows)
+        await self.repo.save()
+        return BulkResult.from_outcomes(outcomes)
+
     async def edit(self, category_id: UUID, params: CategoryEdit):
         """
         Handle category's editing API:
         `PUT: /api/v1/categories/{id}`
+        Taken name is detected by DB's unique constraint.
         """
-        category = await self.get_or_404(category_id)
-        same_name_category = await self.repo.get(name=params.name)
-        if all((same_name_category, same_name_category != category)):
-            raise HTTPException(http.HTTPStatus.BAD_REQUEST, "Category already exists.")
-        await self.repo.update(category_id, **params.model_dump())
+        category = await self.repo.update(category_id, **params.model_dump())
+        if not category:
+            raise HTTPException(http.HTTPStatus.NOT_FOUND, "Category was not found")
         await self.repo.save()
         return category
 
@@ -95,6 +157,7 @@ class CategoryService:
         Handles delete category API:
         `DELETE: /api/v1/categories/{id}`.
         """
-        await self.get_or_404(category_id)
-        await self.repo.delete(category_id)
+        deleted_id = await self.repo.delete(category_id)
+        if deleted_id is None:
+            raise HTTPException(http.HTTPStatus.NOT_FOUND, "Category was not found")
         await self.repo.save()
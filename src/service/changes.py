@@ -0,0 +1,63 @@
+import http
+import itertools
+import typing as tp
+from typing import Optional
+
+from fastapi.exceptions import HTTPException
+
+from src.core.config import settings
+from src.model.schema.changes import ChangesQueryParams
+from src.util.change_feed import ChangeEvent, change_feed
+
+
+class ChangeService:
+    """Service for handling changes of all tracked entities."""
+
+    def __init__(self, repo: tp.Any):
+        self.repo = repo
+
+    def get_list(self, query_params: ChangesQueryParams) -> tp.AsyncIterator[tp.Any]:
+        """
+        Handles getting changes for incremental sync API:
+        `GET: /api/v1/changes`
+        Returns async iterator over changes after `since` in their order, streamed from DB.
+        """
+        return self.repo.stream_changes(query_params.since)
+
+    async def subscribe(self, last_event_id: Optional[int]) -> tp.AsyncIterator[bytes]:
+        """
+        Handles subscribing to changes' event stream API:
+        `GET: /api/v1/changes/stream`
+        Subscribes before reading changes missed after `last_event_id`, so no change is lost
+        between them (some may be sent twice). Returns async iterator over encoded events.
+        """
+        queue = change_feed.subscribe()
+        if queue is None:
+            raise HTTPException(http.HTTPStatus.SERVICE_UNAVAILABLE, "Too many subscribers, try to do it later.")
+        try:
+            missed_events = [] if last_event_id is None else await self._get_missed_events(last_event_id)
+        except BaseException:
+            change_feed.unsubscribe(queue)
+            raise
+        return change_feed.stream(queue, missed_events)
+
+    async def _get_missed_events(self, last_event_id: int) -> list[ChangeEvent]:
+        """
+        Returns events of changes after `last_event_id`, consecutive changes of the same entity in one event.
+        Too many changes are replaced by single `reset` event. Events' IDs don't exceed the last final `seq`
+        got before changes, because changes after it may be preceded by ones committed after reading.
+        """
+        max_changes = settings.CHANGES_STREAM_RESUME_MAX_CHANGES
+        last_seq = await self.repo.get_last_seq()
+        changed_ids = await self.repo.get_changed_ids(last_event_id, max_changes + 1)
+        if len(changed_ids) > max_changes:
+            return [ChangeEvent("reset", {}, last_seq)]
+        missed_events = []
+        for entity, entity_changes in itertools.groupby(changed_ids, key=lambda change: change.entity):
+            entity_changes = list(entity_changes)
+            missed_events.append(ChangeEvent(
+                "change",
+                {"entity": entity, "version": None, "ids": [str(change.id) for change in entity_changes]},
+                min(entity_changes[-1].seq, last_seq)
+            ))
+        return missed_events
@@ -1,15 +1,45 @@
 import http
 import typing as tp
+from dataclasses import replace
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
 from fastapi.exceptions import HTTPException
 
+from src.core.config import settings
 from src.db.abstract_repository import AbstractRepository
-from src.db.postgres.repositories import SQLAlchemyEssentialsToGetList
+from src.db.postgres.repositories import SQLAlchemyEssentialsToGetList, build_list_cache
 from src.model.db_entity import Product
-from src.model.schema.common import PaginatedList
-from src.model.schema.products import ProductCreate, ProductsPaginatedListQueryParams, ProductOrdering, ProductEdit
+from src.model.schema.categories import CategoryShowMinimal, CategoriesPaginatedListQueryParams, CategoryOrdering
+from src.model.schema.common import BulkResult, ListCountMode
+from src.model.schema.products import ProductCreate, ProductsPaginatedListQueryParams, ProductOrdering, ProductEdit, \
+    ProductsBulkCreate, ProductsExportQueryParams, ProductShow, CategoryProductsPaginatedListQueryParams, \
+    ProductsPaginatedList, ProductsBatch
+from src.service.categories import CATEGORIES_LIST_ESSENTIALS
+
+
+# Immutable, so it's built once and shared by all requests
+PRODUCTS_LIST_ESSENTIALS = SQLAlchemyEssentialsToGetList(
+    order_expressions={
+        ProductOrdering.name_asc: [Product.name.asc()],
+        ProductOrdering.name_desc: [Product.name.desc()],
+        ProductOrdering.relevance: [Product.name.asc()]
+    },
+    search_attrs=[Product.name],
+    column_filter_attrs={"category_id": Product.category_id},
+    relevance_ordering=ProductOrdering.relevance,
+    relationships_to_load=[Product.category]
+)
+# Exported products don't embed their categories, so they're streamed as Core rows
+PRODUCTS_EXPORT_ESSENTIALS = replace(
+    PRODUCTS_LIST_ESSENTIALS,
+    select_columns=[Product.id, Product.name, Product.category_id],
+    relationships_to_load=None
+)
+
+# Shared by all requests of the worker, keyed by products' version, so writes make old entries unreachable
+PRODUCTS_LIST_CACHE = build_list_cache()
 
 
 class ProductService:
@@ -18,37 +48,156 @@ class ProductService:
     def __init__(
             self,
             repo: AbstractRepository,
+            category_repo: AbstractRepository,
     ):
         self.repo = repo
+        self.category_repo = category_repo
 
-    async def get(self, product_id: UUID):
+    async def get(self, product_id: UUID) -> ProductShow:
         """
         Handles getting product's profile API:
         `GET: /api/v1/products/{id}`
+        Product and their category are read through their repositories' detail caches.
         """
-        return await self.get_or_404(product_id)
+        product = await self.repo.get_row(product_id)
+        if product is None:
+            raise HTTPException(http.HTTPStatus.NOT_FOUND, "Product was not found")
+        product_show = ProductShow.model_validate(product)
+        if product.category_id is not None:
+            category = await self.category_repo.get_row(product.category_id)
+            if category is not None:
+                product_show.category = CategoryShowMinimal.model_validate(category)
+        return product_show
+
+    async def get_batch(self, product_ids: list[UUID]) -> ProductsBatch:
+        """
+        Handles getting products by IDs API:
+        `GET: /api/v1/products?ids=...`, `POST: /api/v1/products:batchGet`
+        Products and their categories are read through their repositories' detail caches,
+        missing ones by single query per repository.
+        """
+        products_batch = ProductsBatch.from_rows(product_ids, await self.repo.get_rows(product_ids))
+        category_ids = {product.category_id for product in products_batch.content if product.category_id is not None}
+        if category_ids:
+            categories_by_id = {
+                category.id: category for category in await self.category_repo.get_rows(list(category_ids))
+            }
+            for product in products_batch.content:
+                category = categories_by_id.get(product.category_id)
+                if category is not None:
+                    product.category = CategoryShowMinimal.model_validate(category)
+        return products_batch
 
     async def get_list(self, query_params: ProductsPaginatedListQueryParams):
         """
         Handles getting products' paginated list API:
         `GET: /api/v1/products`
+        Results are cached by normalized query params and products' version,
+        identical concurrent requests of missing result make a single query.
         """
-        list_content, total_pages, total_items = await self.repo.get_list(
+        if PRODUCTS_LIST_CACHE is None:
+            return await self._get_list(query_params)
+        version, _ = await self.get_version()
+        return await PRODUCTS_LIST_CACHE.get_or_load(
+            (version, query_params.cache_key()),
+            lambda: self._get_list(query_params)
+        )
+
+    async def _get_list(self, query_params: ProductsPaginatedListQueryParams) -> ProductsPaginatedList:
+        """Gets products' paginated list (and it's facets, if they're requested) from storage."""
+        list_content, total_pages, total_items, next_cursor = await self.repo.get_list(
             query_params=query_params,
-            essentials=SQLAlchemyEssentialsToGetList(
-                order_expressions={
-                    ProductOrdering.name_asc: [Product.name.asc()],
-                    ProductOrdering.name_desc: [Product.name.desc()]
-                },
-                search_attrs=[Product.name]
-            )
+            essentials=PRODUCTS_LIST_ESSENTIALS
         )
-        return PaginatedList(
-            content=list_content,
-            total_pages=total_pages,
-            total_items=total_items
+        category_facets = await self._get_category_facets(query_params) if query_params.facets else None
+        return ProductsPaginatedList.model_validate(
+            {
+                "content": list_content,
+                "total_pages": total_pages,
+                "total_items": total_items,
+                "next_cursor": next_cursor,
+                "category_facets": category_facets,
+            },
+            from_attributes=True
         )
 
+    async def _get_category_facets(
+            self,
+            query_params: ProductsPaginatedListQueryParams
+    ) -> list[CategoryShowMinimal]:
+        """
+        Returns categories of the list's products with number of their products in the list,
+        the most numerous first. Unsearched list's numbers are categories' maintained `product_count`,
+        so products aren't scanned, searched list's products are counted by categories.
+        """
+        limit = settings.FACETS_MAX_CATEGORIES
+        if query_params.search:
+            category_counts = await self.repo.count_list_by(
+                query_params, PRODUCTS_LIST_ESSENTIALS, Product.category_id, limit
+            )
+            categories = await self.category_repo.get_rows([category_id for category_id, _ in category_counts])
+            categories_by_id = {category.id: category for category in categories}
+            return [
+                CategoryShowMinimal(
+                    id=category_id, name=categories_by_id[category_id].name, product_count=product_count
+                )
+                for category_id, product_count in category_counts
+                if category_id in categories_by_id
+            ]
+
+        if query_params.category_id:
+            categories = sorted(
+                await self.category_repo.get_rows(query_params.category_id),
+                key=lambda category: (-category.product_count, category.id)
+            )[:limit]
+        else:
+            categories, *_ = await self.category_repo.get_list(
+                CategoriesPaginatedListQueryParams(
+                    ordering=CategoryOrdering.product_count_desc,
+                    search=None,
+                    page_number=1,
+                    page_size=limit,
+                    count=ListCountMode.none,
+                    cursor=None
+                ),
+                CATEGORIES_LIST_ESSENTIALS
+            )
+        return [
+            CategoryShowMinimal.model_validate(category) for category in categories if category.product_count > 0
+        ]
+
+    async def get_category_list(
+            self,
+            category_id: UUID,
+            query_params: CategoryProductsPaginatedListQueryParams
+    ) -> ProductsPaginatedList:
+        """
+        Handles getting category's products' paginated list API:
+        `GET: /api/v1/categories/{id}/products`
+        It's products' list filtered by the category, so it shares products' lists cache.
+        """
+        return await self.get_list(ProductsPaginatedListQueryParams(
+            **query_params.model_dump(), category_id=[category_id], facets=False
+        ))
+
+    def export(self, query_params: ProductsExportQueryParams) -> tp.AsyncIterator[tp.Any]:
+        """
+        Handles exporting all products API:
+        `GET: /api/v1/products/export`
+        Returns async iterator over all searched products' rows, streamed from DB.
+        """
+        return self.repo.stream_list(query_params, PRODUCTS_EXPORT_ESSENTIALS)
+
+    async def get_version(self) -> tuple[str, datetime]:
+        """
+        Returns products' change version and time of their last change,
+        used for conditional GET and cache of products' list and profiles.
+        Products embed their categories, so categories' changes are included.
+        """
+        version, updated_at = await self.repo.get_version()
+        category_version, category_updated_at = await self.category_repo.get_version()
+        return f"{version}.{category_version}", max(updated_at, category_updated_at)
+
     async def get_or_404(
             self,
             product_id: Optional[UUID] = None,
@@ -68,24 +217,35 @@ class ProductService:
         """
         Handles create new product API:
         `POST: /api/v1/products`
+        Taken name is detected by DB's unique constraint.
         """
-        existing_name = await self.repo.get(name=params.name)
-        if existing_name:
-            raise HTTPException(http.HTTPStatus.BAD_REQUEST, "Name is already taken.")
         new_product: Product = await self.repo.create(**params.model_dump())
         await self.repo.save()
         return new_product
 
+    async def bulk_create(self, params: ProductsBulkCreate, upsert: bool = False) -> BulkResult:
+        """
+        Handles create (or upsert) products in bulk API:
+        `POST: /api/v1/products:bulk`
+        All items are saved in a single transaction.
+        """
+        rows = [item.model_dump() for item in params.items]
+        if upsert:
+            outcomes = await self.repo.bulk_upsert(rows)
+        else:
+            outcomes = await self.repo.bulk_create(rows)
+        await self.repo.save()
+        return BulkResult.from_outcomes(outcomes)
+
     async def edit(self, product_id: UUID, params: ProductEdit):
         """
         Handle product's editing API:
         `PUT: /api/v1/products/{id}`
+        Taken name is detected by DB's unique constraint.
         """
-        product = await self.get_or_404(product_id)
-        same_name_product = await self.repo.get(name=params.name)
-        if all((same_name_product, same_name_product != product)):
-            raise HTTPException(http.HTTPStatus.BAD_REQUEST, "Product already exists.")
-        await self.repo.update(product_id, **params.model_dump())
+        product = await self.repo.update(product_id, **params.model_dump())
+        if not product:
+            raise HTTPException(http.HTTPStatus.NOT_FOUND, "Product was not found")
         await self.repo.save()
         return product
 
@@ -94,6 +254,7 @@ class ProductService:
         Handles delete product API:
         `DELETE: /api/v1/products/{id}`.
         """
-        await self.get_or_404(product_id)
-        await self.repo.delete(product_id)
+        deleted_id = await self.repo.delete(product_id)
+        if deleted_id is None:
+            raise HTTPException(http.HTTPStatus.NOT_FOUND, "Product was not found")
         await self.repo.save()
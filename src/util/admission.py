@@ -0,0 +1,186 @@
+"""
+Admission control of every worker: in-flight requests are limited per route class (reads and writes),
+excess requests wait in a short queue, and are shed with 503 when it's full or their wait is too long.
+Limits adapt to DB latency (AIMD): they shrink when DB gets slow, and grow back while it's fast.
+"""
+
+import asyncio
+import http
+import time
+import typing as tp
+from collections import deque
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.config import settings
+from src.util.metrics import ADMISSION_LIMIT, ADMISSION_REJECTIONS_TOTAL
+from src.util.request_stats import get_request_stats
+
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Reads sent by POST, because their params don't fit in URL
+READ_PATH_SUFFIXES = (":batchGet",)
+
+
+class AdmissionRejected(Exception):
+    """Raised when request can't be admitted: `reason` is `queue_full` or `queue_timeout`."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Limit of concurrently processed requests with bounded FIFO queue of waiting ones.
+    Limit is adjusted by requests' DB latency: multiplicatively decreased (at most once per observed latency)
+    when it's above `latency_target_seconds`, additively increased when it's below and the limit is reached.
+    Not thread safe, it's meant to be used from a single event loop.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            max_limit: int,
+            min_limit: int,
+            queue_size: int,
+            queue_timeout_seconds: float,
+            latency_target_seconds: float,
+            decrease_ratio: float = 0.9
+    ):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.queue_size = queue_size
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.latency_target_seconds = latency_target_seconds
+        self.decrease_ratio = decrease_ratio
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._decreased_at = 0.0
+        ADMISSION_LIMIT.labels(name).set(self.limit)
+
+    async def acquire(self):
+        """Takes a slot, waiting for it in the queue. Raises `AdmissionRejected` if it can't be taken."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise AdmissionRejected("queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # Slot is handed over by `release`
+            await asyncio.wait_for(waiter, self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            raise AdmissionRejected("queue_timeout")
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # Cancelled right after slot was handed over, so it's returned
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+
+    def release(self, db_latency_seconds: tp.Optional[float] = None):
+        """Returns a slot, adjusting the limit by request's DB latency if it has one."""
+        if db_latency_seconds is not None:
+            self._adjust(db_latency_seconds)
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _adjust(self, db_latency_seconds: float):
+        if db_latency_seconds > self.latency_target_seconds:
+            now = time.monotonic()
+            # Requests started before the previous decrease don't show it's effect yet
+            if now - self._decreased_at < db_latency_seconds:
+                return
+            self._decreased_at = now
+            self.limit = max(float(self.min_limit), self.limit * self.decrease_ratio)
+        elif self.in_flight >= int(self.limit):
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        else:
+            return
+        ADMISSION_LIMIT.labels(self.name).set(self.limit)
+
+
+def build_admission_limits() -> dict[str, AdaptiveConcurrencyLimit]:
+    """Returns worker's limits of route classes by settings."""
+    return {
+        route_class: AdaptiveConcurrencyLimit(
+            route_class,
+            max_limit=max_limit,
+            min_limit=settings.ADMISSION_MIN_IN_FLIGHT,
+            queue_size=settings.ADMISSION_QUEUE_SIZE,
+            queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            latency_target_seconds=settings.ADMISSION_DB_LATENCY_TARGET_SECONDS
+        )
+        for route_class, max_limit in (
+            ("reads", settings.ADMISSION_READS_MAX_IN_FLIGHT),
+            ("writes", settings.ADMISSION_WRITES_MAX_IN_FLIGHT),
+        )
+    }
+
+
+class AdmissionControlMiddleware:
+    """
+    Admits HTTP requests by limits of their route class: `reads` for GET, HEAD, OPTIONS and batch gets,
+    `writes` for others.
+    Shed requests get 503 with `Retry-After`. Request's DB latency is it's pool wait plus mean statement's time,
+    taken from request's statistics, so it must be inside `RequestStatsMiddleware`.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            limits: dict[str, AdaptiveConcurrencyLimit],
+            retry_after_seconds: int = 1,
+            exempt_paths: tp.Collection[str] = ("/metrics",)
+    ):
+        self.app = app
+        self.limits = limits
+        self.retry_after_seconds = retry_after_seconds
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        is_read = scope["method"] in READ_METHODS or scope["path"].endswith(READ_PATH_SUFFIXES)
+        route_class = "reads" if is_read else "writes"
+        limit = self.limits[route_class]
+        try:
+            await limit.acquire()
+        except AdmissionRejected as e:
+            ADMISSION_REJECTIONS_TOTAL.labels(route_class, e.reason).inc()
+            response = JSONResponse(
+                {"detail": "Service is overloaded, try again later."},
+                status_code=http.HTTPStatus.SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after_seconds)}
+            )
+            await response(scope, receive, send)
+            return
+
+        db_latency_seconds: tp.Optional[float] = None
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            stats = get_request_stats()
+            if stats is not None and stats.statements:
+                db_latency_seconds = stats.pool_wait_seconds + stats.db_seconds / stats.statements
+            limit.release(db_latency_seconds)
@@ -0,0 +1,222 @@
+"""In-process caches."""
+
+import asyncio
+import sys
+import time
+import typing as tp
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+
+
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Cache's counters since it's creation."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+    max_size: int = 0
+    weight: int = 0
+    max_weight: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class LRUTTLCache:
+    """
+    Bounded cache with least recently used eviction and per entry time to live.
+    Not thread safe, it's meant to be used from a single event loop.
+
+    `generation` is incremented on every invalidation. Read `generation` before loading
+    a value from storage and pass it to `set`, so value loaded concurrently
+    with it's invalidation won't be cached.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._entries: OrderedDict[tp.Hashable, tuple[float, tp.Any]] = OrderedDict()
+        self._stats = CacheStats(max_size=max_size)
+
+    def get(self, key: tp.Hashable) -> tp.Any:
+        """Returns cached value or `MISSING`."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    def set(self, key: tp.Hashable, value: tp.Any, generation: tp.Optional[int] = None):
+        """
+        Caches value, evicting least recently used entries above `max_size`.
+        Does nothing if cache was invalidated after `generation` was read.
+        """
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def invalidate(self, key: tp.Hashable):
+        """Removes entry by it's key."""
+        self.generation += 1
+        if self._entries.pop(key, None) is not None:
+            self._stats.invalidations += 1
+
+    def clear(self):
+        """Removes all entries."""
+        self.generation += 1
+        self._stats.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Returns snapshot of cache's counters."""
+        return CacheStats(**{**self._stats.as_dict(), "size": len(self._entries)})
+
+
+def estimate_size(value: tp.Any) -> int:
+    """
+    Roughly estimates memory taken by `value` with all it's contained objects, in bytes.
+    Attributes starting with underscore (e.g. SQLAlchemy's instance state) aren't counted.
+    """
+    seen: set[int] = set()
+    size = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, bytearray)):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (tp.Sequence, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.extend(
+                attr_value for attr_name, attr_value in vars(obj).items() if not attr_name.startswith("_")
+            )
+    return size
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key: while a call is in flight, the same key's callers
+    wait for it's result (or exception) instead of making their own call.
+    Not thread safe, it's meant to be used from a single event loop.
+    """
+
+    def __init__(self):
+        self._calls: dict[tp.Hashable, asyncio.Future] = {}
+
+    async def run(self, key: tp.Hashable, call: tp.Callable[[], tp.Awaitable[tp.Any]]) -> tp.Any:
+        """Returns result of in flight call by `key`, or of new `call()` if there is none."""
+        while (future := self._calls.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Leading caller was cancelled (e.g. client disconnected), so the call is made again
+                if not future.cancelled():
+                    raise
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Marks exception as retrieved, waiters may be absent
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+class SizedLRUCache:
+    """
+    Cache bounded by total estimated size of values (see `estimate_size`) in bytes,
+    with least recently used eviction. Values larger than quarter of `max_weight` aren't cached.
+    Concurrent loads of the same missing key are deduplicated by `SingleFlight`.
+    Not thread safe, it's meant to be used from a single event loop.
+    """
+
+    def __init__(self, max_weight: int, weigher: tp.Callable[[tp.Any], int] = estimate_size):
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.weight = 0
+        self._entries: OrderedDict[tp.Hashable, tuple[int, tp.Any]] = OrderedDict()
+        self._single_flight = SingleFlight()
+        self._stats = CacheStats(max_weight=max_weight)
+
+    def get(self, key: tp.Hashable) -> tp.Any:
+        """Returns cached value or `MISSING`."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return entry[1]
+
+    def set(self, key: tp.Hashable, value: tp.Any):
+        """Caches value, evicting least recently used entries above `max_weight`."""
+        value_weight = self.weigher(value)
+        if value_weight > self.max_weight // 4:
+            return
+        previous_entry = self._entries.pop(key, None)
+        if previous_entry is not None:
+            self.weight -= previous_entry[0]
+        self._entries[key] = (value_weight, value)
+        self.weight += value_weight
+        while self.weight > self.max_weight:
+            _, (evicted_weight, _) = self._entries.popitem(last=False)
+            self.weight -= evicted_weight
+            self._stats.evictions += 1
+
+    async def get_or_load(self, key: tp.Hashable, load: tp.Callable[[], tp.Awaitable[tp.Any]]) -> tp.Any:
+        """Returns cached value, or loads it by `load()` once for all concurrent callers and caches it."""
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        async def load_and_set():
+            loaded_value = await load()
+            self.set(key, loaded_value)
+            return loaded_value
+
+        return await self._single_flight.run(key, load_and_set)
+
+    def clear(self):
+        """Removes all entries."""
+        self._stats.invalidations += len(self._entries)
+        self._entries.clear()
+        self.weight = 0
+
+    def stats(self) -> CacheStats:
+        """Returns snapshot of cache's counters."""
+        return CacheStats(**{**self._stats.as_dict(), "size": len(self._entries), "weight": self.weight})
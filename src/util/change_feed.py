@@ -0,0 +1,112 @@
+"""
+Fan-out of change events to Server-Sent Events subscribers of the worker.
+Events come from the worker's single notifications' listener (or in-memory storages' writes)
+and are put into every subscriber's bounded queue, so a slow subscriber neither delays others
+nor holds unbounded memory: it's stream is closed after the queued events,
+and the client resumes from the last received one by `Last-Event-ID`.
+"""
+
+import asyncio
+import json
+import typing as tp
+from dataclasses import dataclass
+from typing import Optional
+
+from src.core.config import settings
+from src.util.metrics import CHANGES_STREAM_SLOW_DISCONNECTIONS_TOTAL, CHANGES_STREAM_SUBSCRIBERS
+
+
+# Clients' reconnection delay after their stream is closed
+RETRY_MILLISECONDS = 1_000
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    Event of Server-Sent Events stream: `data` is sent as JSON,
+    `id` is the `seq` of changes, up to which all ones are included in the stream, if it's known.
+    """
+    event: str
+    data: dict[str, tp.Any]
+    id: Optional[int] = None
+
+    def encode(self) -> bytes:
+        lines = [] if self.id is None else [f"id: {self.id}"]
+        lines.append(f"event: {self.event}")
+        lines.append(f"data: {json.dumps(self.data, separators=(',', ':'))}")
+        return ("\n".join(lines) + "\n\n").encode()
+
+
+class ChangeFeed:
+    """
+    Publishes events to all subscribers' queues of at most `queue_size` events.
+    Not thread safe, it's meant to be used from a single event loop.
+    """
+
+    def __init__(self, max_subscribers: int, queue_size: int, heartbeat_seconds: float):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._queues: set[asyncio.Queue] = set()
+
+    @property
+    def subscribers_number(self) -> int:
+        return len(self._queues)
+
+    def subscribe(self) -> Optional[asyncio.Queue]:
+        """Returns new subscriber's queue, or None if there are too many subscribers."""
+        if len(self._queues) >= self.max_subscribers:
+            return None
+        # One more place for the closing None
+        queue = asyncio.Queue(self.queue_size + 1)
+        self._queues.add(queue)
+        CHANGES_STREAM_SUBSCRIBERS.inc()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._queues:
+            self._queues.remove(queue)
+            CHANGES_STREAM_SUBSCRIBERS.dec()
+
+    def publish(self, event: ChangeEvent):
+        """Puts event into every subscriber's queue, unsubscribes ones, which queue is full."""
+        for queue in list(self._queues):
+            if queue.qsize() < self.queue_size:
+                queue.put_nowait(event)
+                continue
+            self.unsubscribe(queue)
+            queue.put_nowait(None)
+            CHANGES_STREAM_SLOW_DISCONNECTIONS_TOTAL.inc()
+
+    async def stream(
+            self,
+            queue: asyncio.Queue,
+            initial_events: tp.Iterable[ChangeEvent] = ()
+    ) -> tp.AsyncIterator[bytes]:
+        """
+        Yields encoded `initial_events`, then subscriber's queued events until it's unsubscribed
+        as a slow one, with heartbeat comments, so idle connections aren't closed by proxies.
+        Unsubscribes on exit (e.g. client's disconnection).
+        """
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n".encode()
+            for event in initial_events:
+                yield event.encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": heartbeat\n\n"
+                    continue
+                if event is None:
+                    return
+                yield event.encode()
+        finally:
+            self.unsubscribe(queue)
+
+
+change_feed = ChangeFeed(
+    settings.CHANGES_STREAM_MAX_SUBSCRIBERS,
+    settings.CHANGES_STREAM_QUEUE_SIZE,
+    settings.CHANGES_STREAM_HEARTBEAT_SECONDS
+)
@@ -0,0 +1,44 @@
+"""Opaque cursors for keyset (cursor) pagination."""
+
+import base64
+import binascii
+import json
+import typing as tp
+from datetime import date, datetime
+from enum import Enum
+from uuid import UUID
+
+
+def _encode_value(value: tp.Any) -> tp.Any:
+    if isinstance(value, (UUID, Enum)):
+        return str(value.value if isinstance(value, Enum) else value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(ordering: Enum, keyset_values: tp.Sequence[tp.Any]) -> str:
+    """
+    Encodes position of the last row of the page into opaque url-safe string.
+    Cursor is bound to `ordering`, so it can't be reused with another one.
+    """
+    payload = json.dumps(
+        {"o": ordering.value, "k": [_encode_value(value) for value in keyset_values]},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: Enum) -> list:
+    """
+    Decodes cursor made by `encode_cursor` and returns it's raw keyset values.
+    Raises ValueError if cursor is malformed or was made for another ordering.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_ordering, keyset_values = payload["o"], payload["k"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError) as e:
+        raise ValueError("Malformed cursor.") from e
+    if cursor_ordering != ordering.value or not isinstance(keyset_values, list):
+        raise ValueError("Cursor doesn't match list's ordering.")
+    return keyset_values
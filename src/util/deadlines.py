@@ -0,0 +1,87 @@
+"""
+Request deadlines: every request, which route is decorated by `request_deadline`, must be done
+by it's deadline, taken from `REQUEST_TIMEOUT_HEADER` header or route's default timeout.
+Remaining time is available to storage (e.g. as DB statement timeout) by `get_remaining_seconds`.
+"""
+
+import asyncio
+import functools
+import http
+import time
+import typing as tp
+from contextvars import ContextVar
+
+from fastapi import Request, Response
+from fastapi.exceptions import HTTPException
+
+from src.core.config import settings
+
+
+# Nginx's status of requests closed by client, the response isn't received by anyone
+CLIENT_CLOSED_REQUEST = 499
+
+# Monotonic time of current request's deadline
+current_deadline: ContextVar[tp.Optional[float]] = ContextVar("current_deadline", default=None)
+
+
+def get_remaining_seconds() -> tp.Optional[float]:
+    """Returns seconds left till current request's deadline, or None if it has no deadline."""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def get_timeout_seconds(request: Request, default_seconds: float) -> float:
+    """Returns request's timeout from it's header (limited by `REQUEST_TIMEOUT_MAX_SECONDS`), or the default one."""
+    try:
+        timeout_seconds = float(request.headers[settings.REQUEST_TIMEOUT_HEADER])
+    except (KeyError, ValueError):
+        return default_seconds
+    if not timeout_seconds > 0:
+        return default_seconds
+    return min(timeout_seconds, settings.REQUEST_TIMEOUT_MAX_SECONDS)
+
+
+async def wait_for_disconnect(request: Request):
+    """Returns when client disconnects. Endpoint's body must be already read."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+def request_deadline(default_seconds: float):
+    """
+    Sets endpoint's deadline, put it under route's decorator, endpoint must have `request: Request` parameter.
+    Endpoint is cancelled (with it's DB work) when client disconnects or deadline passes, the latter gets 504.
+    Not for streaming responses: their bodies are sent after endpoint returns.
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"]
+            timeout_seconds = get_timeout_seconds(request, default_seconds)
+            token = current_deadline.set(time.monotonic() + timeout_seconds)
+            try:
+                # Tasks copy current context, so endpoint sees the deadline
+                endpoint_task = asyncio.ensure_future(endpoint(*args, **kwargs))
+            finally:
+                current_deadline.reset(token)
+            disconnect_task = asyncio.ensure_future(wait_for_disconnect(request))
+            try:
+                await asyncio.wait(
+                    {endpoint_task, disconnect_task}, timeout=timeout_seconds, return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                disconnect_task.cancel()
+                endpoint_task.cancel()
+                # Cancelled endpoint is awaited, so it's DB work is stopped before response
+                await asyncio.gather(endpoint_task, disconnect_task, return_exceptions=True)
+            if not endpoint_task.cancelled():
+                return endpoint_task.result()
+            if disconnect_task.done() and not disconnect_task.cancelled():
+                return Response(status_code=CLIENT_CLOSED_REQUEST)
+            raise HTTPException(http.HTTPStatus.GATEWAY_TIMEOUT, "Request deadline exceeded.")
+        return wrapper
+    return decorator
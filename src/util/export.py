@@ -0,0 +1,102 @@
+"""Streaming export of storage instances' lists."""
+
+import csv
+import io
+import typing as tp
+import zlib
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from src.model.schema.common import ExportFormat
+
+
+# Encoded rows are buffered up to this size before sending
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8",
+}
+
+
+async def encode_instances(
+        instances: tp.AsyncIterator[tp.Any],
+        schema: type[BaseModel],
+        export_format: ExportFormat
+) -> tp.AsyncIterator[bytes]:
+    """Encodes instances by `schema` into NDJSON lines or CSV rows (with header), yields chunks of bytes."""
+    buffer = io.StringIO()
+    csv_writer = csv.writer(buffer, lineterminator="\n")
+    if export_format == ExportFormat.csv:
+        csv_writer.writerow(schema.model_fields.keys())
+
+    async for instance in instances:
+        validated_instance = schema.model_validate(instance)
+        if export_format == ExportFormat.csv:
+            csv_writer.writerow(validated_instance.model_dump(mode="json").values())
+        else:
+            buffer.write(validated_instance.model_dump_json())
+            buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks: tp.AsyncIterator[bytes]) -> tp.AsyncIterator[bytes]:
+    """Compresses chunks into gzip stream on the fly."""
+    compressor = zlib.compressobj(level=6, wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed_chunk = compressor.compress(chunk)
+        if compressed_chunk:
+            yield compressed_chunk
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether `Accept-Encoding` header's value allows gzip: `gzip` (or it's alias `x-gzip`)
+    or, if it isn't listed, `*` has q-value above 0. Malformed q-values are 0.
+    """
+    q_values: dict[str, float] = {}
+    for coding in accept_encoding.split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        if not name:
+            continue
+        q_value = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q_value = float(value)
+                except ValueError:
+                    q_value = 0.0
+        name = name.lower()
+        q_values["gzip" if name == "x-gzip" else name] = q_value
+    return q_values.get("gzip", q_values.get("*", 0.0)) > 0
+
+
+def export_response(
+        request: Request,
+        instances: tp.AsyncIterator[tp.Any],
+        schema: type[BaseModel],
+        export_format: ExportFormat,
+        filename: str
+) -> StreamingResponse:
+    """
+    Returns response streaming instances in `export_format`,
+    gzip-encoded if client accepts it.
+    """
+    chunks = encode_instances(instances, schema, export_format)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"',
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=EXPORT_MEDIA_TYPES[export_format], headers=headers)
@@ -0,0 +1,68 @@
+"""Conditional GET by storage's change version (`ETag`, `Last-Modified`, `304 Not Modified`)."""
+
+import http
+import typing as tp
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from fastapi.exceptions import HTTPException
+
+
+class VersionedService(tp.Protocol):
+    async def get_version(self) -> tuple[tp.Union[int, str], datetime]:
+        ...
+
+
+def is_etag_matched(if_none_match: str, etag: str) -> bool:
+    """Checks `If-None-Match` header's value against `etag` by weak comparison."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        client_etag.strip().removeprefix("W/") == opaque_tag
+        for client_etag in if_none_match.split(",")
+    )
+
+
+def is_not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    """Checks `If-Modified-Since` header's value against `last_modified` with HTTP-date's (second) precision."""
+    try:
+        modified_since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if modified_since.tzinfo is None:
+        modified_since = modified_since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= modified_since
+
+
+async def conditional_get(
+        request: Request,
+        response: Response,
+        service: VersionedService,
+        cache_control: str
+) -> dict[str, str]:
+    """
+    Evaluates request's preconditions by service's storage version, before the storage is queried.
+    Raises 304 if client's copy is still fresh, `If-Modified-Since` is ignored if `If-None-Match` is sent.
+    Otherwise sets cache headers to injected `response` and returns them,
+    to be passed to responses which are returned by route directly.
+    """
+    version, updated_at = await service.get_version()
+    headers = {
+        "ETag": f'W/"{version}"',
+        "Last-Modified": format_datetime(updated_at.astimezone(timezone.utc), usegmt=True),
+        "Cache-Control": cache_control,
+    }
+    if_none_match = request.headers.get("If-None-Match")
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_none_match is not None:
+        is_not_modified = is_etag_matched(if_none_match, headers["ETag"])
+    elif if_modified_since is not None:
+        is_not_modified = is_not_modified_since(if_modified_since, updated_at)
+    else:
+        is_not_modified = False
+    if is_not_modified:
+        raise HTTPException(http.HTTPStatus.NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return headers
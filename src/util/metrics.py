@@ -0,0 +1,134 @@
+"""
+Prometheus metrics of the app, served at `/metrics` in text exposition format.
+Under gunicorn, every worker writes it's metrics to memory mapped files in `PROMETHEUS_MULTIPROC_DIR`
+(it must be set before the app is imported), and `/metrics` aggregates all workers' files.
+"""
+
+import asyncio
+import os
+import time
+import typing as tp
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP requests' latency by route.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+)
+RATE_LIMIT_REJECTIONS_TOTAL = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by rate limiter."
+)
+DB_ERRORS_TOTAL = Counter(
+    "db_errors_total",
+    "DB errors handled by repositories, by error's type.",
+    ["type"]
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "DB pool's connections, summed over live workers.",
+    multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "DB pool's checked out connections, summed over live workers.",
+    multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "DB pool's overflow connections, summed over live workers.",
+    multiprocess_mode="livesum"
+)
+ADMISSION_REJECTIONS_TOTAL = Counter(
+    "admission_rejections_total",
+    "Requests shed by admission control, by route class and reason.",
+    ["route_class", "reason"]
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_limit",
+    "Adaptive in-flight requests' limit of route class, summed over live workers.",
+    ["route_class"],
+    multiprocess_mode="livesum"
+)
+CHANGES_STREAM_SUBSCRIBERS = Gauge(
+    "changes_stream_subscribers",
+    "Subscribers of changes' event stream, summed over live workers.",
+    multiprocess_mode="livesum"
+)
+CHANGES_STREAM_SLOW_DISCONNECTIONS_TOTAL = Counter(
+    "changes_stream_slow_disconnections_total",
+    "Subscribers of changes' event stream disconnected for not keeping up with events."
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay of worker's event loop in running a scheduled callback.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+
+def is_multiprocess() -> bool:
+    """Checks whether metrics are written to files shared by workers."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def metrics_response() -> Response:
+    """Returns all metrics in text exposition format, aggregated over all workers in multiprocess mode."""
+    registry = REGISTRY
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+async def collect_worker_metrics(engine: AsyncEngine, interval_seconds: float):
+    """
+    Background loop of every worker: measures event loop's lag by oversleeping of every interval
+    and updates DB pool's gauges. Gauges are updated here, because `/metrics` request
+    is served by one worker, which can't read the others' pools.
+    """
+    pool = engine.sync_engine.pool
+    while True:
+        started_at = time.perf_counter()
+        await asyncio.sleep(interval_seconds)
+        EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - started_at - interval_seconds))
+        DB_POOL_SIZE.set(pool.size())
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(max(0, pool.overflow()))
+
+
+class MetricsMiddleware:
+    """Observes latency of every HTTP request by it's route's path template and response's status."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route: tp.Any = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(time.perf_counter() - started_at)
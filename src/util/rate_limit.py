@@ -1,4 +1,193 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+"""
+Rate limiting shared by all workers on the host.
 
-limiter = Limiter(key_func=get_remote_address, application_limits=["1/minute"])
+Limits are enforced by GCRA (generic cell rate algorithm, a token bucket which state is
+a single "theoretical arrival time"). Buckets live in a memory-mapped file, so all
+workers see one bucket per client key without any external service. The file is
+split into groups of slots, every group is guarded by one of striped `fcntl` byte-range locks.
+"""
+
+import fcntl
+import functools
+import hashlib
+import http
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import time
+import typing as tp
+from dataclasses import dataclass
+
+from fastapi import Request
+from fastapi.exceptions import HTTPException
+
+from src.core.config import settings
+from src.util.metrics import RATE_LIMIT_REJECTIONS_TOTAL
+
+
+HEADER_SIZE = mmap.PAGESIZE
+SLOTS_PER_GROUP = 8
+# Slot: key's hash (0 - empty slot) and theoretical arrival time of the next request
+SLOT = struct.Struct("<Qd")
+
+LIMIT_PERIODS = {"second": 1, "minute": 60, "hour": 60 * 60, "day": 24 * 60 * 60}
+LIMIT_PATTERN = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`amount` of requests per `period_seconds`, all of them may come in a burst."""
+    amount: int
+    period_seconds: float
+
+    @classmethod
+    def parse(cls, limit: str) -> "RateLimit":
+        """Parses limits like `100/minute`, `10 per second`, `1000/2 hours`."""
+        match = LIMIT_PATTERN.match(limit)
+        if match is None:
+            raise ValueError(f"Invalid rate limit: {limit}")
+        amount, multiplier, period = match.groups()
+        return cls(int(amount), int(multiplier or 1) * LIMIT_PERIODS[period])
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period_seconds / self.amount
+
+
+def get_remote_address(request: Request) -> str:
+    """Returns client's IP address as rate limit key."""
+    return request.client.host if request.client else "127.0.0.1"
+
+
+class SharedMemoryBuckets:
+    """
+    GCRA buckets table in a memory-mapped file, shared by processes which open the same `path`.
+    When all slots of key's group are taken by active buckets of other keys, the bucket
+    closest to expiration is reused, which can only make limiting more lenient.
+    """
+
+    def __init__(self, path: str, slots_number: int, lock_stripes: int = 256):
+        self.path = path
+        self.groups_number = max(1, slots_number // SLOTS_PER_GROUP)
+        self.lock_stripes = min(lock_stripes, HEADER_SIZE)
+        self._fd: tp.Optional[int] = None
+        self._map: tp.Optional[mmap.mmap] = None
+        self._pid: tp.Optional[int] = None
+
+    def _open(self):
+        size = HEADER_SIZE + self.groups_number * SLOTS_PER_GROUP * SLOT.size
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            if os.fstat(self._fd).st_size != size:
+                # New file or another layout: start from empty buckets
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+        self._map = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        self._pid = os.getpid()
+
+    def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        Takes one request from key's bucket.
+        Returns 0 if request is allowed, otherwise seconds to wait before retrying.
+        """
+        if self._pid != os.getpid():
+            # Opened lazily in every worker process, after fork
+            self._open()
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        group = key_hash % self.groups_number
+        group_offset = HEADER_SIZE + group * SLOTS_PER_GROUP * SLOT.size
+        stripe = 1 + group % (self.lock_stripes - 1)
+
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe)
+        try:
+            now = time.time()
+            slot_offset, theoretical_arrival = self._find_slot(group_offset, key_hash, now)
+            theoretical_arrival = max(theoretical_arrival, now) + limit.emission_interval
+            wait_seconds = theoretical_arrival - now - limit.period_seconds
+            if wait_seconds > 0:
+                return wait_seconds
+            SLOT.pack_into(self._map, slot_offset, key_hash, theoretical_arrival)
+            return 0
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe)
+
+    def _find_slot(self, group_offset: int, key_hash: int, now: float) -> tuple[int, float]:
+        """Returns key's slot offset and it's theoretical arrival time (0 for new bucket)."""
+        free_slot_offset: tp.Optional[int] = None
+        oldest_slot_offset, oldest_arrival = group_offset, float("inf")
+        for slot_offset in range(group_offset, group_offset + SLOTS_PER_GROUP * SLOT.size, SLOT.size):
+            slot_key_hash, theoretical_arrival = SLOT.unpack_from(self._map, slot_offset)
+            if slot_key_hash == key_hash:
+                return slot_offset, theoretical_arrival
+            # Bucket with arrival time in the past is full, so it's the same as an empty one
+            if free_slot_offset is None and (slot_key_hash == 0 or theoretical_arrival <= now):
+                free_slot_offset = slot_offset
+            if theoretical_arrival < oldest_arrival:
+                oldest_slot_offset, oldest_arrival = slot_offset, theoretical_arrival
+        return (free_slot_offset if free_slot_offset is not None else oldest_slot_offset), 0.0
+
+
+class Limiter:
+    """
+    Rate limiter for API endpoints, shared by all workers on the host.
+    Usage: `@limiter.limit("100/minute")` under route decorator,
+    endpoint must have `request: Request` parameter.
+    """
+
+    def __init__(
+            self,
+            buckets: SharedMemoryBuckets,
+            key_func: tp.Callable[[Request], str] = get_remote_address
+    ):
+        self.buckets = buckets
+        self.key_func = key_func
+        self.rejections = 0
+
+    def limit(self, limit: str):
+        """Limits endpoint's requests per client key, every endpoint has it's own buckets."""
+        rate_limit = RateLimit.parse(limit)
+
+        def decorator(endpoint):
+            endpoint_key = f"{endpoint.__module__}.{endpoint.__qualname__}"
+
+            @functools.wraps(endpoint)
+            async def wrapper(*args, **kwargs):
+                request: Request = kwargs["request"]
+                self.check(f"{endpoint_key}:{self.key_func(request)}", rate_limit)
+                return await endpoint(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def check(self, key: str, rate_limit: RateLimit):
+        """Raises 429 HTTPException with `Retry-After` header if `key` exceeded `rate_limit`."""
+        try:
+            wait_seconds = self.buckets.acquire(key, rate_limit)
+        except OSError as e:
+            # Limiter's failure mustn't make API unavailable
+            logging.error(f"ERROR rate limiting: {e}")
+            return
+        if wait_seconds:
+            self.rejections += 1
+            RATE_LIMIT_REJECTIONS_TOTAL.inc()
+            raise HTTPException(
+                http.HTTPStatus.TOO_MANY_REQUESTS,
+                f"Rate limit exceeded: {rate_limit.amount} per {rate_limit.period_seconds:g} seconds.",
+                headers={"Retry-After": str(max(1, round(wait_seconds)))}
+            )
+
+
+def get_buckets_path() -> str:
+    """Returns buckets' file path: settings' one, or file in shared memory (if it exists) or temp dir."""
+    if settings.RATE_LIMIT_BUCKETS_PATH:
+        return settings.RATE_LIMIT_BUCKETS_PATH
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "simple-shop-api-rate-limit")
+
+
+limiter = Limiter(SharedMemoryBuckets(get_buckets_path(), settings.RATE_LIMIT_SLOTS))
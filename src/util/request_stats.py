@@ -0,0 +1,149 @@
+"""
+Per-request statistics of DB usage and serialization:
+- collected into `RequestStats` of the current request's context,
+- sent to client as `Server-Timing` header and logged as JSON by `RequestStatsMiddleware`,
+- checked against routes' declarative `query_budget`.
+"""
+
+import json
+import logging
+import time
+import typing as tp
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestStats:
+    """Request's counters, DB time includes only statements' execution."""
+    statements: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+
+
+current_request_stats: ContextVar[tp.Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def get_request_stats() -> tp.Optional[RequestStats]:
+    """Returns current request's statistics, or None outside of instrumented request."""
+    return current_request_stats.get()
+
+
+@contextmanager
+def measure_serialization():
+    """Adds block's duration to current request's serialization time."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.serialization_seconds += time.perf_counter() - started_at
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """Maximal number of SQL statements route's request is expected to run."""
+    statements: int
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode, when request ran more SQL statements than route's budget."""
+
+
+def query_budget(statements: int):
+    """
+    Declares route's SQL statements budget. Put it under route's decorator:
+    exceeded budget is logged as warning, or raises `QueryBudgetExceeded` in strict mode (in tests).
+    """
+    def decorator(func):
+        func.query_budget = QueryBudget(statements)
+        return func
+    return decorator
+
+
+def format_server_timing(stats: RequestStats, total_seconds: float) -> str:
+    """Formats statistics as `Server-Timing` header's value, durations are in milliseconds."""
+    metrics = [
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} statements"',
+        f'db-pool;dur={stats.pool_wait_seconds * 1000:.2f}',
+        f'serialize;dur={stats.serialization_seconds * 1000:.2f}',
+        f'total;dur={total_seconds * 1000:.2f}',
+    ]
+    return ", ".join(metrics)
+
+
+class RequestStatsMiddleware:
+    """
+    Collects statistics of every HTTP request, adds them to response as `Server-Timing` header,
+    logs them and checks them against route's `query_budget`.
+    Statements run by streamed response's body are logged, but aren't in it's header.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True, strict_budgets: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+        self.strict_budgets = strict_budgets
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started_at = time.perf_counter()
+        status_code: tp.Optional[int] = None
+
+        async def send_with_server_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", format_server_timing(stats, time.perf_counter() - started_at))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            current_request_stats.reset(token)
+            self._log(scope, stats, status_code, time.perf_counter() - started_at)
+        self._check_budget(scope, stats)
+
+    @staticmethod
+    def _get_route_name(scope: Scope) -> tp.Optional[str]:
+        route = scope.get("route")
+        return getattr(route, "name", None)
+
+    def _log(self, scope: Scope, stats: RequestStats, status_code: tp.Optional[int], total_seconds: float):
+        logger.info(json.dumps({
+            "event": "request_stats",
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": self._get_route_name(scope),
+            "status": status_code,
+            "total_seconds": round(total_seconds, 6),
+            **{name: round(value, 6) for name, value in asdict(stats).items()},
+        }))
+
+    def _check_budget(self, scope: Scope, stats: RequestStats):
+        endpoint = getattr(scope.get("route"), "endpoint", None)
+        budget: tp.Optional[QueryBudget] = getattr(endpoint, "query_budget", None)
+        if budget is None or stats.statements <= budget.statements:
+            return
+        message = (
+            f"Route {self._get_route_name(scope)} ran {stats.statements} SQL statements, "
+            f"budget is {budget.statements}"
+        )
+        if self.strict_budgets:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,48 @@
+"""Custom API responses."""
+
+import typing as tp
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from src.core.config import settings
+from src.util.request_stats import measure_serialization
+
+
+class SchemaJSONResponse(Response):
+    """
+    JSON response, which validates content by pydantic `schema` once
+    and serializes it straight to bytes by pydantic-core.
+    """
+    media_type = "application/json"
+
+    def __init__(
+            self,
+            content: tp.Any,
+            schema: type[BaseModel],
+            status_code: int = 200,
+            headers: tp.Optional[tp.Mapping[str, str]] = None
+    ):
+        self.schema = schema
+        super().__init__(content, status_code, headers)
+
+    def render(self, content: tp.Any) -> bytes:
+        with measure_serialization():
+            return to_json(self.schema.model_validate(content, from_attributes=True))
+
+
+def schema_response(
+        content: tp.Any,
+        schema: type[BaseModel],
+        headers: tp.Optional[tp.Mapping[str, str]] = None
+) -> tp.Any:
+    """
+    Returns `SchemaJSONResponse` if `FAST_JSON_RESPONSES` setting is on, otherwise
+    returns content as is, to be validated and serialized by route's `response_model`.
+    Route's `response_model` must be the same `schema` to keep OpenAPI docs correct.
+    `headers` are set to `SchemaJSONResponse`, as it replaces route's injected `Response`.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        return SchemaJSONResponse(content, schema, headers=headers)
+    return content
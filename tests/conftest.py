@@ -0,0 +1,55 @@
+"""
+Tests run the app in-process behind httpx's ASGI transport, with in-memory storage by default.
+With `STORAGE_BACKEND=postgres` they use the migrated test DB (`TEST_POSTGRES_*` settings).
+Settings are read on app's import, so they're set here before it.
+"""
+
+import os
+import typing as tp
+from pathlib import Path
+
+import httpx
+import pytest
+from dotenv import dotenv_values
+
+
+env_file_values = dotenv_values(Path(__file__).resolve().parent.parent / ".env")
+for name in ("SERVER", "USER", "PASSWORD", "DB"):
+    test_value = os.environ.get(f"TEST_POSTGRES_{name}", env_file_values.get(f"TEST_POSTGRES_{name}"))
+    if test_value is not None:
+        os.environ[f"POSTGRES_{name}"] = test_value
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+# Requests exceeding their route's `query_budget` fail
+os.environ.setdefault("QUERY_BUDGETS_STRICT", "true")
+# Rate limiter would reject test requests
+os.environ["API_REQUEST_LIMIT_PER_MINUTE"] = str(10 ** 9)
+# Tests marked as `slow` are skipped without it
+RUN_SLOW_TESTS = os.environ.get("SLOW_TESTS", "").lower() in ("1", "true")
+
+
+def pytest_configure(config: pytest.Config):
+    config.addinivalue_line("markers", "slow: long-running test, which runs only with `SLOW_TESTS=true`")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]):
+    if RUN_SLOW_TESTS:
+        return
+    skip_slow = pytest.mark.skip(reason="Slow tests run only with `SLOW_TESTS=true`")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def client() -> tp.AsyncIterator[httpx.AsyncClient]:
+    """Client of the app, which runs with it's lifespan."""
+    from src.main import app
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client
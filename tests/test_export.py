@@ -0,0 +1,24 @@
+import pytest
+
+from src.util.export import accepts_gzip
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip", True),
+        ("deflate, gzip;q=0.5", True),
+        ("X-GZIP", True),
+        ("*", True),
+        ("br, *;q=0.1", True),
+        ("", False),
+        ("identity", False),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000", False),
+        ("identity, x-gzip;q=0", False),
+        ("*;q=1, gzip;q=0", False),
+        ("gzip;q=oops", False),
+    ]
+)
+def test_accepts_gzip(accept_encoding: str, expected: bool):
+    assert accepts_gzip(accept_encoding) is expected
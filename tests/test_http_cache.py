@@ -0,0 +1,46 @@
+from uuid import uuid4
+
+import httpx
+import pytest
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_conditional_get_after_own_write_is_not_modified_only_before_it(client: httpx.AsyncClient):
+    name = f"{uuid4().hex[:12]}-c"
+    params = {"search": name}
+    first_response = await client.get("/api/v1/categories", params=params)
+    not_modified_response = await client.get(
+        "/api/v1/categories", params=params, headers={"If-None-Match": first_response.headers["ETag"]}
+    )
+    category = (await client.post("/api/v1/categories", json={"name": name})).json()
+    modified_response = await client.get(
+        "/api/v1/categories", params=params, headers={"If-None-Match": first_response.headers["ETag"]}
+    )
+
+    assert not_modified_response.status_code == 304
+    assert modified_response.status_code == 200
+    assert modified_response.headers["ETag"] != first_response.headers["ETag"]
+    assert [item["id"] for item in modified_response.json()["content"]] == [category["id"]]
+
+
+async def test_conditional_get_after_own_write_of_counted_references(client: httpx.AsyncClient):
+    names_prefix = uuid4().hex[:12]
+    category = (await client.post("/api/v1/categories", json={"name": f"{names_prefix}-c"})).json()
+    category_response = await client.get(f"/api/v1/categories/{category['id']}")
+    products_response = await client.get("/api/v1/products", params={"category_id": category["id"]})
+    await client.post("/api/v1/products", json={"name": f"{names_prefix}-p", "category_id": category["id"]})
+    modified_category_response = await client.get(
+        f"/api/v1/categories/{category['id']}", headers={"If-None-Match": category_response.headers["ETag"]}
+    )
+    modified_products_response = await client.get(
+        "/api/v1/products",
+        params={"category_id": category["id"]},
+        headers={"If-None-Match": products_response.headers["ETag"]}
+    )
+
+    assert modified_category_response.status_code == 200
+    assert modified_category_response.json()["product_count"] == 1
+    assert modified_products_response.status_code == 200
+    assert len(modified_products_response.json()["content"]) == 1
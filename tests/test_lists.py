@@ -0,0 +1,70 @@
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from src.core.config import settings
+from src.model.schema.common import ListCountMode
+from src.model.schema.products import ProductsPaginatedListQueryParams, ProductOrdering
+
+
+pytestmark = pytest.mark.anyio
+
+
+def build_products_query_params(category_ids: list) -> ProductsPaginatedListQueryParams:
+    # Defaults are FastAPI's `Query` params, so every field is set
+    return ProductsPaginatedListQueryParams(
+        ordering=ProductOrdering.name_asc,
+        search=None,
+        page_number=1,
+        page_size=50,
+        count=ListCountMode.exact,
+        cursor=None,
+        category_id=category_ids,
+        facets=False
+    )
+
+
+def test_cache_key_is_hashable_with_list_params():
+    category_ids = [uuid4(), uuid4()]
+    query_params = build_products_query_params(category_ids)
+    reordered_query_params = build_products_query_params([*reversed(category_ids), category_ids[0]])
+
+    assert hash(query_params.cache_key()) == hash(reordered_query_params.cache_key())
+    assert query_params.cache_key() == reordered_query_params.cache_key()
+
+
+async def test_products_filtered_by_category_with_list_cache(client: httpx.AsyncClient):
+    assert settings.LIST_CACHE_MAX_BYTES > 0
+    names_prefix = uuid4().hex[:12]
+    category = (await client.post("/api/v1/categories", json={"name": f"{names_prefix}-c"})).json()
+    product = (await client.post(
+        "/api/v1/products", json={"name": f"{names_prefix}-p", "category_id": category["id"]}
+    )).json()
+
+    for _ in range(2):
+        filtered_response = await client.get("/api/v1/products", params={"category_id": category["id"]})
+        category_products_response = await client.get(f"/api/v1/categories/{category['id']}/products")
+
+        assert filtered_response.status_code == 200
+        assert [item["id"] for item in filtered_response.json()["content"]] == [product["id"]]
+        assert category_products_response.status_code == 200
+        assert [item["id"] for item in category_products_response.json()["content"]] == [product["id"]]
+
+
+async def test_cursor_pages_are_not_counted_by_default(client: httpx.AsyncClient):
+    names_prefix = uuid4().hex[:12]
+    for number in range(2):
+        await client.post("/api/v1/categories", json={"name": f"{names_prefix}-{number}"})
+
+    first_page = (await client.get("/api/v1/categories", params={"page_size": 1})).json()
+    next_page = (await client.get(
+        "/api/v1/categories", params={"page_size": 1, "cursor": first_page["next_cursor"]}
+    )).json()
+    counted_next_page = (await client.get(
+        "/api/v1/categories", params={"page_size": 1, "cursor": first_page["next_cursor"], "count": "exact"}
+    )).json()
+
+    assert first_page["total_items"] is not None
+    assert next_page["total_items"] is None
+    assert counted_next_page["total_items"] == first_page["total_items"]
@@ -0,0 +1,71 @@
+import gc
+import logging
+import os
+from pathlib import Path
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from src.core.config import settings, StorageBackend
+
+
+pytestmark = pytest.mark.anyio
+
+# Enough to show sessions' leak (every request opens one), more can be set for a longer run
+REQUESTS_NUMBER = int(os.environ.get("RSS_TEST_REQUESTS_NUMBER", 20_000))
+WARMUP_REQUESTS_NUMBER = 2_000
+MAX_RSS_GROWTH_BYTES = 16 * 1024 * 1024
+STATM_PATH = Path("/proc/self/statm")
+
+
+def get_rss_bytes() -> int:
+    """Returns current resident set size of the process."""
+    gc.collect()
+    _, resident_pages, *_ = STATM_PATH.read_text().split()
+    return int(resident_pages) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not STATM_PATH.exists(), reason="RSS is read from procfs")
+@pytest.mark.skipif(
+    settings.STORAGE_BACKEND != StorageBackend.postgres, reason="In-memory storage opens no DB sessions"
+)
+async def test_rss_stays_flat_after_many_requests(client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    """
+    Request-scoped services, repositories and DB sessions mustn't be retained after requests.
+    Caches are disabled, so every request reads DB by it's own session.
+    """
+    from src.db.postgres.repositories import CategorySQLAlchemyRepository, ProductSQLAlchemyRepository
+
+    monkeypatch.setattr(CategorySQLAlchemyRepository, "detail_cache", None)
+    monkeypatch.setattr(ProductSQLAlchemyRepository, "detail_cache", None)
+    monkeypatch.setattr("src.service.products.PRODUCTS_LIST_CACHE", None)
+
+    names_prefix = uuid4().hex[:12]
+    category = (await client.post("/api/v1/categories", json={"name": f"{names_prefix}-c"})).json()
+    product = (await client.post(
+        "/api/v1/products", json={"name": f"{names_prefix}-p", "category_id": category["id"]}
+    )).json()
+    urls = [
+        f"/api/v1/products/{product['id']}",
+        f"/api/v1/categories/{category['id']}",
+        "/api/v1/products?page_size=10",
+    ]
+
+    async def send_requests(requests_number: int):
+        for number in range(requests_number):
+            response = await client.get(urls[number % len(urls)])
+            assert response.status_code == 200
+
+    # Per request stats' log records would be kept by pytest's log capturing
+    logging.disable(logging.INFO)
+    try:
+        await send_requests(WARMUP_REQUESTS_NUMBER)
+        rss_before = get_rss_bytes()
+        await send_requests(REQUESTS_NUMBER)
+        rss_after = get_rss_bytes()
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert rss_after - rss_before < MAX_RSS_GROWTH_BYTES
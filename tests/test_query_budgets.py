@@ -0,0 +1,83 @@
+from uuid import uuid4
+
+import anyio
+import httpx
+import pytest
+from fastapi.routing import APIRoute
+
+from src.core.config import settings, StorageBackend
+from src.util.change_feed import ChangeEvent, change_feed
+
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(
+        settings.STORAGE_BACKEND != StorageBackend.postgres, reason="In-memory storage runs no SQL statements"
+    ),
+]
+
+
+def get_budgeted_routes() -> set[tuple[str, str]]:
+    """Returns `(method, path)` of all routes with `query_budget`."""
+    from src.main import app
+
+    return {
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute) and hasattr(route.endpoint, "query_budget")
+        for method in route.methods
+    }
+
+
+async def end_changes_streams():
+    """Waits for changes' stream subscriber and overflows it's queue, so it's stream ends."""
+    while not change_feed.subscribers_number:
+        await anyio.sleep(0.01)
+    for _ in range(change_feed.queue_size + 1):
+        change_feed.publish(ChangeEvent("change", {}))
+
+
+async def test_routes_fit_their_query_budgets(client: httpx.AsyncClient):
+    """Sends a request to every budgeted route in strict mode, where exceeded budget fails the request."""
+    assert settings.QUERY_BUDGETS_STRICT
+    sent_routes: set[tuple[str, str]] = set()
+    names_prefix = uuid4().hex[:12]
+
+    async def send(method: str, path: str, expected_status: int, instance_id: str = "", **kwargs) -> httpx.Response:
+        response = await client.request(method, path.format(id=instance_id), **kwargs)
+        assert response.status_code == expected_status, response.text
+        sent_routes.add((method, path))
+        return response
+
+    category_id = (await send(
+        "POST", "/api/v1/categories", 201, json={"name": f"{names_prefix}-c"}
+    )).json()["id"]
+    await send("PUT", "/api/v1/categories/{id}", 200, category_id, json={"name": f"{names_prefix}-ce"})
+    await send("GET", "/api/v1/categories/{id}", 200, category_id)
+    await send("GET", "/api/v1/categories", 200, params={"search": names_prefix})
+    await send("GET", "/api/v1/categories", 200, params={"ids": [category_id]})
+    await send("POST", "/api/v1/categories:batchGet", 200, json={"ids": [category_id]})
+
+    product_id = (await send(
+        "POST", "/api/v1/products", 201, json={"name": f"{names_prefix}-p", "category_id": category_id}
+    )).json()["id"]
+    await send(
+        "PUT", "/api/v1/products/{id}", 200, product_id,
+        json={"name": f"{names_prefix}-pe", "category_id": category_id}
+    )
+    await send("GET", "/api/v1/products/{id}", 200, product_id)
+    await send("GET", "/api/v1/products", 200, params={"facets": True})
+    await send("GET", "/api/v1/products", 200, params={"search": names_prefix, "facets": True})
+    await send("GET", "/api/v1/products", 200, params={"category_id": category_id, "facets": True})
+    await send("GET", "/api/v1/products", 200, params={"ids": [product_id]})
+    await send("POST", "/api/v1/products:batchGet", 200, json={"ids": [product_id]})
+    await send("GET", "/api/v1/categories/{id}/products", 200, category_id)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(end_changes_streams)
+        await send("GET", "/api/v1/changes/stream", 200, params={"last_event_id": 0})
+
+    await send("DELETE", "/api/v1/products/{id}", 204, product_id)
+    await send("DELETE", "/api/v1/categories/{id}", 204, category_id)
+
+    assert sent_routes == get_budgeted_routes()